@@ -0,0 +1,133 @@
+"""
+Evaluating sessions' scenarios off the server's IOLoop.
+
+Bokeh runs widget callbacks on the Tornado IOLoop of the server process, which serves every
+session's websocket, so while one callback evaluates a scenario and wrangles the chart data, no
+other session gets a response. A BackgroundUpdater runs that work in EXECUTOR, a pool of threads
+shared by the process, and applies the results to the session's document on its next tick
+(Document.add_next_tick_callback() is the one method of a document that's safe to call from
+another thread).
+
+Each session has at most one evaluation in the pool at a time, and changes are collected for a
+short window (WINDOW) before one starts: the inputs a user changes in that window, or while an
+evaluation is running, are kept and evaluated together, and the results of an evaluation whose
+inputs have changed since are dropped, as they'd be replaced straight away. So dragging a slider,
+which fires its callback many times a second, or changing several of the grid mix's inputs, costs
+an evaluation per window rather than one per change. The number of changes that didn't need an
+evaluation of their own is logged when the session ends.
+
+The pool is of threads rather than processes because the session's ScenarioState, with the
+results it reuses (see scenario.py), stays in the server process; the calculations are short, and
+the IOLoop gets the GIL between them.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+log = logging.getLogger(__name__)
+
+# threads evaluating scenarios for every session served by the process
+WORKERS = 4
+
+# seconds that changes are collected for before they're evaluated
+WINDOW = 0.1
+
+EXECUTOR = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="scenario")
+
+
+class BackgroundUpdater:
+    """
+    Update the document *doc* of a session from its ScenarioState *scenario* in *executor*
+    (default EXECUTOR).
+
+    *compute* is called in the pool with *scenario* after its inputs are updated, and returns
+    what *apply* needs to update the document's models, e.g. chart data; *apply* is then called
+    with it on the document's next tick.
+
+    Changes requested within *window* seconds (default WINDOW) of each other are evaluated
+    together; with a *window* of 0 they're evaluated straight away, unless one is running.
+
+    *requests* is the number of changes requested, *evaluations* the number of evaluations they
+    took, and *dropped* the number of evaluations whose results were dropped, as the inputs
+    changed while they ran.
+    """
+
+    def __init__(self, doc, scenario, compute, apply, executor=None, window=WINDOW):
+        self.doc = doc
+        self.scenario = scenario
+        self.compute = compute
+        self.apply = apply
+        self.executor = EXECUTOR if executor is None else executor
+        self.window = window
+        self.requests = 0
+        self.evaluations = 0
+        self.dropped = 0
+        self._changes = {}
+        self._waiting = False
+        self._running = False
+        doc.on_session_destroyed(self._report)
+
+    @property
+    def skipped(self):
+        """The number of changes requested that weren't evaluated on their own."""
+        return self.requests - self.evaluations + self.dropped
+
+    def request(self, changes=None, **kwargs):
+        """
+        Change the inputs in *changes* (a dict) and/or *kwargs*, keyed like user_inputs, and
+        update the document with the results. Call from the IOLoop, e.g. in a widget callback.
+        """
+        self._changes.update(changes or {}, **kwargs)
+        self.requests += 1
+        if self._waiting or self._running:
+            # evaluated with the changes already waiting, or once the running evaluation is done
+            return
+        if self.window:
+            self._waiting = True
+            self.doc.add_timeout_callback(self._flush, self.window * 1000)
+        else:
+            self._submit()
+
+    def _flush(self):
+        self._waiting = False
+        if not self._running:
+            self._submit()
+
+    def _submit(self):
+        changes, self._changes = self._changes, {}
+        requests = self.requests
+        self.evaluations += 1
+        self._running = True
+        future = self.executor.submit(self._evaluate, changes)
+        future.add_done_callback(
+            lambda future: self.doc.add_next_tick_callback(partial(self._done, future, requests))
+        )
+
+    def _evaluate(self, changes):
+        # only one evaluation runs at a time, so the scenario is only used by one thread
+        self.scenario.update(changes)
+        return self.compute(self.scenario)
+
+    def _done(self, future, requests):
+        self._running = False
+        if self.requests != requests:
+            # inputs changed since this evaluation was submitted; evaluate them instead
+            self.dropped += 1
+            self._submit()
+            return
+        try:
+            data = future.result()
+        except Exception:
+            log.exception("Evaluating the scenario failed")
+            return
+        self.apply(data)
+
+    def _report(self, session_context):
+        log.info(
+            "%d changes took %d evaluations (%d skipped, %d dropped)",
+            self.requests,
+            self.evaluations,
+            self.skipped,
+            self.dropped,
+        )
@@ -0,0 +1,711 @@
+"""
+Calculate GHG emissions for many scenarios at once.
+
+The calc_* functions in ghg_calc.py take Python floats and calculate one scenario at a time.
+The functions here do the same calculations on NumPy arrays, one element per scenario, so that
+sweeps of hundreds of thousands of scenarios can be evaluated in a single call. ghg_calc.py
+remains the reference for the model; the tests check that the two agree.
+
+The model's constants are read from *coefficients*, a mapping that defaults to COEFFICIENTS
+(the constants in ghg_calc.py). Any of them can be overridden with a scalar or with an array of
+one value per scenario.
+"""
+
+import ast
+import inspect
+from collections import namedtuple
+from functools import lru_cache
+from hashlib import sha256
+
+import numpy as np
+
+import ghg_calc
+from ghg_calc import CI_FUELS, ELEC_SECTOR_KEYS, SECTOR_KEYS, user_inputs
+
+# every constant in ghg_calc.py, keyed by name
+COEFFICIENTS = {
+    name: value
+    for name, value in vars(ghg_calc).items()
+    if name.isupper() and isinstance(value, (int, float))
+}
+
+INPUT_KEYS = list(user_inputs)
+
+# number of scenarios evaluated together, to bound the memory used by intermediate arrays
+CHUNK_SIZE = 65536
+
+BatchResult = namedtuple("BatchResult", ["ghg", "elec_btu"])
+BatchResult.__doc__ = """
+Result of evaluating N scenarios.
+
+*ghg* is an N x 8 array of GHG emissions (MMTCO2e), columns in the order of SECTOR_KEYS.
+
+*elec_btu* is an N x 5 array of electric BTU consumed, columns in the order of ELEC_SECTOR_KEYS.
+"""
+
+
+def coefficients_version(coefficients=COEFFICIENTS):
+    """
+    Return a hash of *coefficients*, to tell whether results stored by an earlier run were
+    calculated with the same constants.
+    """
+    return sha256(repr(sorted(coefficients.items())).encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _definitions():
+    """
+    Return the expressions that define the constants in ghg_calc.py, as a list of (name, code,
+    names used) in the order they're defined, and those that define the baseline values in
+    user_inputs, as a dict of (code, names used) keyed by input.
+    """
+    constants = []
+    inputs = {}
+    for node in ast.parse(inspect.getsource(ghg_calc)).body:
+        if not (isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name)):
+            continue
+        name = node.targets[0].id
+        if name in COEFFICIENTS:
+            constants.append((name, *_compile(node.value)))
+        elif name == "user_inputs":
+            values = node.value.args[0]
+            for key, value in zip(values.keys, values.values):
+                inputs[key.value] = _compile(value)
+    return constants, inputs
+
+
+def _compile(node):
+    names = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+    return compile(ast.Expression(node), ghg_calc.__file__, "eval"), names
+
+
+def _mean(values):
+    # statistics.mean, as used in ghg_calc.py, doesn't take arrays
+    return sum(values) / len(values)
+
+
+def derive_coefficients(overrides):
+    """
+    Return the constants and baseline user inputs that change when the constants in
+    *overrides* do, as a tuple of two dicts: *overrides* along with every constant in
+    ghg_calc.py calculated from them, and the values of user_inputs calculated from them.
+
+    For example, overriding URBAN_ELEC_MWH_CAP changes URB_ELEC_SPACE_BTU, URB_ENERGY_ELEC and
+    so on, and the baseline of the urb_energy_elec input. Values can be scalars or arrays with
+    one value per scenario.
+    """
+    unknown = set(overrides) - set(COEFFICIENTS)
+    if unknown:
+        raise ValueError(f"Unknown constants: {', '.join(sorted(unknown))}")
+
+    constants, inputs = _definitions()
+    values = dict(COEFFICIENTS, **overrides)
+    namespace = {"mean": _mean}
+    derived = dict(overrides)
+    for name, code, names in constants:
+        if name not in overrides and names & derived.keys():
+            derived[name] = values[name] = eval(code, namespace, values)
+    baseline = {
+        key: eval(code, namespace, values)
+        for key, (code, names) in inputs.items()
+        if names & derived.keys()
+    }
+    return derived, baseline
+
+
+def scenarios_to_columns(scenarios):
+    """
+    Return a dict of equal-length float arrays, keyed by user input, from *scenarios*.
+
+    *scenarios* can be a dict of sequences (or scalars) keyed like user_inputs, a pandas
+    DataFrame with those columns, a NumPy structured array with those fields, or a list of
+    dicts. Inputs that aren't given are set to their baseline value in user_inputs.
+    """
+    # the number of scenarios, if it isn't the length of the inputs given
+    n = None
+    if isinstance(scenarios, np.ndarray) and scenarios.dtype.names:
+        given = {name: scenarios[name] for name in scenarios.dtype.names}
+    elif isinstance(scenarios, (list, tuple)):
+        # a list of dicts has a scenario for each dict, even if none of them give any inputs
+        n = len(scenarios)
+        given = {
+            key: [scenario.get(key, user_inputs[key]) for scenario in scenarios]
+            for key in set().union(*scenarios)
+        }
+    else:
+        given = {key: scenarios[key] for key in scenarios.keys()}
+
+    unknown = set(given) - set(INPUT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown user inputs: {', '.join(sorted(unknown))}")
+
+    given = {key: np.asarray(value, dtype=float) for key, value in given.items()}
+    if n is None:
+        n = max([value.size for value in given.values() if value.ndim] or [1])
+
+    columns = {}
+    for key in INPUT_KEYS:
+        value = np.asarray(given.get(key, user_inputs[key]), dtype=float).ravel()
+        columns[key] = value if value.shape == (n,) else np.broadcast_to(value, (n,))
+    return columns
+
+
+def evaluate_batch(scenarios, coefficients=None, chunk_size=CHUNK_SIZE):
+    """
+    Calculate GHG emissions and electric BTU of every sector for each of *scenarios*.
+
+    See scenarios_to_columns() for the forms *scenarios* can take. *coefficients* overrides
+    values in COEFFICIENTS; values can be scalars or arrays with one value per scenario. A single
+    scenario is evaluated with each value of coefficients given as arrays, which must all have
+    the same length.
+
+    Return a BatchResult.
+    """
+    columns = scenarios_to_columns(scenarios)
+    k = dict(COEFFICIENTS)
+    if coefficients:
+        k.update(coefficients)
+
+    n = len(columns[INPUT_KEYS[0]])
+    # the lengths of the coefficients given with a value per scenario
+    lengths = {len(value) for value in k.values() if np.ndim(value) == 1}
+    if n == 1 and len(lengths) == 1:
+        # one scenario, evaluated with each value of the coefficients
+        (n,) = lengths
+        columns = {key: np.broadcast_to(value, (n,)) for key, value in columns.items()}
+    elif lengths - {n}:
+        raise ValueError(
+            f"Coefficients given as arrays need a value for each of the {n} scenarios, not "
+            + " or ".join(str(length) for length in sorted(lengths - {n}))
+        )
+
+    ghg = np.empty((n, len(SECTOR_KEYS)))
+    elec_btu = np.empty((n, len(ELEC_SECTOR_KEYS)))
+
+    if n <= chunk_size:
+        ghg[:], elec_btu[:] = _evaluate_columns(columns, k)
+        return BatchResult(ghg, elec_btu)
+
+    per_scenario = [name for name, value in k.items() if np.ndim(value) == 1 and len(value) == n]
+    for start in range(0, n, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        c = {key: value[chunk] for key, value in columns.items()}
+        chunk_k = dict(k, **{name: k[name][chunk] for name in per_scenario})
+        ghg[chunk], elec_btu[chunk] = _evaluate_columns(c, chunk_k)
+
+    return BatchResult(ghg, elec_btu)
+
+
+def _evaluate_columns(c, k):
+    """Evaluate the scenarios in columns *c* with coefficients *k*; see evaluate_batch()."""
+    grid = calc_grid_lb_mwh(c, k)
+
+    lulucf_seq, lulucf_ghg = calc_lulucf(c, k)
+    res_ghg, res_ng_btu, res_elec_btu = calc_res_ghg(c, k, grid)
+    ci_ghg, ci_elec_btu = calc_ci_ghg(c, k, grid)
+    highway_ghg, highway_elec_btu = calc_highway_ghg(c, k, grid)
+    rail_ghg, rail_elec_btu = calc_rail_ghg(c, k, grid)
+    aviation_ghg = calc_aviation_ghg(c, k)
+    om_ghg, om_elec_btu = calc_other_mobile_ghg(c, k, grid)
+    non_energy_ghg = calc_non_energy_ghg(c, k, res_ng_btu, lulucf_ghg)
+
+    total_elec_btu = res_elec_btu + ci_elec_btu + highway_elec_btu + rail_elec_btu + om_elec_btu
+    gross_ghg = res_ghg + ci_ghg + highway_ghg + rail_ghg + om_ghg + non_energy_ghg
+    seq_ghg = calc_sequestration(c, k, grid, total_elec_btu, gross_ghg, lulucf_seq)
+
+    ghg = np.column_stack(
+        np.broadcast_arrays(
+            seq_ghg, res_ghg, ci_ghg, highway_ghg, rail_ghg, aviation_ghg, om_ghg, non_energy_ghg
+        )
+    )
+    elec_btu = np.column_stack(
+        np.broadcast_arrays(res_elec_btu, ci_elec_btu, highway_elec_btu, rail_elec_btu, om_elec_btu)
+    )
+    return ghg, elec_btu
+
+
+##################################################################
+# Sector calculations; see the function of the same name in ghg_calc.py
+
+
+def calc_grid_lb_mwh(c, k):
+    """Return lbs CO2 per MWh generated by the grid mix."""
+    return (
+        (c["grid_coal"] / 100 * k["CO2_LB_MWH_COAL"])
+        + (c["grid_oil"] / 100 * k["CO2_LB_MWH_OIL"])
+        + (c["grid_ng"] / 100 * k["CO2_LB_MWH_NG"])
+        + (c["grid_other_ff"] / 100 * k["CO2_LB_MWH_OTHER_FF"])
+    )
+
+
+def calc_elec_ghg(k, grid, elec_btu):
+    """Return MMTCO2e from generating *elec_btu* of electricity, including grid losses."""
+    return elec_btu * (1 / k["BTU_MWH"]) / (1 - k["GRID_LOSS"]) * (grid * k["MMT_LB"])
+
+
+RES_SUBSECTORS = ["URB", "SUB", "RUR"]
+RES_FUELS = ["ELEC", "NG", "FOK", "LPG"]
+RES_USES = ["SPACE", "WATER", "OTHER"]
+
+ResArrays = namedtuple(
+    "ResArrays",
+    [
+        "energy_btu",
+        "energy_share",
+        "use_share",
+        "ff_share",
+        "elec_heat",
+        "ff_heat",
+        "useful",
+        "replace_useful",
+    ],
+)
+ResArrays.__doc__ = """
+The residential constants laid out by subsector (RES_SUBSECTORS), fuel (RES_FUELS, or the fossil
+fuels RES_FUELS[1:]) and end use (RES_USES). Each has the shape given, followed by an axis of
+scenarios if any of the residential constants has a value per scenario.
+
+*energy_btu* (3): <P>_ENERGY_BTU, BTU per person
+*energy_share* (3 x 4): <P>_ENERGY_<F>, share of energy from each fuel
+*use_share* (3 x 4 x 3): <P>_<F>_<U>, share of each fuel's energy for each end use
+*ff_share* (3 x 3): <P>_FF_<F>, share of fossil fuel energy from each fossil fuel
+*elec_heat* (3 x 3): <P>_ELEC_HEAT_<U>, share of electric heating for space and water (0 other)
+*ff_heat* (3 x 3 x 3): <P>_FF_<U>_<F>, share of fossil fuel heating from each fossil fuel for
+space and water, by fuel and end use (0 other)
+*useful* (4 x 3): RES_<F>_<U>_USEFUL, efficiency of each fuel for each end use
+*replace_useful* (3): efficiency of electricity replacing fossil fuels for each end use
+"""
+
+
+# the constants read by res_arrays()
+RES_CONSTANTS = (
+    [f"{p}_ENERGY_BTU" for p in RES_SUBSECTORS]
+    + [f"{p}_ENERGY_{f}" for p in RES_SUBSECTORS for f in RES_FUELS]
+    + [f"{p}_{f}_{u}" for p in RES_SUBSECTORS for f in RES_FUELS for u in RES_USES]
+    + [f"{p}_FF_{f}" for p in RES_SUBSECTORS for f in RES_FUELS[1:]]
+    + [f"{p}_ELEC_HEAT_{u}" for p in RES_SUBSECTORS for u in RES_USES[:2]]
+    + [f"{p}_FF_{u}_{f}" for p in RES_SUBSECTORS for f in RES_FUELS[1:] for u in RES_USES[:2]]
+    + [f"RES_{f}_{u}_USEFUL" for f in RES_FUELS for u in RES_USES]
+    + ["RES_ELEC_WATER_USEFUL_REPLACE_FF", "RES_ELEC_OTHER_USEFUL_REPLACE_FF"]
+)
+
+
+def _broadcast_shape(values):
+    """
+    Return the shape that *values*, scalars or arrays, broadcast to. (np.broadcast() takes at
+    most 32 arrays and np.broadcast_shapes() needs NumPy 1.20, so they're taken a pair at a
+    time; broadcast_to() doesn't allocate.)
+    """
+    shape = ()
+    for value in values:
+        pair = np.broadcast(np.broadcast_to(0.0, shape), np.broadcast_to(0.0, np.shape(value)))
+        shape = pair.shape
+    return shape
+
+
+def _stack(values, axis=-1):
+    """Stack *values*, scalars or arrays with one value per scenario, along a new *axis*."""
+    return np.stack(np.broadcast_arrays(*values), axis=axis)
+
+
+def _layout(k, template, **axes):
+    """
+    Return an array of the constants in *k* named by *template* for each combination of the
+    values in *axes*, stacked along leading axes. For example, _layout(k, "{p}_FF_{f}",
+    p=["URB", "SUB"], f=["NG", "FOK"]) is [[URB_FF_NG, URB_FF_FOK], [SUB_FF_NG, SUB_FF_FOK]].
+    """
+    if not axes:
+        return k[template]
+    (axis, values), *rest = axes.items()
+    return _stack(
+        [_layout(k, template.replace(f"{{{axis}}}", value), **dict(rest)) for value in values],
+        axis=0,
+    )
+
+
+def res_arrays(k):
+    """Return the residential constants in coefficients *k* as ResArrays."""
+    shape = _broadcast_shape([k[name] for name in RES_CONSTANTS])
+    k = {name: np.broadcast_to(k[name], shape) for name in RES_CONSTANTS}
+    # electricity is only switched to fossil fuels for space and water heating
+    for p in RES_SUBSECTORS:
+        k[f"{p}_ELEC_HEAT_OTHER"] = np.zeros(shape)
+        for f in RES_FUELS[1:]:
+            k[f"{p}_FF_OTHER_{f}"] = np.zeros(shape)
+
+    p = RES_SUBSECTORS
+    f = RES_FUELS
+    ff = RES_FUELS[1:]
+    u = RES_USES
+    return ResArrays(
+        energy_btu=_layout(k, "{p}_ENERGY_BTU", p=p),
+        energy_share=_layout(k, "{p}_ENERGY_{f}", p=p, f=f),
+        use_share=_layout(k, "{p}_{f}_{u}", p=p, f=f, u=u),
+        ff_share=_layout(k, "{p}_FF_{f}", p=p, f=ff),
+        elec_heat=_layout(k, "{p}_ELEC_HEAT_{u}", p=p, u=u),
+        ff_heat=_layout(k, "{p}_FF_{u}_{f}", p=p, f=ff, u=u),
+        useful=_layout(k, "RES_{f}_{u}_USEFUL", f=f, u=u),
+        # as in ghg_calc.calc_res_ghg, which divides fossil fuel energy switched to electricity
+        # for space heating by RES_ELEC_WATER_USEFUL_REPLACE_FF and for water heating by
+        # RES_ELEC_OTHER_USEFUL_REPLACE_FF
+        replace_useful=_stack(
+            [
+                k["RES_ELEC_WATER_USEFUL_REPLACE_FF"],
+                k["RES_ELEC_OTHER_USEFUL_REPLACE_FF"],
+                k["RES_ELEC_OTHER_USEFUL"],
+            ],
+            axis=0,
+        ),
+    )
+
+
+def res_weights(a):
+    """
+    Return the BTU of each fuel used by each residential subsector (subsector x fuel) per BTU of
+    energy, per BTU switched from fossil fuels to electricity and per BTU switched from
+    electricity to fossil fuels, given the ResArrays *a*; i.e. the constants summed over end use.
+    """
+    ff_use = a.ff_share[:, :, None] * a.use_share[:, 1:]
+    elec_ff_heat = a.elec_heat[:, None] * a.ff_heat
+    base = (a.energy_share[:, :, None] * a.use_share / a.useful[None]).sum(axis=2)
+    to_elec = np.concatenate(
+        [
+            (ff_use.sum(axis=1) / a.replace_useful[None]).sum(axis=1)[:, None],
+            -(ff_use / a.useful[None, 1:]).sum(axis=2),
+        ],
+        axis=1,
+    )
+    from_elec = np.concatenate(
+        [
+            -(elec_ff_heat.sum(axis=1) / a.useful[None, 0]).sum(axis=1)[:, None],
+            (elec_ff_heat / a.useful[None, 1:]).sum(axis=2),
+        ],
+        axis=1,
+    )
+    return base, to_elec, from_elec
+
+
+def _scalars(k, names):
+    """Return the values of *names* in coefficients *k* as a tuple of floats, or None if any of
+    them has a value per scenario."""
+    values = tuple(k[name] for name in names)
+    if all(isinstance(value, (int, float)) or np.ndim(value) == 0 for value in values):
+        return tuple(float(value) for value in values)
+    return None
+
+
+def _res_layout(a, weights):
+    """Return *a*.energy_btu, the share of energy that's electric and *weights* with the axis of
+    scenarios first, like the inputs."""
+    return (
+        np.moveaxis(a.energy_btu, 0, -1),
+        np.moveaxis(a.energy_share[:, 0], 0, -1),
+        [np.moveaxis(w, (0, 1), (-2, -1)) for w in weights],
+    )
+
+
+@lru_cache(maxsize=16)
+def _cached_res_layout(values):
+    a = res_arrays(dict(zip(RES_CONSTANTS, values)))
+    return _res_layout(a, res_weights(a))
+
+
+def calc_res_btu(c, k):
+    """
+    Return the BTU of each fuel used by each residential subsector, an array of shape
+    (scenarios x 3 x 4) in the order of RES_SUBSECTORS and RES_FUELS.
+
+    Energy switched from fossil fuels to electricity (in subsectors becoming more electric) and
+    from electricity to fossil fuels (in those becoming less electric) are both calculated for
+    every subsector, with the share switched masked to zero in the other direction, so all
+    three subsectors are calculated together whichever way each of them goes.
+    """
+    values = _scalars(k, RES_CONSTANTS)
+    if values is None:
+        a = res_arrays(k)
+        layout = _res_layout(a, res_weights(a))
+    else:
+        # the same constants for every scenario, so they're only laid out once
+        layout = _cached_res_layout(values)
+    energy_btu, energy_share_elec, (w_base, w_to_elec, w_from_elec) = layout
+
+    pop_percent = _stack(
+        [c["urban_pop_percent"], c["suburban_pop_percent"], c["rural_pop_percent"]]
+    )
+    new_energy_elec = _stack([c["urb_energy_elec"], c["sub_energy_elec"], c["rur_energy_elec"]])
+
+    scale = k["POP"] * (1 + c["change_pop"] / 100) * (1 + c["res_energy_change"] / 100)
+    btu = np.asarray(scale)[..., None] * (pop_percent / 100) * energy_btu
+    base_elec_btu = btu * energy_share_elec
+
+    change_elec_use = (new_energy_elec / 100) - energy_share_elec
+    more_elec = change_elec_use >= 0
+    # more energy is electric, therefore less FF used
+    to_elec = btu * np.where(more_elec, change_elec_use, 0)
+    # less energy is electric, therefore more FF used
+    from_elec = base_elec_btu * np.where(more_elec, 0, -change_elec_use)
+
+    return (
+        btu[..., None] * w_base
+        + to_elec[..., None] * w_to_elec
+        + from_elec[..., None] * w_from_elec
+    )
+
+
+def calc_res_ghg(c, k, grid):
+    res_elec_btu, res_ng_btu, res_fok_btu, res_lpg_btu = np.moveaxis(
+        calc_res_btu(c, k).sum(axis=-2), -1, 0
+    )
+
+    energy_change = 1 + c["res_energy_change"] / 100
+    res_ghg = (
+        calc_elec_ghg(k, grid, res_elec_btu)
+        + res_ng_btu
+        * (1 / k["BTU_CCF_AVG"])
+        * energy_change
+        * 0.1
+        * k["CO2_LB_KCF_NG"]
+        * k["MMT_LB"]
+        + res_fok_btu * (1 / k["BTU_GAL_FOK"]) * energy_change * (k["CO2_MMT_KB_FOK"] * k["KB_G"])
+        + res_lpg_btu * (1 / k["BTU_GAL_LPG"]) * energy_change * (k["CO2_MMT_KB_LPG"] * k["KB_G"])
+    )
+    return res_ghg, res_ng_btu, res_elec_btu
+
+
+# constant for each fuel in CI_FUELS of its CO2 emitted per BBTU
+CI_FUEL_FACTORS = [
+    "CO2_MT_BBTU_NG",
+    "CO2_MT_BBTU_COAL",
+    "CO2_MT_BBTU_DFO",
+    "CO2_MT_BBTU_KER",
+    "CO2_MT_BBTU_LPG",
+    "CO2_MT_BBTU_MG",
+    "CO2_MT_BBTU_RFO",
+    "CO2_MT_BBTU_PETCOKE",
+    "CO2_MT_BBTU_STILL_GAS",
+    "CO2_MT_BBTU_NAPHTHAS",
+]
+
+CiFuelArrays = namedtuple("CiFuelArrays", ["btu", "useful", "ff_share", "co2_mt_bbtu"])
+CiFuelArrays.__doc__ = """
+The C&I constants of each fuel in CI_FUELS (CI_<F>_BTU, CI_<F>_USEFUL, CI_ENERGY_FF_<F> and
+CI_FUEL_FACTORS), as arrays whose last axis is the fuel, preceded by an axis of scenarios if any of
+them has a value per scenario.
+"""
+
+
+CI_FUEL_CONSTANTS = [
+    [f"CI_{fuel}_BTU" for fuel in CI_FUELS],
+    [f"CI_{fuel}_USEFUL" for fuel in CI_FUELS],
+    [f"CI_ENERGY_FF_{fuel}" for fuel in CI_FUELS],
+    CI_FUEL_FACTORS,
+]
+
+
+def ci_fuel_arrays(k):
+    """Return the C&I fuel constants in coefficients *k* as CiFuelArrays."""
+    values = _scalars(k, [name for row in CI_FUEL_CONSTANTS for name in row])
+    if values is not None:
+        return _cached_ci_fuel_arrays(values)
+    shape = _broadcast_shape([k[name] for row in CI_FUEL_CONSTANTS for name in row])
+    return CiFuelArrays(
+        *[_stack([np.broadcast_to(k[name], shape) for name in row]) for row in CI_FUEL_CONSTANTS]
+    )
+
+
+@lru_cache(maxsize=16)
+def _cached_ci_fuel_arrays(values):
+    return CiFuelArrays(*np.reshape(values, (len(CI_FUEL_CONSTANTS), len(CI_FUELS))))
+
+
+def calc_ci_ff_btu(c, k):
+    """Return BBTU of fossil fuel energy in C&I, before dividing by each fuel's useful share."""
+    ci_ff = 100 - c["ci_energy_elec"]
+    change_ff = (ci_ff - k["CI_ENERGY_FF"]) / k["CI_ENERGY_FF"]
+    return k["CI_ENERGY_BTU"] * (1 + c["ci_energy_change"] / 100) * (ci_ff / 100) * (1 + change_ff)
+
+
+def calc_ci_elec_btu(c, k):
+    return (
+        k["CI_ENERGY_BTU"]
+        * (1 + c["ci_energy_change"] / 100)
+        * (c["ci_energy_elec"] / 100)
+        / k["CI_ELEC_USEFUL"]
+        * 1000000000
+    )
+
+
+def calc_ci_ghg(c, k, grid):
+    a = ci_fuel_arrays(k)
+    ci_elec_btu = calc_ci_elec_btu(c, k)
+    # MMTCO2e per BBTU of fossil fuel energy, summed over the fuels
+    ff_factor = np.einsum("...i,...i->...", a.ff_share / a.useful, a.co2_mt_bbtu) * k["MT_TO_MMT"]
+    ci_ghg = calc_elec_ghg(k, grid, ci_elec_btu) + calc_ci_ff_btu(c, k) * ff_factor
+    return ci_ghg, ci_elec_btu
+
+
+def calc_ci_ghg_by_fuel(c, k, grid):
+    """
+    Return C&I GHG emissions (MMTCO2e) by fuel, an array of shape (scenarios x 11) with columns
+    for electricity and then each fuel in CI_FUELS, and the BTU of electricity consumed.
+    """
+    a = ci_fuel_arrays(k)
+    ci_elec_btu = calc_ci_elec_btu(c, k)
+    ff_factor = a.ff_share / a.useful * a.co2_mt_bbtu * np.asarray(k["MT_TO_MMT"])[..., None]
+    ff_ghg = np.asarray(calc_ci_ff_btu(c, k))[..., None] * ff_factor
+    elec_ghg = np.broadcast_to(calc_elec_ghg(k, grid, ci_elec_btu), ff_ghg.shape[:-1])
+    return np.concatenate([elec_ghg[..., None], ff_ghg], axis=-1), ci_elec_btu
+
+
+def calc_highway_ghg(c, k, grid):
+    veh_miles_traveled = (
+        k["POP"]
+        * (1 + c["change_pop"] / 100)
+        * (
+            (c["urban_pop_percent"] / 100 * k["URB_VEH_MILES"])
+            + (c["suburban_pop_percent"] / 100 * k["SUB_VEH_MILES"])
+            + (c["rural_pop_percent"] / 100 * k["RUR_VEH_MILES"])
+        )
+        * (1 + c["change_veh_miles"] / 100)
+    )
+    elec_miles = veh_miles_traveled * c["veh_miles_elec"] / 100
+    highway_elec_btu = elec_miles * k["ELEC_VEH_EFFICIENCY"] * k["BTU_KWH"]
+    highway_ghg = (veh_miles_traveled - elec_miles) / c["reg_fleet_mpg"] * k["CO2_LB_GAL_GAS"] * k[
+        "MMT_LB"
+    ] + calc_elec_ghg(k, grid, highway_elec_btu)
+    return highway_ghg, highway_elec_btu
+
+
+def calc_aviation_ghg(c, k):
+    return k["GHG_AVIATION"] * (1 + c["change_pop"] / 100) * (1 + c["change_air_travel"] / 100)
+
+
+def calc_rail_ghg(c, k, grid):
+    pop = k["POP"] * (1 + c["change_pop"] / 100)
+    rt_motion = (
+        (c["urban_pop_percent"] / 100 * k["RT_ENERGY_MOTION_URB"])
+        + (c["suburban_pop_percent"] / 100 * k["RT_ENERGY_MOTION_SUB"])
+        + (c["rural_pop_percent"] / 100 * k["RT_ENERGY_MOTION_RUR"])
+    )
+    rt_elec = c["rt_energy_elec_motion"] / 100
+    elec_motion = k["RT_ELEC_ENERGY_MOTION"] / 100
+    d_motion = k["RT_D_ENERGY_MOTION"] / 100
+    change_transit = 1 + c["change_rail_transit"] / 100
+    change_freight = 1 + c["change_freight_rail"] / 100
+    change_icr = 1 + c["change_inter_city_rail"] / 100
+
+    transit_elec_btu = pop / (1 - k["GRID_LOSS"]) * rt_motion * rt_elec / elec_motion
+    transit_elec_ghg = calc_elec_ghg(k, grid, pop * rt_motion * rt_elec / elec_motion)
+    transit_d_ghg = (
+        pop * k["RT_CO2_MT_BBTU_D"] / 1000000000 * k["MT_TO_MMT"] * rt_motion * (1 - rt_elec)
+    ) / d_motion
+    transit_ghg = (transit_elec_ghg + transit_d_ghg) * change_transit
+
+    f_elec_btu = k["F_ENERGY_MOTION"] * (c["f_energy_elec_motion"] / 100) / elec_motion * 1000000000
+    f_d_ghg = (
+        k["F_ENERGY_MOTION"]
+        * ((100 - c["f_energy_elec_motion"]) / 100)
+        * k["F_D_CO2_MT_BBTU"]
+        * k["MT_TO_MMT"]
+        / d_motion
+    )
+    f_ghg = (calc_elec_ghg(k, grid, f_elec_btu) + f_d_ghg) * change_freight
+
+    icr_elec_btu = (
+        k["ICR_ENERGY_MOTION"] * (c["icr_energy_elec_motion"] / 100) / elec_motion * 1000000000
+    )
+    icr_d_ghg = (
+        k["ICR_ENERGY_MOTION"]
+        * ((100 - c["icr_energy_elec_motion"]) / 100)
+        * k["ICR_D_CO2_MT_BBTU"]
+        * k["MT_TO_MMT"]
+        / d_motion
+    )
+    icr_ghg = (calc_elec_ghg(k, grid, icr_elec_btu) + icr_d_ghg) * change_icr
+
+    return (
+        transit_ghg + f_ghg + icr_ghg,
+        transit_elec_btu * change_transit + f_elec_btu * change_freight + icr_elec_btu * change_icr,
+    )
+
+
+def calc_other_mobile_ghg(c, k, grid):
+    mp_ff_motion = 100 - c["mp_energy_elec_motion"]
+    mp_ff_change = 1 + (mp_ff_motion - k["MP_FF_ENERGY_MOTION"]) / k["MP_FF_ENERGY_MOTION"]
+    mp_change = 1 + c["change_marine_port"] / 100
+    mp_elec_btu = (
+        k["MP_ENERGY_MOTION_BBTU"]
+        * (c["mp_energy_elec_motion"] / 100)
+        / (k["MP_ELEC_MOTION"] / 100)
+        * 1000000000
+    )
+    mp_ff_btu = k["MP_ENERGY_MOTION_BBTU"] * (mp_ff_motion / 100) * mp_ff_change * k["MT_TO_MMT"]
+    mp_ghg = (
+        calc_elec_ghg(k, grid, mp_elec_btu)
+        + mp_ff_btu
+        * (k["MP_FF_RFO_ENERGY_MOTION"] / 100)
+        * k["MP_RFO_CO2_MMT_BBTU"]
+        / (k["MP_RFO_MOTION"] / 100)
+        + mp_ff_btu
+        * (k["MP_FF_DFO_ENERGY_MOTION"] / 100)
+        * k["MP_DFO_CO2_MMT_BBTU"]
+        / (k["MP_DFO_MOTION"] / 100)
+    ) * mp_change
+
+    or_ff_motion = 100 - c["or_energy_elec_motion"]
+    or_ff_change = 1 + (or_ff_motion - k["OR_FF_ENERGY_MOTION"]) / k["OR_FF_ENERGY_MOTION"]
+    or_change = 1 + c["change_off_road"] / 100
+    or_elec_btu = (
+        k["OR_ENERGY_MOTION_BBTU"]
+        * (c["or_energy_elec_motion"] / 100)
+        / (k["OR_ELEC_MOTION"] / 100)
+        * 1000000000
+    )
+    or_ff_btu = k["OR_ENERGY_MOTION_BBTU"] * (or_ff_motion / 100) * or_ff_change * k["MT_TO_MMT"]
+    or_ghg = calc_elec_ghg(k, grid, or_elec_btu)
+    for fuel in ("MG", "DFO", "LPG"):
+        or_ghg = or_ghg + (
+            or_ff_btu
+            * (k[f"OR_FF_{fuel}_ENERGY_MOTION"] / 100)
+            * k[f"OR_{fuel}_CO2_MT_BBTU"]
+            / (k[f"OR_{fuel}_MOTION"] / 100)
+        )
+    or_ghg = or_ghg * or_change
+
+    return mp_ghg + or_ghg, mp_elec_btu * mp_change + or_elec_btu * or_change
+
+
+def calc_lulucf(c, k):
+    change_forest = c["change_forest"]
+    seq_urban_trees = k["SEQ_URBAN_TREES"] * (1 + c["change_urban_trees"] / 100)
+    seq_forest = k["FOREST_ACRE_2014"] * (1 + change_forest / 100) * k["FOREST_SEQ_ACRE"]
+    ghg_forest = (
+        k["FOREST_ACRE_2014"] * -(np.minimum(change_forest, 0) / 100) * k["FOREST_GHG_ACRELOSS"]
+    )
+    return seq_urban_trees + seq_forest, ghg_forest
+
+
+def calc_non_energy_ghg(c, k, res_ng_consumption, lulucf_ghg):
+    pop_change = 1 + c["change_pop"] / 100
+    ci_ng_consumption = calc_ci_ff_btu(c, k) * k["CI_ENERGY_FF_NG"] / k["CI_NG_USEFUL"] * 1000000000
+    ng_systems_ghg = (
+        (res_ng_consumption + ci_ng_consumption)
+        * (1 / k["BTU_CCF_AVG"])
+        * 100
+        * 0.000001
+        * (k["NE_CO2_MMT_NG_METHANE"] + k["NE_CO2_MMT_NG_CO"])
+    )
+    return (
+        k["GHG_AG"] * (1 + c["change_ag"] / 100)
+        + k["GHG_SOLID_WASTE"] * (1 + c["change_solid_waste"] / 100) * pop_change
+        + k["GHG_WASTEWATER"] * (1 + c["change_wastewater"] / 100) * pop_change
+        + k["GHG_IP"] * (1 + c["change_industrial_processes"] / 100)
+        + ng_systems_ghg
+        + lulucf_ghg
+    )
+
+
+def calc_sequestration(c, k, grid, total_elec_btu, gross_ghg, lulucf_seq):
+    seq_source_capture = -calc_elec_ghg(k, grid, total_elec_btu) * c["ff_carbon_capture"] / 100
+    seq_air_capture = -(gross_ghg + seq_source_capture + lulucf_seq) * c["air_capture"] / 100
+    return seq_air_capture + seq_source_capture + lulucf_seq
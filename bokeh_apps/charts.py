@@ -0,0 +1,361 @@
+"""
+Data for the charts and the functions that create them, for the apps.
+
+This is kept separate from the model in ghg_calc.py so that the model can be imported without
+Bokeh and pandas.
+"""
+
+from math import pi
+
+import numpy as np
+import pandas as pd
+
+from bokeh.models import ColumnDataSource, LabelSet
+from bokeh.palettes import Viridis7, Viridis8, Spectral10
+from bokeh.plotting import figure
+from bokeh.transform import dodge, cumsum
+
+from ghg_calc import (
+    GHG_AVIATION,
+    GHG_CI,
+    GHG_HIGHWAY,
+    GHG_NON_ENERGY,
+    GHG_OTHER_MOBILE,
+    GHG_RAIL,
+    GHG_RES,
+    GHG_SEQ,
+    SECTOR_KEYS,
+)
+
+###########################
+# Prepare data for charts #
+###########################
+
+SECTORS = [
+    "Carbon Seq. & Storage",
+    "Residential Stationary Energy",
+    "Non-Residential Stationary Energy",
+    "On-Road Motor Vehicles",
+    "Rail",
+    "Aviation",
+    "Other Mobile Energy",
+    "Non-Energy",
+]
+
+"""
+The functions below take the output of evaluate_scenario() rather than the user inputs, so
+that a callback that updates several charts only needs to calculate the scenario once.
+"""
+
+
+def wrangle_data_for_bar_chart(result):
+    data = {
+        "Category": SECTORS,
+        "2015": [
+            round(GHG_SEQ, 1),
+            round(GHG_RES, 1),
+            round(GHG_CI, 1),
+            round(GHG_HIGHWAY, 1),
+            round(GHG_RAIL, 1),
+            round(GHG_AVIATION, 1),
+            round(GHG_OTHER_MOBILE, 1),
+            round(GHG_NON_ENERGY, 1),
+        ],
+        "Scenario": [round(result.ghg[key], 1) for key in SECTOR_KEYS],
+    }
+    return data
+
+
+def wrangle_data_for_stacked_chart(result):
+    # Transpose data
+    data = {
+        "Year": ["2015", "Scenario"],
+        "Carbon Sequestration & Storage": [GHG_SEQ, result.ghg["seq"]],
+        "Residential Stationary Energy": [GHG_RES, result.ghg["res"]],
+        "Non-Residential Stationary Energy": [GHG_CI, result.ghg["ci"]],
+        "On-Road Motor Vehicles": [GHG_HIGHWAY, result.ghg["highway"]],
+        "Rail": [GHG_RAIL, result.ghg["rail"]],
+        "Aviation": [GHG_AVIATION, result.ghg["aviation"]],
+        "Other Mobile Energy": [GHG_OTHER_MOBILE, result.ghg["other_mobile"]],
+        "Non-Energy": [GHG_NON_ENERGY, result.ghg["non_energy"]],
+    }
+    return data
+
+
+def wrangle_pos_data_for_stacked_chart(result):
+    # Transpose data
+    data = {
+        "Year": ["2015", "Scenario"],
+        "Residential Stationary Energy": [GHG_RES, result.ghg["res"]],
+        "Non-Residential Stationary Energy": [GHG_CI, result.ghg["ci"]],
+        "On-Road Motor Vehicles": [GHG_HIGHWAY, result.ghg["highway"]],
+        "Rail": [GHG_RAIL, result.ghg["rail"]],
+        "Aviation": [GHG_AVIATION, result.ghg["aviation"]],
+        "Other Mobile Energy": [GHG_OTHER_MOBILE, result.ghg["other_mobile"]],
+        "Non-Energy": [GHG_NON_ENERGY, result.ghg["non_energy"]],
+    }
+    return data
+
+
+def wrangle_neg_data_for_stacked_chart(result):
+    # Transpose data
+    data = {
+        "Year": ["2015", "Scenario"],
+        "Carbon Sequestration & Storage": [GHG_SEQ, result.ghg["seq"]],
+    }
+    return data
+
+
+def wrangle_data_for_charts(scenario):
+    """
+    Evaluate *scenario* (a ScenarioState) and return the data of the charts every page has,
+    keyed "bar", "positive" and "negative" (the parts of the stacked chart).
+    """
+    result = scenario.evaluate()
+    return {
+        "bar": wrangle_data_for_bar_chart(result),
+        "positive": wrangle_pos_data_for_stacked_chart(result),
+        "negative": wrangle_neg_data_for_stacked_chart(result),
+    }
+
+
+"""
+The functions below take a PathwayResult (see pathway.py) and return the data of the stacked
+chart with a bar for each year, so create_stacked_chart() can draw a pathway too.
+"""
+
+
+def wrangle_pos_data_for_pathway_chart(result):
+    data = {
+        "Year": [str(year) for year in result.years],
+        "Residential Stationary Energy": result.ghg["res"].tolist(),
+        "Non-Residential Stationary Energy": result.ghg["ci"].tolist(),
+        "On-Road Motor Vehicles": result.ghg["highway"].tolist(),
+        "Rail": result.ghg["rail"].tolist(),
+        "Aviation": result.ghg["aviation"].tolist(),
+        "Other Mobile Energy": result.ghg["other_mobile"].tolist(),
+        "Non-Energy": result.ghg["non_energy"].tolist(),
+    }
+    return data
+
+
+def wrangle_neg_data_for_pathway_chart(result):
+    data = {
+        "Year": [str(year) for year in result.years],
+        "Carbon Sequestration & Storage": result.ghg["seq"].tolist(),
+    }
+    return data
+
+
+def wrangle_data_for_pie_chart(user_inputs):
+    """Configure data and plot for pie chart."""
+    x = {
+        "Coal": user_inputs["grid_coal"],
+        "Oil": user_inputs["grid_oil"],
+        "Natural Gas": user_inputs["grid_ng"],
+        "Nuclear": user_inputs["grid_nuclear"],
+        "Solar": user_inputs["grid_solar"],
+        "Wind": user_inputs["grid_wind"],
+        "Biomass": user_inputs["grid_bio"],
+        "Hydropower": user_inputs["grid_hydro"],
+        "Geothermal": user_inputs["grid_geo"],
+        "Other Fossil Fuel": user_inputs["grid_other_ff"],
+    }
+
+    data = pd.Series(x).reset_index(name="percentage").rename(columns={"index": "fuel_type"})
+    data["angle"] = data["percentage"] / data["percentage"].sum() * 2 * pi
+    data["color"] = Spectral10
+
+    return data
+
+
+def update_source(source, data):
+    """
+    Update the ColumnDataSource *source* with *data* (as created by the functions above).
+
+    Only the cells that changed are sent to the browser, with source.patch(), rather than all of
+    *data*: the 2015 values and the labels never change, and most levers only change a sector or
+    two. If *data* has other columns or lengths than *source*, it replaces the source's data.
+    """
+    if isinstance(data, pd.DataFrame):
+        data = ColumnDataSource.from_df(data)
+    current = source.data
+    if set(data) != set(current) or any(len(data[key]) != len(current[key]) for key in data):
+        source.data = data
+        return
+    patches = {}
+    for key, values in data.items():
+        changed = [(i, new) for i, (old, new) in enumerate(zip(current[key], values)) if old != new]
+        if changed:
+            patches[key] = changed
+    if patches:
+        source.patch(patches)
+
+
+##############################
+# Functions to create charts #
+##############################
+
+"""
+We need these functions that create the charts - rather than creating the charts directly and
+importing them into the appropriate view - because bokeh requires that each Figure be in only
+one document, otherwise it seems that multiple users could be changing the same chart/input
+at the same time. So main/views.py imports these functions, and then individual views create
+the charts as needed.
+
+Additionally, the data/source (for the bar chart and stacked bar chart) and source (for pie chart)
+are created outside these functions and then used as parameters because, in order to update the
+chart, we need to update the source (with update_source()) after user inputs change. Otherwise,
+they could be created at the top of each function and then used within them.
+"""
+
+
+def create_bar_chart(data, source):
+    """
+    Return a figure object.
+
+    *data* is output of wrangle_data_for_bar_chart().
+
+    *source* is the result of feeding *data* into bokeh's ColumnDataSource().
+    """
+    bar_chart = figure(
+        x_range=data["Category"],
+        y_range=(-25, 50),
+        plot_height=500,
+        plot_width=750,
+        y_axis_label="Million Metric Tons of CO2e",
+        title="Greenhouse Gas Emissions in Greater Philadelphia",
+        name="barchart",
+        toolbar_location="below",
+    )
+    bar_chart.vbar(
+        x=dodge("Category", -0.15, range=bar_chart.x_range),
+        top="2015",
+        source=source,
+        width=0.2,
+        color="steelblue",
+        legend_label="2015",
+    )
+    bar_chart.vbar(
+        x=dodge("Category", 0.15, range=bar_chart.x_range),
+        top="Scenario",
+        source=source,
+        width=0.2,
+        color="darkseagreen",
+        legend_label="Scenario",
+    )
+    bar_chart.xaxis.major_label_orientation = np.pi / 4
+    bar_chart.x_range.range_padding = 0.1
+
+    labels_scenario = LabelSet(
+        x=dodge("Category", 0.15, range=bar_chart.x_range),
+        y="Scenario",
+        x_offset=4,
+        y_offset=5,
+        text="Scenario",
+        text_font_size="10px",
+        angle=1.57,
+        level="glyph",
+        source=source,
+    )
+    labels_2015 = LabelSet(
+        x=dodge("Category", 0.15, range=bar_chart.x_range),
+        y="2015",
+        x_offset=-10,
+        y_offset=5,
+        text="2015",
+        text_font_size="10px",
+        angle=1.57,
+        level="glyph",
+        source=source,
+    )
+    bar_chart.add_layout(labels_scenario)
+    bar_chart.add_layout(labels_2015)
+    bar_chart.add_layout(bar_chart.legend[0], "right")
+
+    return bar_chart
+
+
+POS_SECTORS = [
+    "Residential Stationary Energy",
+    "Non-Residential Stationary Energy",
+    "On-Road Motor Vehicles",
+    "Rail",
+    "Aviation",
+    "Other Mobile Energy",
+    "Non-Energy",
+]
+
+
+def create_stacked_chart(positive_data, negative_data, positive_source, negative_source):
+    """
+    Return a figure object.
+
+    *positive_data* is output of wrangle_data_for_stacked_chart().
+
+    *source* is the result of feeding *data* into bokeh's ColumnDataSource().
+    """
+    stacked_bar_chart = figure(
+        x_range=positive_data["Year"],
+        y_range=(-50, 100),
+        plot_height=500,
+        plot_width=500,
+        y_axis_label="Million Metric Tons of CO2e",
+        title="Greenhouse Gas Emissions in Greater Philadelphia",
+        toolbar_location="below",
+    )
+    stacked_bar_chart.vbar_stack(
+        ["Carbon Sequestration & Storage"],
+        x="Year",
+        width=0.4,
+        color=Viridis8[:1],
+        source=negative_source,
+        legend_label=["Carbon Sequestration & Storage"],
+    )
+    stacked_bar_chart.vbar_stack(
+        POS_SECTORS,
+        x="Year",
+        width=0.4,
+        color=Viridis8[1:],
+        source=positive_source,
+        legend_label=POS_SECTORS,
+    )
+    stacked_bar_chart.legend[0].items.reverse()  # Reverse legend items to match order in stack
+    stacked_bar_chart_legend = stacked_bar_chart.legend[0]
+    stacked_bar_chart.add_layout(stacked_bar_chart_legend, "right")
+
+    return stacked_bar_chart
+
+
+def create_pie_chart(source):
+    """
+    Return a figure object.
+
+    *source* is the result of feeding the output from wrangle_data_for_piechart() into
+    bokeh's ColumnDataSource().
+    """
+    pie_chart = figure(
+        title="Electricity Grid Resource Mix",
+        toolbar_location="below",
+        plot_height=400,
+        plot_width=750,
+        tooltips="@fuel_type: @percentage",
+        x_range=(-0.5, 1.0),
+    )
+    pie_chart.wedge(
+        x=0,
+        y=1,
+        radius=0.3,
+        start_angle=cumsum("angle", include_zero=True),
+        end_angle=cumsum("angle"),
+        line_color="white",
+        fill_color="color",
+        legend_field="fuel_type",
+        source=source,
+    )
+    pie_chart.axis.axis_label = None
+    pie_chart.axis.visible = False
+    pie_chart.grid.grid_line_color = None
+    pie_chart.add_layout(pie_chart.legend[0], "right")
+
+    return pie_chart
@@ -0,0 +1,15 @@
+"""
+The Bokeh app of every page of the calculator. Serve it with
+
+    bokeh serve bokeh_apps/ghg.py
+
+and open a page with its name (a key of pages.PAGES) as the page argument, e.g. /ghg?page=res.
+"""
+
+from bokeh.plotting import curdoc
+
+from pages import create_page
+
+doc = curdoc()
+arguments = doc.session_context.request.arguments if doc.session_context else {}
+create_page(doc, arguments.get("page", [b"pop"])[0].decode())
@@ -1,14 +1,15 @@
-from math import pi
-from statistics import mean
-
-import numpy as np
-import pandas as pd
+"""
+The emissions model: its constants, the user inputs it takes and the functions that calculate
+GHG emissions from them.
 
-from bokeh.models import LabelSet
-from bokeh.palettes import Viridis7, Viridis8, Spectral10
-from bokeh.plotting import figure
-from bokeh.transform import dodge, cumsum
+This module only uses the standard library, so that it can be imported quickly by anything
+that needs the model without the charts; the charts are in charts.py.
+"""
 
+from collections import namedtuple
+from functools import lru_cache
+from statistics import mean
+from types import MappingProxyType
 
 # Implied National Emissions rate from NG Transmission, Storage, Distribution (fugitive emissions in MMTCO2e/million CF)
 NE_CO2_MMT_NG_METHANE = 0.00000169
@@ -414,6 +415,57 @@ CI_ENERGY_FF_PET_COKE = CI_ENERGY_PET_COKE / CI_ENERGY_FF
 CI_ENERGY_FF_STILL_GAS = CI_ENERGY_STILL_GAS / CI_ENERGY_FF
 CI_ENERGY_FF_NAPHTHAS = CI_ENERGY_NAPHTHAS / CI_ENERGY_FF
 
+# constants of each fossil fuel, aligned with CI_FUELS
+CI_FUELS = ("NG", "COAL", "DFO", "K", "LPG", "MG", "RFO", "PET_COKE", "STILL_GAS", "NAPHTHAS")
+CI_FUEL_BTU = (
+    CI_NG_BTU,
+    CI_COAL_BTU,
+    CI_DFO_BTU,
+    CI_K_BTU,
+    CI_LPG_BTU,
+    CI_MG_BTU,
+    CI_RFO_BTU,
+    CI_PET_COKE_BTU,
+    CI_STILL_GAS_BTU,
+    CI_NAPHTHAS_BTU,
+)
+CI_FUEL_USEFUL = (
+    CI_NG_USEFUL,
+    CI_COAL_USEFUL,
+    CI_DFO_USEFUL,
+    CI_K_USEFUL,
+    CI_LPG_USEFUL,
+    CI_MG_USEFUL,
+    CI_RFO_USEFUL,
+    CI_PET_COKE_USEFUL,
+    CI_STILL_GAS_USEFUL,
+    CI_NAPHTHAS_USEFUL,
+)
+CI_FUEL_FF_SHARE = (
+    CI_ENERGY_FF_NG,
+    CI_ENERGY_FF_COAL,
+    CI_ENERGY_FF_DFO,
+    CI_ENERGY_FF_K,
+    CI_ENERGY_FF_LPG,
+    CI_ENERGY_FF_MG,
+    CI_ENERGY_FF_RFO,
+    CI_ENERGY_FF_PET_COKE,
+    CI_ENERGY_FF_STILL_GAS,
+    CI_ENERGY_FF_NAPHTHAS,
+)
+CI_FUEL_CO2_MT_BBTU = (
+    CO2_MT_BBTU_NG,
+    CO2_MT_BBTU_COAL,
+    CO2_MT_BBTU_DFO,
+    CO2_MT_BBTU_KER,
+    CO2_MT_BBTU_LPG,
+    CO2_MT_BBTU_MG,
+    CO2_MT_BBTU_RFO,
+    CO2_MT_BBTU_PETCOKE,
+    CO2_MT_BBTU_STILL_GAS,
+    CO2_MT_BBTU_NAPHTHAS,
+)
+
 ############################
 # Mobile-Highway GHG Factors
 
@@ -533,53 +585,191 @@ OR_FF_MG_ENERGY_MOTION = OR_MG_ENERGY_MOTION / OR_FF_ENERGY_MOTION * 100
 OR_FF_DFO_ENERGY_MOTION = OR_DFO_ENERGY_MOTION / OR_FF_ENERGY_MOTION * 100
 OR_FF_LPG_ENERGY_MOTION = OR_LPG_ENERGY_MOTION / OR_FF_ENERGY_MOTION * 100
 
-# create dictionary (and set initial values) of all variables that user can change
-# will be passed to functions that create charts
-user_inputs = {
-    "grid_coal": GRID_COAL,
-    "grid_oil": GRID_OIL,
-    "grid_ng": GRID_NG,
-    "grid_nuclear": GRID_NUCLEAR,
-    "grid_solar": GRID_SOLAR,
-    "grid_wind": GRID_WIND,
-    "grid_bio": GRID_BIO,
-    "grid_hydro": GRID_HYDRO,
-    "grid_geo": GRID_GEO,
-    "grid_other_ff": GRID_OTHER_FF,
-    "change_pop": 0,
-    "urban_pop_percent": URBAN_POP_PERCENT,
-    "rural_pop_percent": RURAL_POP_PERCENT,
-    "suburban_pop_percent": SUBURBAN_POP_PERCENT,
-    "rur_energy_elec": RUR_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
-    "sub_energy_elec": SUB_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
-    "urb_energy_elec": URB_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
-    "res_energy_change": 0,
-    "ci_energy_elec": CI_ENERGY_ELEC,
-    "ci_energy_change": 0,
-    "change_industrial_processes": 0,
-    "reg_fleet_mpg": REG_FLEET_MPG,
-    "change_veh_miles": 0,
-    "veh_miles_elec": 0,
-    "rt_energy_elec_motion": RT_ENERGY_ELEC_MOTION,
-    "change_rail_transit": 0,
-    "f_energy_elec_motion": F_ENERGY_ELEC_MOTION,
-    "change_freight_rail": 0,
-    "icr_energy_elec_motion": ICR_ENERGY_ELEC_MOTION,
-    "change_inter_city_rail": 0,
-    "mp_energy_elec_motion": MP_ENERGY_ELEC_MOTION,
-    "change_marine_port": 0,
-    "or_energy_elec_motion": OR_ENERGY_ELEC_MOTION,
-    "change_off_road": 0,
-    "change_air_travel": 0,
-    "ff_carbon_capture": 0,
-    "air_capture": 0,
-    "change_forest": PER_ANNUAL_FOREST_CHANGE_2015,
-    "change_urban_trees": 0,
-    "change_ag": 0,
-    "change_solid_waste": 0,
-    "change_wastewater": 0,
+# initial values of all variables that user can change. This is shared by every session, so it
+# is read-only; each session changes its own copy (see scenario.py)
+user_inputs = MappingProxyType(
+    {
+        "grid_coal": GRID_COAL,
+        "grid_oil": GRID_OIL,
+        "grid_ng": GRID_NG,
+        "grid_nuclear": GRID_NUCLEAR,
+        "grid_solar": GRID_SOLAR,
+        "grid_wind": GRID_WIND,
+        "grid_bio": GRID_BIO,
+        "grid_hydro": GRID_HYDRO,
+        "grid_geo": GRID_GEO,
+        "grid_other_ff": GRID_OTHER_FF,
+        "change_pop": 0,
+        "urban_pop_percent": URBAN_POP_PERCENT,
+        "rural_pop_percent": RURAL_POP_PERCENT,
+        "suburban_pop_percent": SUBURBAN_POP_PERCENT,
+        "rur_energy_elec": RUR_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
+        "sub_energy_elec": SUB_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
+        "urb_energy_elec": URB_ENERGY_ELEC * 100,  # convert to % b/c func will take user % later
+        "res_energy_change": 0,
+        "ci_energy_elec": CI_ENERGY_ELEC,
+        "ci_energy_change": 0,
+        "change_industrial_processes": 0,
+        "reg_fleet_mpg": REG_FLEET_MPG,
+        "change_veh_miles": 0,
+        "veh_miles_elec": 0,
+        "rt_energy_elec_motion": RT_ENERGY_ELEC_MOTION,
+        "change_rail_transit": 0,
+        "f_energy_elec_motion": F_ENERGY_ELEC_MOTION,
+        "change_freight_rail": 0,
+        "icr_energy_elec_motion": ICR_ENERGY_ELEC_MOTION,
+        "change_inter_city_rail": 0,
+        "mp_energy_elec_motion": MP_ENERGY_ELEC_MOTION,
+        "change_marine_port": 0,
+        "or_energy_elec_motion": OR_ENERGY_ELEC_MOTION,
+        "change_off_road": 0,
+        "change_air_travel": 0,
+        "ff_carbon_capture": 0,
+        "air_capture": 0,
+        "change_forest": PER_ANNUAL_FOREST_CHANGE_2015,
+        "change_urban_trees": 0,
+        "change_ag": 0,
+        "change_solid_waste": 0,
+        "change_wastewater": 0,
+    }
+)
+
+SliderRange = namedtuple("SliderRange", ["start", "end", "step"])
+
+# The range of the slider for each user input that has one in the apps
+SLIDER_RANGES = {
+    "change_pop": SliderRange(-100, 100, 10),
+    "urb_energy_elec": SliderRange(URB_ELEC_OTHER_BTU / URB_ENERGY_BTU * 100, 100, 1),
+    "sub_energy_elec": SliderRange(SUB_ELEC_OTHER_BTU / SUB_ENERGY_BTU * 100, 100, 1),
+    "rur_energy_elec": SliderRange(RUR_ELEC_OTHER_BTU / RUR_ENERGY_BTU * 100, 100, 1),
+    "res_energy_change": SliderRange(-100, 100, 10),
+    "ci_energy_elec": SliderRange(CI_ENERGY_ELEC, 100, 1),
+    "ci_energy_change": SliderRange(-100, 100, 10),
+    "change_industrial_processes": SliderRange(-100, 100, 1),
+    "reg_fleet_mpg": SliderRange(1, 100, 1),
+    "change_veh_miles": SliderRange(-100, 100, 1),
+    "veh_miles_elec": SliderRange(0, 100, 1),
+    "rt_energy_elec_motion": SliderRange(0, 100, 1),
+    "change_rail_transit": SliderRange(-100, 100, 1),
+    "f_energy_elec_motion": SliderRange(0, 100, 1),
+    "change_freight_rail": SliderRange(-100, 100, 1),
+    "icr_energy_elec_motion": SliderRange(0, 100, 1),
+    "change_inter_city_rail": SliderRange(-100, 100, 1),
+    "mp_energy_elec_motion": SliderRange(0, 100, 1),
+    "change_marine_port": SliderRange(-100, 100, 1),
+    "or_energy_elec_motion": SliderRange(0, 100, 1),
+    "change_off_road": SliderRange(-100, 100, 1),
+    "change_air_travel": SliderRange(-100, 100, 1),
+    "ff_carbon_capture": SliderRange(0, 100, 1),
+    "air_capture": SliderRange(0, 100, 1),
+    "change_forest": SliderRange(-20, 20, 1),
+    "change_urban_trees": SliderRange(-100, 100, 1),
+    "change_ag": SliderRange(-100, 100, 1),
+    "change_solid_waste": SliderRange(-100, 100, 1),
+    "change_wastewater": SliderRange(-100, 100, 1),
 }
 
+# Percentages that have to add up to 100, give or take MIX_TOLERANCE
+MIXES = {
+    "grid mix": [key for key in user_inputs if key.startswith("grid_")],
+    "population split": ["urban_pop_percent", "suburban_pop_percent", "rural_pop_percent"],
+}
+MIX_TOLERANCE = 0.1
+
+
+def input_range(key):
+    """
+    Return the lowest and highest values of user input *key*: the range of its slider, or 0 to
+    100 for the percentages without one.
+    """
+    if key in SLIDER_RANGES:
+        return SLIDER_RANGES[key].start, SLIDER_RANGES[key].end
+    return 0, 100
+
+
+# The user inputs with sliders on each page, keyed by the name of the page (see pages.py)
+PAGE_SLIDERS = {
+    "aviation": ["change_air_travel"],
+    "non_energy": [
+        "change_ag",
+        "change_solid_waste",
+        "change_wastewater",
+        "change_industrial_processes",
+    ],
+    "non_res": ["ci_energy_change", "ci_energy_elec"],
+    "on_road": ["change_veh_miles", "veh_miles_elec", "reg_fleet_mpg"],
+    "other": [
+        "change_marine_port",
+        "mp_energy_elec_motion",
+        "change_off_road",
+        "or_energy_elec_motion",
+    ],
+    "pop": ["change_pop"],
+    "rail": [
+        "change_rail_transit",
+        "rt_energy_elec_motion",
+        "change_freight_rail",
+        "f_energy_elec_motion",
+        "change_inter_city_rail",
+        "icr_energy_elec_motion",
+    ],
+    "res": ["res_energy_change", "urb_energy_elec", "sub_energy_elec", "rur_energy_elec"],
+    "seq": ["change_urban_trees", "change_forest", "ff_carbon_capture", "air_capture"],
+}
+
+# The values the inputs on a page start at, where they aren't their baseline values: a TextInput
+# shows its value rounded to one decimal place, and the forest slider starts at no change. As
+# every input on a page is sent when the user changes any of them, these are what's evaluated.
+PAGE_START_VALUES = {
+    "pop": {
+        key: round(user_inputs[key], 1)
+        for key in ["urban_pop_percent", "suburban_pop_percent", "rural_pop_percent"]
+    },
+    "grid": {key: round(user_inputs[key], 1) for key in user_inputs if key.startswith("grid_")},
+    "seq": {"change_forest": 0},
+}
+
+
+def page_inputs(page):
+    """Return the user inputs as they are when *page* starts (see PAGE_START_VALUES)."""
+    return dict(user_inputs, **PAGE_START_VALUES.get(page, {}))
+
+
+class GridMix:
+    """
+    The carbon intensity of electricity generated by a grid mix, given the percentages of
+    electricity generated from coal, natural gas, oil and other fossil fuels.
+
+    Every sector that uses electricity takes its emissions from the same grid mix, so use
+    grid_mix() to get the (cached) GridMix for a scenario rather than creating one.
+    """
+
+    def __init__(self, grid_coal, grid_ng, grid_oil, grid_other_ff):
+        self.grid_coal = grid_coal
+        self.grid_ng = grid_ng
+        self.grid_oil = grid_oil
+        self.grid_other_ff = grid_other_ff
+
+        # lbs CO2 per MWh generated
+        self.lb_mwh = (
+            (grid_coal / 100 * CO2_LB_MWH_COAL)
+            + (grid_oil / 100 * CO2_LB_MWH_OIL)
+            + (grid_ng / 100 * CO2_LB_MWH_NG)
+            + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
+        )
+        # MMTCO2e per MWh generated
+        self.mmt_mwh = self.lb_mwh * MMT_LB
+
+    def elec_ghg(self, elec_btu):
+        """Return MMTCO2e from generating *elec_btu* of electricity, including grid losses."""
+        return elec_btu * (1 / BTU_MWH) / (1 - GRID_LOSS) * self.mmt_mwh
+
+
+@lru_cache(maxsize=256)
+def grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff):
+    """Return the GridMix for the percentages of the grid mix from each fossil fuel."""
+    return GridMix(grid_coal, grid_ng, grid_oil, grid_other_ff)
+
 
 def calc_res_ghg(
     grid_coal,
@@ -869,20 +1059,7 @@ def calc_res_ghg(
 
     # Calculate GHG emissions
     res_elec_btu = urban_elec_btu + suburban_elec_btu + rural_elec_btu
-    res_elec_ghg = (
-        res_elec_btu
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
-    )
+    res_elec_ghg = grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff).elec_ghg(res_elec_btu)
     res_ng_btu = urban_ng_btu + suburban_ng_btu + rural_ng_btu
     res_ng_ghg = (
         res_ng_btu
@@ -910,7 +1087,7 @@ def calc_res_ghg(
     return res_ghg, res_ng_btu, res_elec_btu
 
 
-def calc_ci_ghg(
+def calc_ci_ghg_by_fuel(
     ci_energy_elec,
     grid_coal,
     grid_ng,
@@ -918,6 +1095,10 @@ def calc_ci_ghg(
     grid_other_ff,
     ci_energy_change,
 ):
+    """
+    Return C&I GHG emissions (MMTCO2e) by fuel, a dict keyed by "ELEC" and CI_FUELS, and the
+    BTU of electricity consumed.
+    """
     ci_ff = 100 - ci_energy_elec
     change_ff = (ci_ff - CI_ENERGY_FF) / CI_ENERGY_FF
 
@@ -928,147 +1109,32 @@ def calc_ci_ghg(
         / CI_ELEC_USEFUL
         * 1000000000
     )
-    ci_elec_ghg = (
-        ci_elec_btu
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
-    )
-
-    ci_ng_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_NG
-        / CI_NG_USEFUL
-        * CO2_MT_BBTU_NG
-        * MT_TO_MMT
-    )
-
-    ci_coal_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_COAL
-        / CI_COAL_USEFUL
-        * CO2_MT_BBTU_COAL
-        * MT_TO_MMT
-    )
-
-    ci_dfo_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_DFO
-        / CI_DFO_USEFUL
-        * CO2_MT_BBTU_DFO
-        * MT_TO_MMT
-    )
-
-    ci_k_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_K
-        / CI_K_USEFUL
-        * CO2_MT_BBTU_KER
-        * MT_TO_MMT
-    )
+    ghg = {"ELEC": grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff).elec_ghg(ci_elec_btu)}
 
-    ci_lpg_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_LPG
-        / CI_LPG_USEFUL
-        * CO2_MT_BBTU_LPG
-        * MT_TO_MMT
-    )
-
-    ci_motor_gas_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_MG
-        / CI_MG_USEFUL
-        * CO2_MT_BBTU_MG
-        * MT_TO_MMT
-    )
-
-    ci_rfo_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_RFO
-        / CI_RFO_USEFUL
-        * CO2_MT_BBTU_RFO
-        * MT_TO_MMT
-    )
-
-    ci_pet_coke_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_PET_COKE
-        / CI_PET_COKE_USEFUL
-        * CO2_MT_BBTU_PETCOKE
-        * MT_TO_MMT
-    )
+    ci_ff_btu = CI_ENERGY_BTU * (1 + ci_energy_change / 100) * (ci_ff / 100) * (1 + change_ff)
+    for fuel, ff_share, useful, co2_mt_bbtu in zip(
+        CI_FUELS, CI_FUEL_FF_SHARE, CI_FUEL_USEFUL, CI_FUEL_CO2_MT_BBTU
+    ):
+        ghg[fuel] = ci_ff_btu * ff_share / useful * co2_mt_bbtu * MT_TO_MMT
 
-    ci_still_gas_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_STILL_GAS
-        / CI_STILL_GAS_USEFUL
-        * CO2_MT_BBTU_STILL_GAS
-        * MT_TO_MMT
-    )
+    return ghg, ci_elec_btu
 
-    ci_naphthas_ghg = (
-        CI_ENERGY_BTU
-        * (1 + ci_energy_change / 100)
-        * (ci_ff / 100)
-        * (1 + change_ff)
-        * CI_ENERGY_FF_NAPHTHAS
-        / CI_NAPHTHAS_USEFUL
-        * CO2_MT_BBTU_NAPHTHAS
-        * MT_TO_MMT
-    )
 
-    return (
-        (
-            ci_elec_ghg
-            + ci_ng_ghg
-            + ci_coal_ghg
-            + ci_dfo_ghg
-            + ci_k_ghg
-            + ci_lpg_ghg
-            + ci_motor_gas_ghg
-            + ci_rfo_ghg
-            + ci_pet_coke_ghg
-            + ci_still_gas_ghg
-            + ci_naphthas_ghg
-        ),
-        ci_elec_btu,
+def calc_ci_ghg(
+    ci_energy_elec,
+    grid_coal,
+    grid_ng,
+    grid_oil,
+    grid_other_ff,
+    ci_energy_change,
+):
+    ghg_by_fuel, ci_elec_btu = calc_ci_ghg_by_fuel(
+        ci_energy_elec, grid_coal, grid_ng, grid_oil, grid_other_ff, ci_energy_change
     )
+    ci_ghg = ghg_by_fuel["ELEC"]
+    for fuel in CI_FUELS:
+        ci_ghg = ci_ghg + ghg_by_fuel[fuel]
+    return ci_ghg, ci_elec_btu
 
 
 def calc_highway_ghg(
@@ -1096,18 +1162,10 @@ def calc_highway_ghg(
 
     highway_ghg = (
         veh_miles_traveled - elec_miles_percent
-    ) / reg_fleet_mpg * CO2_LB_GAL_GAS * MMT_LB + (
-        elec_miles_percent
-        * ELEC_VEH_EFFICIENCY
-        * 0.001
-        / (1 - GRID_LOSS)
-        * (
-            (grid_coal / 100 * CO2_LB_MWH_COAL)
-            + (grid_oil / 100 * CO2_LB_MWH_OIL)
-            + (grid_ng / 100 * CO2_LB_MWH_NG)
-            + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-        )
-        * MMT_LB
+    ) / reg_fleet_mpg * CO2_LB_GAL_GAS * MMT_LB + grid_mix(
+        grid_coal, grid_ng, grid_oil, grid_other_ff
+    ).elec_ghg(
+        highway_elec_btu
     )
 
     return highway_ghg, highway_elec_btu
@@ -1133,26 +1191,17 @@ def calc_rail_ghg(
     change_freight_rail,
     change_inter_city_rail,
 ):
-    transit_elec_ghg = (
+    grid = grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff)
+
+    transit_elec_ghg = grid.elec_ghg(
         POP
         * (1 + change_pop / 100)
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
         * (
             (urban_pop_percent / 100 * RT_ENERGY_MOTION_URB * rt_energy_elec_motion / 100)
             + (suburban_pop_percent / 100 * RT_ENERGY_MOTION_SUB * rt_energy_elec_motion / 100)
             + (rural_pop_percent / 100 * RT_ENERGY_MOTION_RUR * rt_energy_elec_motion / 100)
         )
         / (RT_ELEC_ENERGY_MOTION / 100)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
     )
 
     transit_d_ghg = (
@@ -1189,22 +1238,8 @@ def calc_rail_ghg(
         / (RT_ELEC_ENERGY_MOTION / 100)
     ) * (1 + change_rail_transit / 100)
 
-    f_elec_ghg = (
-        F_ENERGY_MOTION
-        * (f_energy_elec_motion / 100)
-        / (RT_ELEC_ENERGY_MOTION / 100)
-        * 1000000000
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
+    f_elec_ghg = grid.elec_ghg(
+        F_ENERGY_MOTION * (f_energy_elec_motion / 100) / (RT_ELEC_ENERGY_MOTION / 100) * 1000000000
     )
 
     f_elec_btu = (
@@ -1225,22 +1260,11 @@ def calc_rail_ghg(
 
     f_ghg = (f_elec_ghg + f_d_ghg) * (1 + change_freight_rail / 100)
 
-    icr_elec_ghg = (
+    icr_elec_ghg = grid.elec_ghg(
         ICR_ENERGY_MOTION
         * (icr_energy_elec_motion / 100)
         / (RT_ELEC_ENERGY_MOTION / 100)
         * 1000000000
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
     )
 
     icr_d_ghg = (
@@ -1279,25 +1303,13 @@ def calc_other_mobile_ghg(
     vehicles and equipment.
     """
 
+    grid = grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff)
+
     mp_ff_motion = 100 - mp_energy_elec_motion
     mp_percent_changed_ff_motion = (mp_ff_motion - MP_FF_ENERGY_MOTION) / MP_FF_ENERGY_MOTION
 
-    mp_elec_ghg = (
-        MP_ENERGY_MOTION_BBTU
-        * (mp_energy_elec_motion / 100)
-        / (MP_ELEC_MOTION / 100)
-        * 1000000000
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
+    mp_elec_ghg = grid.elec_ghg(
+        MP_ENERGY_MOTION_BBTU * (mp_energy_elec_motion / 100) / (MP_ELEC_MOTION / 100) * 1000000000
     )
 
     mp_elec_btu = (
@@ -1333,22 +1345,8 @@ def calc_other_mobile_ghg(
     or_ff_motion = 100 - or_energy_elec_motion
     or_percent_changed_ff_motion = (or_ff_motion - OR_FF_ENERGY_MOTION) / OR_FF_ENERGY_MOTION
 
-    or_elec_ghg = (
-        OR_ENERGY_MOTION_BBTU
-        * (or_energy_elec_motion / 100)
-        / (OR_ELEC_MOTION / 100)
-        * 1000000000
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-            * MMT_LB
-        )
+    or_elec_ghg = grid.elec_ghg(
+        OR_ENERGY_MOTION_BBTU * (or_energy_elec_motion / 100) / (OR_ELEC_MOTION / 100) * 1000000000
     )
 
     or_elec_btu = (
@@ -1435,11 +1433,6 @@ def calc_non_energy_ghg(
     suburban_pop_percent,
     urban_pop_percent,
 ):
-    ag_ghg = GHG_AG * (1 + change_ag / 100)
-    solid_waste_ghg = GHG_SOLID_WASTE * (1 + change_solid_waste / 100) * (1 + change_pop / 100)
-    wastewater_ghg = GHG_WASTEWATER * (1 + change_wastewater / 100) * (1 + change_pop / 100)
-    ip_ghg = GHG_IP * (1 + change_industrial_processes / 100)
-
     res_ng_consumption = calc_res_ghg(
         grid_coal,
         grid_ng,
@@ -1455,6 +1448,42 @@ def calc_non_energy_ghg(
         urban_pop_percent,
     )[1]
 
+    lulucf_ghg = calc_lulucf(change_forest, change_urban_trees)[1]
+
+    return calc_non_energy_ghg_from_parts(
+        res_ng_consumption,
+        lulucf_ghg,
+        ci_energy_elec,
+        ci_energy_change,
+        change_ag,
+        change_industrial_processes,
+        change_solid_waste,
+        change_wastewater,
+        change_pop,
+    )
+
+
+def calc_non_energy_ghg_from_parts(
+    res_ng_consumption,
+    lulucf_ghg,
+    ci_energy_elec,
+    ci_energy_change,
+    change_ag,
+    change_industrial_processes,
+    change_solid_waste,
+    change_wastewater,
+    change_pop,
+):
+    """
+    Calculate non-energy GHG emissions from already-calculated residential natural gas
+    consumption (BTU) and land use emissions, so that callers that have already run
+    calc_res_ghg() and calc_lulucf() don't have to run them again.
+    """
+    ag_ghg = GHG_AG * (1 + change_ag / 100)
+    solid_waste_ghg = GHG_SOLID_WASTE * (1 + change_solid_waste / 100) * (1 + change_pop / 100)
+    wastewater_ghg = GHG_WASTEWATER * (1 + change_wastewater / 100) * (1 + change_pop / 100)
+    ip_ghg = GHG_IP * (1 + change_industrial_processes / 100)
+
     ci_ff = 100 - ci_energy_elec
     change_ff = (ci_ff - CI_ENERGY_FF) / CI_ENERGY_FF
 
@@ -1476,8 +1505,6 @@ def calc_non_energy_ghg(
         * (NE_CO2_MMT_NG_METHANE + NE_CO2_MMT_NG_CO)
     )
 
-    lulucf_ghg = calc_lulucf(change_forest, change_urban_trees)[1]
-
     return ag_ghg + solid_waste_ghg + wastewater_ghg + ip_ghg + ng_systems_ghg + lulucf_ghg
 
 
@@ -1519,9 +1546,9 @@ def calc_sequestration(  # May need all inputs for electricity calculations belo
     air_capture,
 ):
 
-    lulucf_seq = calc_lulucf(change_forest, change_urban_trees)[0]
+    lulucf_seq, lulucf_ghg = calc_lulucf(change_forest, change_urban_trees)
 
-    res_elec_btu = calc_res_ghg(
+    res_ghg, res_ng_btu, res_elec_btu = calc_res_ghg(
         grid_coal,
         grid_ng,
         grid_oil,
@@ -1534,18 +1561,18 @@ def calc_sequestration(  # May need all inputs for electricity calculations belo
         rural_pop_percent,
         suburban_pop_percent,
         urban_pop_percent,
-    )[2]
+    )
 
-    ci_elec_btu = calc_ci_ghg(
+    ci_ghg, ci_elec_btu = calc_ci_ghg(
         ci_energy_elec,
         grid_coal,
         grid_ng,
         grid_oil,
         grid_other_ff,
         ci_energy_change,
-    )[1]
+    )
 
-    highway_elec_btu = calc_highway_ghg(
+    highway_ghg, highway_elec_btu = calc_highway_ghg(
         grid_coal,
         grid_ng,
         grid_oil,
@@ -1557,9 +1584,9 @@ def calc_sequestration(  # May need all inputs for electricity calculations belo
         suburban_pop_percent,
         urban_pop_percent,
         change_veh_miles,
-    )[1]
+    )
 
-    rail_elec_btu = calc_rail_ghg(
+    rail_ghg, rail_elec_btu = calc_rail_ghg(
         grid_coal,
         grid_ng,
         grid_oil,
@@ -1574,9 +1601,9 @@ def calc_sequestration(  # May need all inputs for electricity calculations belo
         icr_energy_elec_motion,
         change_freight_rail,
         change_inter_city_rail,
-    )[1]
+    )
 
-    om_elec_btu = calc_other_mobile_ghg(
+    om_ghg, om_elec_btu = calc_other_mobile_ghg(
         grid_coal,
         grid_ng,
         grid_oil,
@@ -1585,796 +1612,333 @@ def calc_sequestration(  # May need all inputs for electricity calculations belo
         change_marine_port,
         change_off_road,
         or_energy_elec_motion,
-    )[1]
+    )
+
+    non_energy_ghg = calc_non_energy_ghg_from_parts(
+        res_ng_btu,
+        lulucf_ghg,
+        ci_energy_elec,
+        ci_energy_change,
+        change_ag,
+        change_industrial_processes,
+        change_solid_waste,
+        change_wastewater,
+        change_pop,
+    )
 
     total_elec_btu = res_elec_btu + ci_elec_btu + highway_elec_btu + rail_elec_btu + om_elec_btu
+    gross_ghg = res_ghg + ci_ghg + highway_ghg + rail_ghg + om_ghg + non_energy_ghg
 
+    return calc_sequestration_from_totals(
+        grid_coal,
+        grid_ng,
+        grid_oil,
+        grid_other_ff,
+        total_elec_btu,
+        gross_ghg,
+        lulucf_seq,
+        ff_carbon_capture,
+        air_capture,
+    )
+
+
+def calc_sequestration_from_totals(
+    grid_coal,
+    grid_ng,
+    grid_oil,
+    grid_other_ff,
+    total_elec_btu,
+    gross_ghg,
+    lulucf_seq,
+    ff_carbon_capture,
+    air_capture,
+):
+    """
+    Calculate sequestration & storage from the total electric BTU and gross GHG emissions of
+    all other sectors, which callers that have already calculated those sectors can pass in.
+    """
     seq_source_capture = -(
-        total_elec_btu
-        * (1 / BTU_MWH)
-        / (1 - GRID_LOSS)
-        * (
-            (
-                (grid_coal / 100 * CO2_LB_MWH_COAL)
-                + (grid_oil / 100 * CO2_LB_MWH_OIL)
-                + (grid_ng / 100 * CO2_LB_MWH_NG)
-                + (grid_other_ff / 100 * CO2_LB_MWH_OTHER_FF)
-            )
-        )
-        * MMT_LB
+        grid_mix(grid_coal, grid_ng, grid_oil, grid_other_ff).elec_ghg(total_elec_btu)
         * ff_carbon_capture
         / 100
     )
 
-    gross_ghg = (
-        calc_res_ghg(
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            res_energy_change,
-            change_pop,
-            rur_energy_elec,
-            sub_energy_elec,
-            urb_energy_elec,
-            rural_pop_percent,
-            suburban_pop_percent,
-            urban_pop_percent,
-        )[0]
-        + calc_ci_ghg(
-            ci_energy_elec,
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            ci_energy_change,
-        )[0]
-        + calc_highway_ghg(
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            veh_miles_elec,
-            change_pop,
-            reg_fleet_mpg,
-            rural_pop_percent,
-            suburban_pop_percent,
-            urban_pop_percent,
-            change_veh_miles,
-        )[0]
-        + calc_rail_ghg(
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            change_rail_transit,
-            change_pop,
-            rural_pop_percent,
-            suburban_pop_percent,
-            urban_pop_percent,
-            rt_energy_elec_motion,
-            f_energy_elec_motion,
-            icr_energy_elec_motion,
-            change_freight_rail,
-            change_inter_city_rail,
-        )[0]
-        + calc_other_mobile_ghg(
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            mp_energy_elec_motion,
-            change_marine_port,
-            change_off_road,
-            or_energy_elec_motion,
-        )[0]
-        + calc_non_energy_ghg(
-            ci_energy_elec,
-            grid_coal,
-            grid_ng,
-            grid_oil,
-            grid_other_ff,
-            change_ag,
-            res_energy_change,
-            ci_energy_change,
-            change_forest,
-            change_industrial_processes,
-            change_urban_trees,
-            change_solid_waste,
-            change_wastewater,
-            change_pop,
-            rur_energy_elec,
-            sub_energy_elec,
-            urb_energy_elec,
-            rural_pop_percent,
-            suburban_pop_percent,
-            urban_pop_percent,
-        )
-    )
     seq_air_capture = -(gross_ghg + seq_source_capture + lulucf_seq) * air_capture / 100
 
     return seq_air_capture + seq_source_capture + lulucf_seq
 
 
-###########################
-# Prepare data for charts #
-###########################
+#######################
+# Evaluate a scenario #
+#######################
+
+# Keys for the sectors, in the same order as the sectors' names in charts.SECTORS
+SECTOR_KEYS = [
+    "seq",
+    "res",
+    "ci",
+    "highway",
+    "rail",
+    "aviation",
+    "other_mobile",
+    "non_energy",
+]
 
-SECTORS = [
-    "Carbon Seq. & Storage",
-    "Residential Stationary Energy",
-    "Non-Residential Stationary Energy",
-    "On-Road Motor Vehicles",
-    "Rail",
-    "Aviation",
-    "Other Mobile Energy",
-    "Non-Energy",
+# Keys for the sectors that consume electricity
+ELEC_SECTOR_KEYS = [
+    "res",
+    "ci",
+    "highway",
+    "rail",
+    "other_mobile",
 ]
 
+ScenarioResult = namedtuple("ScenarioResult", ["ghg", "elec_btu"])
+ScenarioResult.__doc__ = """
+Result of evaluating one scenario.
 
-def wrangle_data_for_bar_chart(user_inputs):
-    data = {
-        "Category": SECTORS,
-        "2015": [
-            round(GHG_SEQ, 1),
-            round(GHG_RES, 1),
-            round(GHG_CI, 1),
-            round(GHG_HIGHWAY, 1),
-            round(GHG_RAIL, 1),
-            round(GHG_AVIATION, 1),
-            round(GHG_OTHER_MOBILE, 1),
-            round(GHG_NON_ENERGY, 1),
-        ],
-        "Scenario": [
-            round(
-                calc_sequestration(
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["res_energy_change"],
-                    user_inputs["change_pop"],
-                    user_inputs["rur_energy_elec"],
-                    user_inputs["sub_energy_elec"],
-                    user_inputs["urb_energy_elec"],
-                    user_inputs["rural_pop_percent"],
-                    user_inputs["suburban_pop_percent"],
-                    user_inputs["urban_pop_percent"],
-                    user_inputs["ci_energy_elec"],
-                    user_inputs["ci_energy_change"],
-                    user_inputs["veh_miles_elec"],
-                    user_inputs["reg_fleet_mpg"],
-                    user_inputs["change_veh_miles"],
-                    user_inputs["change_rail_transit"],
-                    user_inputs["rt_energy_elec_motion"],
-                    user_inputs["f_energy_elec_motion"],
-                    user_inputs["icr_energy_elec_motion"],
-                    user_inputs["change_freight_rail"],
-                    user_inputs["change_inter_city_rail"],
-                    user_inputs["mp_energy_elec_motion"],
-                    user_inputs["change_marine_port"],
-                    user_inputs["change_off_road"],
-                    user_inputs["or_energy_elec_motion"],
-                    user_inputs["change_ag"],
-                    user_inputs["change_industrial_processes"],
-                    user_inputs["change_solid_waste"],
-                    user_inputs["change_wastewater"],
-                    user_inputs["change_forest"],
-                    user_inputs["change_urban_trees"],
-                    user_inputs["ff_carbon_capture"],
-                    user_inputs["air_capture"],
-                ),
-                1,
-            ),
-            round(
-                calc_res_ghg(
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["res_energy_change"],
-                    user_inputs["change_pop"],
-                    user_inputs["rur_energy_elec"],
-                    user_inputs["sub_energy_elec"],
-                    user_inputs["urb_energy_elec"],
-                    user_inputs["rural_pop_percent"],
-                    user_inputs["suburban_pop_percent"],
-                    user_inputs["urban_pop_percent"],
-                )[0],
-                1,
-            ),
-            round(
-                calc_ci_ghg(
-                    user_inputs["ci_energy_elec"],
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["ci_energy_change"],
-                )[0],
-                1,
-            ),
-            round(
-                calc_highway_ghg(
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["veh_miles_elec"],
-                    user_inputs["change_pop"],
-                    user_inputs["reg_fleet_mpg"],
-                    user_inputs["rural_pop_percent"],
-                    user_inputs["suburban_pop_percent"],
-                    user_inputs["urban_pop_percent"],
-                    user_inputs["change_veh_miles"],
-                )[0],
-                1,
-            ),
-            round(
-                calc_rail_ghg(
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["change_rail_transit"],
-                    user_inputs["change_pop"],
-                    user_inputs["rural_pop_percent"],
-                    user_inputs["suburban_pop_percent"],
-                    user_inputs["urban_pop_percent"],
-                    user_inputs["rt_energy_elec_motion"],
-                    user_inputs["f_energy_elec_motion"],
-                    user_inputs["icr_energy_elec_motion"],
-                    user_inputs["change_freight_rail"],
-                    user_inputs["change_inter_city_rail"],
-                )[0],
-                1,
-            ),
-            round(
-                calc_aviation_ghg(user_inputs["change_pop"], user_inputs["change_air_travel"]), 1
-            ),
-            round(
-                calc_other_mobile_ghg(
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["mp_energy_elec_motion"],
-                    user_inputs["change_marine_port"],
-                    user_inputs["change_off_road"],
-                    user_inputs["or_energy_elec_motion"],
-                )[0],
-                1,
-            ),
-            round(
-                calc_non_energy_ghg(
-                    user_inputs["ci_energy_elec"],
-                    user_inputs["grid_coal"],
-                    user_inputs["grid_ng"],
-                    user_inputs["grid_oil"],
-                    user_inputs["grid_other_ff"],
-                    user_inputs["change_ag"],
-                    user_inputs["res_energy_change"],
-                    user_inputs["ci_energy_change"],
-                    user_inputs["change_forest"],
-                    user_inputs["change_industrial_processes"],
-                    user_inputs["change_urban_trees"],
-                    user_inputs["change_solid_waste"],
-                    user_inputs["change_wastewater"],
-                    user_inputs["change_pop"],
-                    user_inputs["rur_energy_elec"],
-                    user_inputs["sub_energy_elec"],
-                    user_inputs["urb_energy_elec"],
-                    user_inputs["rural_pop_percent"],
-                    user_inputs["suburban_pop_percent"],
-                    user_inputs["urban_pop_percent"],
-                ),
-                1,
-            ),
-        ],
-    }
-    return data
-
-
-def wrangle_data_for_stacked_chart(user_inputs):
-    # Transpose data
-    data = {
-        "Year": ["2015", "Scenario"],
-        "Carbon Sequestration & Storage": [
-            GHG_SEQ,
-            calc_sequestration(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["res_energy_change"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["ci_energy_elec"],
-                user_inputs["ci_energy_change"],
-                user_inputs["veh_miles_elec"],
-                user_inputs["reg_fleet_mpg"],
-                user_inputs["change_veh_miles"],
-                user_inputs["change_rail_transit"],
-                user_inputs["rt_energy_elec_motion"],
-                user_inputs["f_energy_elec_motion"],
-                user_inputs["icr_energy_elec_motion"],
-                user_inputs["change_freight_rail"],
-                user_inputs["change_inter_city_rail"],
-                user_inputs["mp_energy_elec_motion"],
-                user_inputs["change_marine_port"],
-                user_inputs["change_off_road"],
-                user_inputs["or_energy_elec_motion"],
-                user_inputs["change_ag"],
-                user_inputs["change_industrial_processes"],
-                user_inputs["change_solid_waste"],
-                user_inputs["change_wastewater"],
-                user_inputs["change_forest"],
-                user_inputs["change_urban_trees"],
-                user_inputs["ff_carbon_capture"],
-                user_inputs["air_capture"],
-            ),
-        ],
-        "Residential Stationary Energy": [
-            GHG_RES,
-            calc_res_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["res_energy_change"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-            )[0],
-        ],
-        "Non-Residential Stationary Energy": [
-            GHG_CI,
-            calc_ci_ghg(
-                user_inputs["ci_energy_elec"],
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["ci_energy_change"],
-            )[0],
-        ],
-        "On-Road Motor Vehicles": [
-            GHG_HIGHWAY,
-            calc_highway_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["veh_miles_elec"],
-                user_inputs["change_pop"],
-                user_inputs["reg_fleet_mpg"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["change_veh_miles"],
-            )[0],
-        ],
-        "Rail": [
-            GHG_RAIL,
-            calc_rail_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["change_rail_transit"],
-                user_inputs["change_pop"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["rt_energy_elec_motion"],
-                user_inputs["f_energy_elec_motion"],
-                user_inputs["icr_energy_elec_motion"],
-                user_inputs["change_freight_rail"],
-                user_inputs["change_inter_city_rail"],
-            )[0],
-        ],
-        "Aviation": [
-            GHG_AVIATION,
-            calc_aviation_ghg(user_inputs["change_pop"], user_inputs["change_air_travel"]),
-        ],
-        "Other Mobile Energy": [
-            GHG_OTHER_MOBILE,
-            calc_other_mobile_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["mp_energy_elec_motion"],
-                user_inputs["change_marine_port"],
-                user_inputs["change_off_road"],
-                user_inputs["or_energy_elec_motion"],
-            )[0],
-        ],
-        "Non-Energy": [
-            GHG_NON_ENERGY,
-            calc_non_energy_ghg(
-                user_inputs["ci_energy_elec"],
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["change_ag"],
-                user_inputs["res_energy_change"],
-                user_inputs["ci_energy_change"],
-                user_inputs["change_forest"],
-                user_inputs["change_industrial_processes"],
-                user_inputs["change_urban_trees"],
-                user_inputs["change_solid_waste"],
-                user_inputs["change_wastewater"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-            ),
-        ],
-    }
-    return data
-
-
-def wrangle_pos_data_for_stacked_chart(user_inputs):
-    # Transpose data
-    data = {
-        "Year": ["2015", "Scenario"],
-        "Residential Stationary Energy": [
-            GHG_RES,
-            calc_res_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["res_energy_change"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-            )[0],
-        ],
-        "Non-Residential Stationary Energy": [
-            GHG_CI,
-            calc_ci_ghg(
-                user_inputs["ci_energy_elec"],
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["ci_energy_change"],
-            )[0],
-        ],
-        "On-Road Motor Vehicles": [
-            GHG_HIGHWAY,
-            calc_highway_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["veh_miles_elec"],
-                user_inputs["change_pop"],
-                user_inputs["reg_fleet_mpg"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["change_veh_miles"],
-            )[0],
-        ],
-        "Rail": [
-            GHG_RAIL,
-            calc_rail_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["change_rail_transit"],
-                user_inputs["change_pop"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["rt_energy_elec_motion"],
-                user_inputs["f_energy_elec_motion"],
-                user_inputs["icr_energy_elec_motion"],
-                user_inputs["change_freight_rail"],
-                user_inputs["change_inter_city_rail"],
-            )[0],
-        ],
-        "Aviation": [
-            GHG_AVIATION,
-            calc_aviation_ghg(user_inputs["change_pop"], user_inputs["change_air_travel"]),
-        ],
-        "Other Mobile Energy": [
-            GHG_OTHER_MOBILE,
-            calc_other_mobile_ghg(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["mp_energy_elec_motion"],
-                user_inputs["change_marine_port"],
-                user_inputs["change_off_road"],
-                user_inputs["or_energy_elec_motion"],
-            )[0],
-        ],
-        "Non-Energy": [
-            GHG_NON_ENERGY,
-            calc_non_energy_ghg(
-                user_inputs["ci_energy_elec"],
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["change_ag"],
-                user_inputs["res_energy_change"],
-                user_inputs["ci_energy_change"],
-                user_inputs["change_forest"],
-                user_inputs["change_industrial_processes"],
-                user_inputs["change_urban_trees"],
-                user_inputs["change_solid_waste"],
-                user_inputs["change_wastewater"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-            ),
-        ],
-    }
-    return data
-
-
-def wrangle_neg_data_for_stacked_chart(user_inputs):
-    # Transpose data
-    data = {
-        "Year": ["2015", "Scenario"],
-        "Carbon Sequestration & Storage": [
-            GHG_SEQ,
-            calc_sequestration(
-                user_inputs["grid_coal"],
-                user_inputs["grid_ng"],
-                user_inputs["grid_oil"],
-                user_inputs["grid_other_ff"],
-                user_inputs["res_energy_change"],
-                user_inputs["change_pop"],
-                user_inputs["rur_energy_elec"],
-                user_inputs["sub_energy_elec"],
-                user_inputs["urb_energy_elec"],
-                user_inputs["rural_pop_percent"],
-                user_inputs["suburban_pop_percent"],
-                user_inputs["urban_pop_percent"],
-                user_inputs["ci_energy_elec"],
-                user_inputs["ci_energy_change"],
-                user_inputs["veh_miles_elec"],
-                user_inputs["reg_fleet_mpg"],
-                user_inputs["change_veh_miles"],
-                user_inputs["change_rail_transit"],
-                user_inputs["rt_energy_elec_motion"],
-                user_inputs["f_energy_elec_motion"],
-                user_inputs["icr_energy_elec_motion"],
-                user_inputs["change_freight_rail"],
-                user_inputs["change_inter_city_rail"],
-                user_inputs["mp_energy_elec_motion"],
-                user_inputs["change_marine_port"],
-                user_inputs["change_off_road"],
-                user_inputs["or_energy_elec_motion"],
-                user_inputs["change_ag"],
-                user_inputs["change_industrial_processes"],
-                user_inputs["change_solid_waste"],
-                user_inputs["change_wastewater"],
-                user_inputs["change_forest"],
-                user_inputs["change_urban_trees"],
-                user_inputs["ff_carbon_capture"],
-                user_inputs["air_capture"],
-            ),
-        ],
-    }
-    return data
-
-
-def wrangle_data_for_pie_chart(user_inputs):
-    """Configure data and plot for pie chart."""
-    x = {
-        "Coal": user_inputs["grid_coal"],
-        "Oil": user_inputs["grid_oil"],
-        "Natural Gas": user_inputs["grid_ng"],
-        "Nuclear": user_inputs["grid_nuclear"],
-        "Solar": user_inputs["grid_solar"],
-        "Wind": user_inputs["grid_wind"],
-        "Biomass": user_inputs["grid_bio"],
-        "Hydropower": user_inputs["grid_hydro"],
-        "Geothermal": user_inputs["grid_geo"],
-        "Other Fossil Fuel": user_inputs["grid_other_ff"],
-    }
+*ghg* is a dict of GHG emissions (MMTCO2e) keyed by SECTOR_KEYS.
 
-    data = pd.Series(x).reset_index(name="percentage").rename(columns={"index": "fuel_type"})
-    data["angle"] = data["percentage"] / data["percentage"].sum() * 2 * pi
-    data["color"] = Spectral10
+*elec_btu* is a dict of electric BTU consumed, keyed by ELEC_SECTOR_KEYS.
+"""
 
-    return data
 
+# The user inputs each calculation below takes, in argument order. Calculations are listed in
+# the order evaluate_scenario() runs them.
+CALC_INPUTS = {
+    "lulucf": ["change_forest", "change_urban_trees"],
+    "res": [
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "res_energy_change",
+        "change_pop",
+        "rur_energy_elec",
+        "sub_energy_elec",
+        "urb_energy_elec",
+        "rural_pop_percent",
+        "suburban_pop_percent",
+        "urban_pop_percent",
+    ],
+    "ci": [
+        "ci_energy_elec",
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "ci_energy_change",
+    ],
+    "highway": [
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "veh_miles_elec",
+        "change_pop",
+        "reg_fleet_mpg",
+        "rural_pop_percent",
+        "suburban_pop_percent",
+        "urban_pop_percent",
+        "change_veh_miles",
+    ],
+    "rail": [
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "change_rail_transit",
+        "change_pop",
+        "rural_pop_percent",
+        "suburban_pop_percent",
+        "urban_pop_percent",
+        "rt_energy_elec_motion",
+        "f_energy_elec_motion",
+        "icr_energy_elec_motion",
+        "change_freight_rail",
+        "change_inter_city_rail",
+    ],
+    "aviation": ["change_pop", "change_air_travel"],
+    "other_mobile": [
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "mp_energy_elec_motion",
+        "change_marine_port",
+        "change_off_road",
+        "or_energy_elec_motion",
+    ],
+    "non_energy": [
+        "ci_energy_elec",
+        "ci_energy_change",
+        "change_ag",
+        "change_industrial_processes",
+        "change_solid_waste",
+        "change_wastewater",
+        "change_pop",
+    ],
+    "seq": [
+        "grid_coal",
+        "grid_ng",
+        "grid_oil",
+        "grid_other_ff",
+        "ff_carbon_capture",
+        "air_capture",
+    ],
+}
 
-##############################
-# Functions to create charts #
-##############################
+# The other calculations whose results each calculation uses
+CALC_DEPENDS = {
+    "non_energy": ["res", "lulucf"],
+    "seq": ["lulucf", "res", "ci", "highway", "rail", "other_mobile", "non_energy"],
+}
 
-"""
-We need these functions that create the charts - rather than creating the charts directly and
-importing them into the appropriate view - because bokeh requires that each Figure be in only
-one document, otherwise it seems that multiple users could be changing the same chart/input
-at the same time. So main/views.py imports these functions, and then individual views create
-the charts as needed.
-
-Additionally, the data/source (for the bar chart and stacked bar chart) and source (for pie chart)
-are created outside these functions and then used as parameters because, in order to update the
-chart, we need to directly update the source.data attribute after user inputs change. Otherwise,
-they could be created at the top of each function and then used within them.
-"""
+CALC_FUNCS = {
+    "lulucf": calc_lulucf,
+    "res": calc_res_ghg,
+    "ci": calc_ci_ghg,
+    "highway": calc_highway_ghg,
+    "rail": calc_rail_ghg,
+    "aviation": calc_aviation_ghg,
+    "other_mobile": calc_other_mobile_ghg,
+    "non_energy": calc_non_energy_ghg_from_parts,
+    "seq": calc_sequestration_from_totals,
+}
 
 
-def create_bar_chart(data, source):
-    """
-    Return a figure object.
+# Number of results of each calculation kept in its cache (see cache_calcs())
+CALC_CACHE_SIZE = 4096
 
-    *data* is output of wrangle_data_for_bar_chart().
 
-    *source* is the result of feeding *data* into bokeh's ColumnDataSource().
+def cache_calcs(maxsize=CALC_CACHE_SIZE):
     """
-    bar_chart = figure(
-        x_range=data["Category"],
-        y_range=(-25, 50),
-        plot_height=500,
-        plot_width=750,
-        y_axis_label="Million Metric Tons of CO2e",
-        title="Greenhouse Gas Emissions in Greater Philadelphia",
-        name="barchart",
-        toolbar_location="below",
-    )
-    bar_chart.vbar(
-        x=dodge("Category", -0.15, range=bar_chart.x_range),
-        top="2015",
-        source=source,
-        width=0.2,
-        color="steelblue",
-        legend_label="2015",
-    )
-    bar_chart.vbar(
-        x=dodge("Category", 0.15, range=bar_chart.x_range),
-        top="Scenario",
-        source=source,
-        width=0.2,
-        color="darkseagreen",
-        legend_label="Scenario",
-    )
-    bar_chart.xaxis.major_label_orientation = np.pi / 4
-    bar_chart.x_range.range_padding = 0.1
-
-    labels_scenario = LabelSet(
-        x=dodge("Category", 0.15, range=bar_chart.x_range),
-        y="Scenario",
-        x_offset=4,
-        y_offset=5,
-        text="Scenario",
-        text_font_size="10px",
-        angle=1.57,
-        level="glyph",
-        source=source,
-    )
-    labels_2015 = LabelSet(
-        x=dodge("Category", 0.15, range=bar_chart.x_range),
-        y="2015",
-        x_offset=-10,
-        y_offset=5,
-        text="2015",
-        text_font_size="10px",
-        angle=1.57,
-        level="glyph",
-        source=source,
-    )
-    bar_chart.add_layout(labels_scenario)
-    bar_chart.add_layout(labels_2015)
-    bar_chart.add_layout(bar_chart.legend[0], "right")
+    Create the caches of the results of the calculations in CALC_FUNCS, replacing (and so
+    clearing) any existing ones.
 
-    return bar_chart
+    Each calculation has its own cache, keyed on the arguments it takes, which keeps the
+    *maxsize* most recently used results (or every result, if *maxsize* is None). The caches
+    are shared by every session in the process, so scenarios that users have already
+    evaluated, like the baseline, only cost a lookup.
+    """
+    global cached_calc_funcs
+    cached_calc_funcs = {calc: lru_cache(maxsize)(func) for calc, func in CALC_FUNCS.items()}
 
 
-POS_SECTORS = [
-    "Residential Stationary Energy",
-    "Non-Residential Stationary Energy",
-    "On-Road Motor Vehicles",
-    "Rail",
-    "Aviation",
-    "Other Mobile Energy",
-    "Non-Energy",
-]
+def calc_cache_info():
+    """Return the hits, misses, maxsize and current size of each calculation's cache."""
+    return {calc: func.cache_info() for calc, func in cached_calc_funcs.items()}
 
 
-def create_stacked_chart(positive_data, negative_data, positive_source, negative_source):
+cache_calcs()
+
+
+def calcs_affected_by(keys):
+    """
+    Return the calculations, in CALC_INPUTS order, that have to be run again when the user
+    inputs in *keys* change, including those that use the results of other affected ones.
     """
-    Return a figure object.
+    affected = {calc for calc, inputs in CALC_INPUTS.items() if set(keys) & set(inputs)}
+    for calc in CALC_INPUTS:
+        if set(CALC_DEPENDS.get(calc, [])) & affected:
+            affected.add(calc)
+    return [calc for calc in CALC_INPUTS if calc in affected]
+
+
+# The calculations affected by each user input
+INPUT_CALCS = {key: calcs_affected_by([key]) for key in user_inputs}
 
-    *positive_data* is output of wrangle_data_for_stacked_chart().
 
-    *source* is the result of feeding *data* into bokeh's ColumnDataSource().
+def calc_part(calc, user_inputs, parts, calc_funcs=None):
     """
-    stacked_bar_chart = figure(
-        x_range=positive_data["Year"],
-        y_range=(-50, 100),
-        plot_height=500,
-        plot_width=500,
-        y_axis_label="Million Metric Tons of CO2e",
-        title="Greenhouse Gas Emissions in Greater Philadelphia",
-        toolbar_location="below",
-    )
-    stacked_bar_chart.vbar_stack(
-        ["Carbon Sequestration & Storage"],
-        x="Year",
-        width=0.4,
-        color=Viridis8[:1],
-        source=negative_source,
-        legend_label=["Carbon Sequestration & Storage"],
-    )
-    stacked_bar_chart.vbar_stack(
-        POS_SECTORS,
-        x="Year",
-        width=0.4,
-        color=Viridis8[1:],
-        source=positive_source,
-        legend_label=POS_SECTORS,
-    )
-    stacked_bar_chart.legend[0].items.reverse()  # Reverse legend items to match order in stack
-    stacked_bar_chart_legend = stacked_bar_chart.legend[0]
-    stacked_bar_chart.add_layout(stacked_bar_chart_legend, "right")
+    Run one of the calculations in CALC_INPUTS for *user_inputs*, taking the results of the
+    calculations it depends on from *parts*, a dict of results keyed like CALC_INPUTS.
 
-    return stacked_bar_chart
+    The calculation's function is taken from *calc_funcs* (keyed like CALC_FUNCS) if given,
+    otherwise from the caches (see cache_calcs()).
+    """
+    args = [user_inputs[key] for key in CALC_INPUTS[calc]]
+    if calc_funcs is None:
+        # the calculations are cached, so normalize the inputs to floats so that equal values
+        # (e.g. 10 from a slider and 10.0 from a text input) share results
+        calc_funcs = cached_calc_funcs
+        args = [float(arg) for arg in args]
+    if calc == "non_energy":
+        return calc_funcs[calc](parts["res"][1], parts["lulucf"][1], *args)
+    if calc == "seq":
+        total_elec_btu = (
+            parts["res"][2]
+            + parts["ci"][1]
+            + parts["highway"][1]
+            + parts["rail"][1]
+            + parts["other_mobile"][1]
+        )
+        res_ghg = parts["res"][0]
+        ci_ghg = parts["ci"][0]
+        highway_ghg = parts["highway"][0]
+        rail_ghg = parts["rail"][0]
+        om_ghg = parts["other_mobile"][0]
+        return calc_funcs[calc](
+            *args[:4],
+            total_elec_btu,
+            res_ghg + ci_ghg + highway_ghg + rail_ghg + om_ghg + parts["non_energy"],
+            parts["lulucf"][0],
+            *args[4:],
+        )
+    return calc_funcs[calc](*args)
 
 
-def create_pie_chart(source):
+def evaluate_parts(user_inputs, parts=None, stale=None, calc_funcs=None):
     """
-    Return a figure object.
+    Run the calculations in CALC_INPUTS for *user_inputs* and return their results, keyed
+    like CALC_INPUTS.
 
-    *source* is the result of feeding the output from wrangle_data_for_piechart() into
-    bokeh's ColumnDataSource().
+    If *parts* (the results of an earlier call) is given, only the calculations in *stale*
+    are run again and the rest of the results are reused. Use calcs_affected_by() or
+    INPUT_CALCS to find which calculations are stale after changing some of the inputs.
+
+    *calc_funcs* is passed on to calc_part().
     """
-    pie_chart = figure(
-        title="Electricity Grid Resource Mix",
-        toolbar_location="below",
-        plot_height=400,
-        plot_width=750,
-        tooltips="@fuel_type: @percentage",
-        x_range=(-0.5, 1.0),
-    )
-    pie_chart.wedge(
-        x=0,
-        y=1,
-        radius=0.3,
-        start_angle=cumsum("angle", include_zero=True),
-        end_angle=cumsum("angle"),
-        line_color="white",
-        fill_color="color",
-        legend_field="fuel_type",
-        source=source,
+    if parts is None:
+        stale = CALC_INPUTS
+    new_parts = {}
+    for calc in CALC_INPUTS:
+        if calc in stale:
+            new_parts[calc] = calc_part(calc, user_inputs, new_parts, calc_funcs)
+        else:
+            new_parts[calc] = parts[calc]
+    return new_parts
+
+
+def result_from_parts(parts):
+    """Return the ScenarioResult for the results of evaluate_parts()."""
+    return ScenarioResult(
+        ghg={
+            "seq": parts["seq"],
+            "res": parts["res"][0],
+            "ci": parts["ci"][0],
+            "highway": parts["highway"][0],
+            "rail": parts["rail"][0],
+            "aviation": parts["aviation"],
+            "other_mobile": parts["other_mobile"][0],
+            "non_energy": parts["non_energy"],
+        },
+        elec_btu={
+            "res": parts["res"][2],
+            "ci": parts["ci"][1],
+            "highway": parts["highway"][1],
+            "rail": parts["rail"][1],
+            "other_mobile": parts["other_mobile"][1],
+        },
     )
-    pie_chart.axis.axis_label = None
-    pie_chart.axis.visible = False
-    pie_chart.grid.grid_line_color = None
-    pie_chart.add_layout(pie_chart.legend[0], "right")
 
-    return pie_chart
+
+def evaluate_scenario(user_inputs):
+    """
+    Calculate GHG emissions and electric BTU of every sector for *user_inputs*.
+
+    Each sector is calculated exactly once; sequestration and non-energy emissions are
+    derived from the other sectors' results rather than by calculating them again, so this
+    should be used instead of calling the calc_* functions for each chart.
+    """
+    return result_from_parts(evaluate_parts(user_inputs))
@@ -0,0 +1,105 @@
+"""
+Monte Carlo estimates of the uncertainty in the results.
+
+Many of the constants in ghg_calc.py are estimates (e.g. the CO2 emitted per MWh of coal is the
+average of two eGRID years), so the results are too. simulate() draws values of chosen constants
+from distributions, recalculates every constant and baseline input that depends on them (see
+batch.derive_coefficients()) and evaluates a scenario with each draw using the batch engine.
+quantiles() summarizes the draws by sector, e.g. for confidence bands on the bar chart.
+
+Draws are made in chunks of chunk_size, each with its own random stream spawned from *seed*, so
+results are reproducible and the same whichever worker thread evaluates a chunk.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from batch import BatchResult, derive_coefficients, evaluate_batch
+from ghg_calc import ELEC_SECTOR_KEYS, SECTOR_KEYS
+
+# number of draws evaluated together
+CHUNK_SIZE = 65536
+
+
+class Normal(namedtuple("Normal", ["mean", "sd"])):
+    def sample(self, rng, size):
+        return rng.normal(self.mean, self.sd, size)
+
+
+class Uniform(namedtuple("Uniform", ["low", "high"])):
+    def sample(self, rng, size):
+        return rng.uniform(self.low, self.high, size)
+
+
+class Triangular(namedtuple("Triangular", ["low", "mode", "high"])):
+    def sample(self, rng, size):
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+# the CO2 emitted per MWh by each fossil fuel anywhere between its values in eGRID 2014 and 2016
+EGRID_DISTRIBUTIONS = {
+    "CO2_LB_MWH_COAL": Uniform(2169.484351, 2225.525),
+    "CO2_LB_MWH_OIL": Uniform(1341.468, 1600.098812),
+    "CO2_LB_MWH_NG": Uniform(897.037, 929.651872),
+    "CO2_LB_MWH_OTHER_FF": Uniform(1334.201, 1488.036692),
+}
+
+MonteCarloResult = namedtuple("MonteCarloResult", ["q", "ghg", "elec_btu"])
+MonteCarloResult.__doc__ = """
+Quantiles of the results of a Monte Carlo simulation.
+
+*q* is the sequence of quantiles (between 0 and 1).
+
+*ghg* and *elec_btu* are dicts keyed like ScenarioResult.ghg and ScenarioResult.elec_btu of
+arrays of the quantiles of GHG emissions and electric BTU, one for each of *q*.
+"""
+
+
+def simulate(distributions, scenario=None, draws=10000, seed=0, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Evaluate *scenario* with *draws* values of each constant in *distributions*.
+
+    *distributions* is a dict of distributions (e.g. Normal) keyed by the name of a constant in
+    ghg_calc.py. *scenario* is a dict of user inputs changed from their baseline; inputs it
+    doesn't change take their baseline value under each draw. Chunks of draws are evaluated by
+    *workers* threads.
+
+    Return a BatchResult with a row per draw.
+    """
+    scenario = dict(scenario or {})
+    starts = range(0, draws, chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(starts))
+
+    def evaluate_chunk(start, stream):
+        size = min(chunk_size, draws - start)
+        rng = np.random.default_rng(stream)
+        overrides = {name: distributions[name].sample(rng, size) for name in sorted(distributions)}
+        coefficients, baseline = derive_coefficients(overrides)
+        return evaluate_batch(dict(baseline, **scenario), coefficients, chunk_size=size)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(evaluate_chunk, starts, streams))
+
+    if not results:
+        return BatchResult(np.empty((0, len(SECTOR_KEYS))), np.empty((0, len(ELEC_SECTOR_KEYS))))
+    return BatchResult(
+        np.vstack([result.ghg for result in results]),
+        np.vstack([result.elec_btu for result in results]),
+    )
+
+
+def quantiles(distributions, scenario=None, q=(0.05, 0.5, 0.95), draws=10000, seed=0, **kwargs):
+    """
+    Return a MonteCarloResult of the quantiles *q* of the results of simulate(); *kwargs* are
+    passed to it.
+    """
+    result = simulate(distributions, scenario, draws, seed, **kwargs)
+    ghg = np.quantile(result.ghg, q, axis=0)
+    elec_btu = np.quantile(result.elec_btu, q, axis=0)
+    return MonteCarloResult(
+        q=q,
+        ghg={key: ghg[:, i] for i, key in enumerate(SECTOR_KEYS)},
+        elec_btu={key: elec_btu[:, i] for i, key in enumerate(ELEC_SECTOR_KEYS)},
+    )
@@ -0,0 +1,149 @@
+"""
+Find the least effort scenario that reaches a target for net GHG emissions.
+
+The effort of a scenario is the sum over the levers (user inputs) of the distance each is moved
+from where it started, as a share of its range, times the lever's weight. solve() finds a
+scenario whose net emissions are at most the target with as little effort as it can: starting
+from no change, it repeatedly moves the lever that reduces net emissions most per unit of
+effort (from the analytic Jacobian, see polynomial.py) by a small step, until the target is
+reached. The path has least effort when each lever's returns diminish as it's moved (e.g. the
+fleet's MPG) and the levers don't interact; as some of them do (e.g. the population change
+scales most sectors), it's otherwise close to it.
+
+The grid mix has to add up to 100%, so the levers for it are the shares of the fossil fuels
+(the only ones with emissions); the other shares are scaled so that the mix still adds up to 100.
+
+solve() is for scripts and notebooks; the apps don't offer it. It takes tens of milliseconds, and
+the first call compiles the model, so an app that did would have to call it off the IOLoop, in
+background.EXECUTOR, as the pages evaluate scenarios (see background.py).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from batch import INPUT_KEYS
+from ghg_calc import (
+    GHG_AVIATION,
+    GHG_CI,
+    GHG_HIGHWAY,
+    GHG_NON_ENERGY,
+    GHG_OTHER_MOBILE,
+    GHG_RAIL,
+    GHG_RES,
+    GHG_SEQ,
+    SECTOR_KEYS,
+    SLIDER_RANGES,
+    evaluate_scenario,
+    user_inputs,
+)
+from polynomial import compile_model
+
+# net GHG emissions (MMTCO2e) in the 2015 inventory
+GHG_2015 = (
+    GHG_SEQ
+    + GHG_RES
+    + GHG_CI
+    + GHG_HIGHWAY
+    + GHG_RAIL
+    + GHG_AVIATION
+    + GHG_OTHER_MOBILE
+    + GHG_NON_ENERGY
+)
+
+GRID_FF_KEYS = ["grid_coal", "grid_ng", "grid_oil", "grid_other_ff"]
+GRID_CLEAN_KEYS = [
+    key for key in user_inputs if key.startswith("grid_") and key not in GRID_FF_KEYS
+]
+
+# the range of each lever
+LEVER_RANGES = {
+    **{key: (0, 100) for key in GRID_FF_KEYS},
+    **{key: (start, end) for key, (start, end, _) in SLIDER_RANGES.items()},
+}
+
+Solution = namedtuple("Solution", ["inputs", "net", "effort", "feasible", "iterations"])
+Solution.__doc__ = """
+The result of solve().
+
+*inputs* are the user inputs of the scenario found and *net* its net GHG emissions (MMTCO2e).
+*effort* is the effort of the scenario. *feasible* is whether *net* is at most the target; if
+not, the scenario is the closest to the target the levers could reach.
+"""
+
+
+def reduction_target(fraction):
+    """Return the net GHG emissions *fraction* (e.g. 0.8) below those of 2015."""
+    return GHG_2015 * (1 - fraction)
+
+
+def net_ghg(inputs):
+    """Return the net GHG emissions (MMTCO2e) of the scenario with *inputs*."""
+    result = evaluate_scenario(inputs)
+    return sum(result.ghg[key] for key in SECTOR_KEYS)
+
+
+def with_levers(inputs, levers, values):
+    """
+    Return *inputs* with each of *levers* set to the corresponding of *values*, the clean shares
+    of the grid mix scaled so that it adds up to 100.
+    """
+    changed = dict(inputs, **dict(zip(levers, values)))
+    clean = sum(inputs[key] for key in GRID_CLEAN_KEYS)
+    ff = sum(changed[key] for key in GRID_FF_KEYS)
+    if ff != sum(inputs[key] for key in GRID_FF_KEYS):
+        for key in GRID_CLEAN_KEYS:
+            share = inputs[key] / clean if clean else 1 / len(GRID_CLEAN_KEYS)
+            changed[key] = (100 - ff) * share
+    return changed
+
+
+def solve(
+    target, weights=None, levers=None, inputs=None, step=0.02, tolerance=1e-6, max_iterations=1000
+):
+    """
+    Return the Solution with least effort whose net GHG emissions are at most *target*.
+
+    *levers* are the user inputs that can be changed (default all of LEVER_RANGES), and
+    *weights* a dict of the effort of moving each of them across its whole range (default 1).
+    Levers start, and effort is measured from, *inputs* (default the baseline, user_inputs).
+    Each lever is moved at most *step* effort at a time.
+    """
+    start = dict(user_inputs if inputs is None else inputs)
+    levers = list(LEVER_RANGES if levers is None else levers)
+    weights = dict(weights or {})
+    low, high = np.array([LEVER_RANGES[lever] for lever in levers], dtype=float).T
+    # effort per unit each lever moves
+    cost = np.array([weights.get(lever, 1) for lever in levers]) / (high - low)
+    columns = [INPUT_KEYS.index(lever) for lever in levers]
+    model = compile_model()
+
+    origin = np.array([start[lever] for lever in levers], dtype=float)
+    x = origin.copy()
+    inputs = start
+    net = net_ghg(inputs)
+    iterations = 0
+    while net > target + tolerance and iterations < max_iterations:
+        iterations += 1
+        gradient = model.jacobian(inputs)[: len(SECTOR_KEYS), columns].sum(axis=0)
+        # the end of its range in the direction that reduces emissions, for each lever; once
+        # moved, a lever only moves further from where it started
+        end = np.where(
+            x == origin, np.where(gradient > 0, low, high), np.where(x > origin, high, low)
+        )
+        reduces = (x != end) & (gradient * (end - x) < 0)
+        rate = np.where(reduces, np.abs(gradient) / cost, 0)
+        i = np.argmax(rate)
+        if rate[i] <= 0:
+            # no lever reduces emissions any further
+            break
+        # as far as the tangent says reaches the target, within the step and the range
+        distance = min((net - target) / abs(gradient[i]), step / cost[i], abs(end[i] - x[i]))
+        x[i] = (
+            end[i] if distance == abs(end[i] - x[i]) else x[i] + np.sign(end[i] - x[i]) * distance
+        )
+        inputs = with_levers(start, levers, x)
+        net = net_ghg(inputs)
+
+    effort = float(cost @ np.abs(x - origin))
+    return Solution(inputs, net, effort, net <= target + tolerance, iterations)
@@ -0,0 +1,232 @@
+"""
+The pages of the calculator, served as one Bokeh app (ghg.py).
+
+Every page has the same charts - a bar chart and a stacked bar chart of the emissions of each
+sector, and on the grid page a pie chart of the grid mix - and its own levers, the user inputs in
+PAGES. create_page() builds a session's document for a page from these: the charts from the
+functions in charts.py, and a widget for each of the page's levers.
+
+Every session starts at the baseline, so the charts' data at the baseline is calculated once per
+process (baseline_chart_data()) and copied for each session, rather than calculated by each.
+"""
+
+import copy
+from collections import namedtuple
+from functools import lru_cache, partial
+
+from bokeh.layouts import column, layout
+from bokeh.models import Column, ColumnDataSource, Paragraph, Slider, TextInput
+
+from background import BackgroundUpdater
+from charts import (
+    update_source,
+    wrangle_data_for_charts,
+    wrangle_data_for_pie_chart,
+    create_bar_chart,
+    create_stacked_chart,
+    create_pie_chart,
+)
+from ghg_calc import PAGE_SLIDERS, SLIDER_RANGES, page_inputs
+from scenario import ScenarioState
+
+Lever = namedtuple("Lever", ["key", "title", "text_input"], defaults=[False])
+Lever.__doc__ = """
+A user input that can be changed on a page: with a slider over its range in
+ghg_calc.SLIDER_RANGES or, if *text_input*, by typing it in.
+"""
+
+# The levers of each page, in the order they're shown, keyed by the page's name (as in
+# ghg_calc.PAGE_SLIDERS)
+PAGES = {
+    "pop": [
+        Lever("change_pop", "% Change in Population"),
+        Lever("urban_pop_percent", "% of Population Living in Urban Municipalities", True),
+        Lever("suburban_pop_percent", "% of Population Living in Suburban Municipalities", True),
+        Lever("rural_pop_percent", "% of Population Living in Rural Municipalities", True),
+    ],
+    "grid": [
+        Lever("grid_coal", "% Coal", True),
+        Lever("grid_oil", "% Oil", True),
+        Lever("grid_ng", "% Natural", True),
+        Lever("grid_nuclear", "% Nuclear", True),
+        Lever("grid_solar", "% Solar", True),
+        Lever("grid_wind", "% Wind", True),
+        Lever("grid_bio", "% Biomass", True),
+        Lever("grid_hydro", "% Hydropower", True),
+        Lever("grid_geo", "% Geothermal", True),
+        Lever("grid_other_ff", "% Other Fossil Fuel", True),
+    ],
+    "res": [
+        Lever("res_energy_change", "% Change in Per Capita Residential Energy Usage"),
+        Lever("urb_energy_elec", "% Electrification of Residential End Uses in Urban Areas"),
+        Lever("sub_energy_elec", "% Electrification of Residential End Uses in Suburban Areas"),
+        Lever("rur_energy_elec", "% Electrification of Residential End Uses in Rural Areas"),
+    ],
+    "non_res": [
+        Lever("ci_energy_change", "% Change in Commercial and Industrial Energy Usage"),
+        Lever("ci_energy_elec", "% Electrification of Commercial and Industrial End Uses"),
+    ],
+    "on_road": [
+        Lever("change_veh_miles", "% Change in Vehicle Miles Traveled per Person"),
+        Lever("veh_miles_elec", "% Vehicle Miles that are Electric"),
+        Lever("reg_fleet_mpg", "Averge Regional Fleetwide Fuel Economy (MPG)"),
+    ],
+    "rail": [
+        Lever("change_rail_transit", "% Change in Transit Ridership"),
+        Lever("rt_energy_elec_motion", "% Electrification of Rail Transit"),
+        Lever("change_freight_rail", "% Change in Freight Rail"),
+        Lever("f_energy_elec_motion", "% Electrification of Rail Freight"),
+        Lever("change_inter_city_rail", "% Change in Inter-city Rail Travel"),
+        Lever("icr_energy_elec_motion", "% Electrification of Inter-city Rail"),
+    ],
+    "aviation": [
+        Lever("change_air_travel", "% Change in Air Travel"),
+    ],
+    "other": [
+        Lever("change_marine_port", "% Change in Marine and Port-related Activity"),
+        Lever("mp_energy_elec_motion", "% Electrification of Marine and Port-related Activity"),
+        Lever("change_off_road", "% Change in Offroad Vehicle Use"),
+        Lever("or_energy_elec_motion", "% Electrification of Offroad vehicles"),
+    ],
+    "non_energy": [
+        Lever("change_ag", "% Change in Emissions from Agriculture"),
+        Lever("change_solid_waste", "% Change in Per Capita Landfill Waste"),
+        Lever("change_wastewater", "% Change in Per Capita Wastewater"),
+        Lever("change_industrial_processes", "% Change in Emissions from Industrial Processes"),
+    ],
+    "seq": [
+        Lever("change_urban_trees", "% Change in Urban Tree Coverage"),
+        Lever("change_forest", "% Change in Forest Coverage"),
+        Lever(
+            "ff_carbon_capture", "% Carbon Captured at Combustion Site for Electricity Generation"
+        ),
+        Lever("air_capture", "MMTCO2e Captured from the Air"),
+    ],
+}
+
+# arguments of the Column of a page's levers, for the pages that need them
+INPUTS_LAYOUT = {
+    "pop": dict(sizing_mode="fixed", width=150),
+    "grid": dict(width=200),
+}
+
+
+def generate_text_and_style(user_inputs):
+    """Generate text and style for creating/updating grid mix Paragraph widget."""
+    total = round(
+        sum(
+            [
+                user_inputs["grid_coal"],
+                user_inputs["grid_oil"],
+                user_inputs["grid_ng"],
+                user_inputs["grid_nuclear"],
+                user_inputs["grid_solar"],
+                user_inputs["grid_wind"],
+                user_inputs["grid_bio"],
+                user_inputs["grid_hydro"],
+                user_inputs["grid_geo"],
+                user_inputs["grid_other_ff"],
+            ]
+        ),
+        1,
+    )
+
+    text = f"Input percentages. Make sure the grid mix sums to 100%. The current sum is {total}%."
+    if total > 100:
+        style = {"color": "red"}
+    elif total < 100:
+        style = {"color": "orange"}
+    else:
+        style = {"color": "black"}
+    return text, style
+
+
+def wrangle_data_for_page(scenario, page):
+    """
+    Evaluate *scenario* (a ScenarioState) and return the data of the charts of *page*, as
+    wrangle_data_for_charts() does, with the pie chart's data ("pie") and the grid mix's text and
+    style ("text") on the grid page.
+    """
+    data = wrangle_data_for_charts(scenario)
+    if page == "grid":
+        data["pie"] = wrangle_data_for_pie_chart(scenario.inputs)
+        data["text"] = generate_text_and_style(scenario.inputs)
+    return data
+
+
+@lru_cache()
+def baseline_chart_data():
+    """Return the data of every page's charts at the baseline (see wrangle_data_for_page())."""
+    return wrangle_data_for_page(ScenarioState(), "grid")
+
+
+def create_lever(lever, value):
+    """Return the widget of *lever* (a Lever) at *value*, named by its key."""
+    if lever.text_input:
+        return TextInput(value=str(round(value, 1)), title=lever.title, name=lever.key)
+    start, end, step = SLIDER_RANGES[lever.key]
+    return Slider(start=start, end=end, value=value, step=step, title=lever.title, name=lever.key)
+
+
+def create_page(doc, page):
+    """Add the charts and levers of *page* (a key of PAGES) to *doc*, a session's Document."""
+    if page not in PAGES:
+        raise ValueError(f"There's no page called {page!r}")
+    # results are looked up in precomputed tables on the pages that have them
+    scenario = ScenarioState(page=page if page in PAGE_SLIDERS else None)
+
+    # each session's sources need their own copy, as they're patched in place
+    data = copy.deepcopy(baseline_chart_data())
+    sources = {key: ColumnDataSource(data=data[key]) for key in ["bar", "positive", "negative"]}
+    bar_chart = create_bar_chart(data["bar"], sources["bar"])
+    stacked_chart = create_stacked_chart(
+        data["positive"], data["negative"], sources["positive"], sources["negative"]
+    )
+    bar_chart.margin = (0, 0, 15, 0)
+    stacked_chart.margin = (0, 0, 15, 0)
+    charts = [bar_chart, stacked_chart]
+
+    # the widgets start at the values the precomputed tables are calculated with
+    start = page_inputs(page)
+    widgets = {lever.key: create_lever(lever, start[lever.key]) for lever in PAGES[page]}
+    inputs = list(widgets.values())
+    if page == "grid":
+        sources["pie"] = ColumnDataSource(data=data["pie"])
+        charts.append(create_pie_chart(sources["pie"]))
+        text, style = data["text"]
+        grid_text = Paragraph(text=text, style=style)
+        inputs.insert(0, grid_text)
+
+    def update_charts(data):
+        for key, source in sources.items():
+            update_source(source, data[key])
+        if page == "grid":
+            grid_text.text, grid_text.style = data["text"]
+
+    # evaluates the scenario and wrangles the chart data off the server's IOLoop
+    updater = BackgroundUpdater(
+        doc, scenario, partial(wrangle_data_for_page, page=page), update_charts
+    )
+
+    def callback(attr, old, new):
+        updater.request(
+            {
+                key: float(widget.value) if isinstance(widget, TextInput) else widget.value
+                for key, widget in widgets.items()
+            }
+        )
+
+    for widget in widgets.values():
+        widget.on_change("value", callback)
+
+    doc.add_root(
+        layout(
+            [
+                [
+                    Column(*inputs, **INPUTS_LAYOUT.get(page, {})),
+                    column(*charts, sizing_mode="stretch_width", margin=(0, 15, 0, 15)),
+                ]
+            ],
+            css_classes=["center"],
+        )
+    )
@@ -0,0 +1,147 @@
+"""
+Evaluate sweeps of scenarios on every core.
+
+evaluate_parallel() splits the scenarios into shards and evaluates each with the batch engine in
+a worker process of a ProcessPoolExecutor. Rather than pickle the inputs, the constants and the
+results between processes, they're kept in blocks of multiprocessing.shared_memory: the user
+inputs of every scenario, a table of the constants that are the same for every scenario and one
+of those with a value per scenario, and the output, an array of results preallocated for every
+scenario. Each worker attaches to the blocks once, when it starts (and closes them when it
+exits), and a shard is sent to it as just its first and last row; it reads its rows of the inputs
+and writes its rows of the results in place, without copying either.
+
+Starting the workers takes a while, so this is for sweeps of around a million scenarios or more;
+evaluate_batch() is quicker below that.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from multiprocessing.util import Finalize
+
+import numpy as np
+
+from batch import (
+    CHUNK_SIZE,
+    COEFFICIENTS,
+    INPUT_KEYS,
+    BatchResult,
+    evaluate_batch,
+    scenarios_to_columns,
+)
+from ghg_calc import ELEC_SECTOR_KEYS, SECTOR_KEYS
+
+# number of shards per worker, so that workers that finish early can take on others
+SHARDS_PER_WORKER = 4
+
+# the shared blocks the worker is attached to and its views of them, set by _attach()
+_blocks = []
+_shared = {}
+
+
+def _create(shape):
+    """Return a new shared memory block and an array of floats of *shape* in it."""
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    return block, np.ndarray(shape, dtype=float, buffer=block.buf)
+
+
+def _attach(layout, scalar_names, input_names, array_names):
+    """
+    Attach the worker to the blocks in *layout*, a dict of (block name, shape) by name, and
+    read the names of the rows of the tables in them.
+    """
+    for name, (block_name, shape) in layout.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _blocks.append(block)
+        _shared[name] = np.ndarray(shape, dtype=float, buffer=block.buf)
+    _shared["scalars"] = dict(zip(scalar_names, _shared["scalars"].tolist()))
+    _shared["input_names"] = input_names
+    _shared["array_names"] = array_names
+    # Workers exit through multiprocessing's exit function rather than the interpreter's, which
+    # runs Finalize callbacks but not atexit ones
+    Finalize(None, _detach, exitpriority=0)
+
+
+def _detach():
+    """Close the blocks the worker is attached to."""
+    # the views have to go before the blocks they're in can be closed
+    _shared.clear()
+    for block in _blocks:
+        block.close()
+    _blocks.clear()
+
+
+def _evaluate_shard(start, stop):
+    scalars = _shared["scalars"]
+    inputs = _shared["inputs"]
+    arrays = _shared["arrays"]
+    output = _shared["output"]
+    columns = {key: scalars[key] for key in INPUT_KEYS if key in scalars}
+    columns.update((key, inputs[i, start:stop]) for i, key in enumerate(_shared["input_names"]))
+    coefficients = {name: value for name, value in scalars.items() if name in COEFFICIENTS}
+    coefficients.update(
+        (name, arrays[i, start:stop]) for i, name in enumerate(_shared["array_names"])
+    )
+    result = evaluate_batch(columns, coefficients)
+    output[start:stop, : len(SECTOR_KEYS)] = result.ghg
+    output[start:stop, len(SECTOR_KEYS) :] = result.elec_btu
+
+
+def evaluate_parallel(scenarios, coefficients=None, workers=None, shard_size=CHUNK_SIZE):
+    """
+    Calculate GHG emissions and electric BTU of every sector for each of *scenarios* in
+    *workers* processes (default one per CPU), in shards of at most *shard_size* scenarios.
+
+    *scenarios* and *coefficients* are as for evaluate_batch(), except that coefficients with a
+    value per scenario must have a value for every one of *scenarios*.
+
+    Return a BatchResult.
+    """
+    columns = scenarios_to_columns(scenarios)
+    n = len(columns[INPUT_KEYS[0]])
+    k = dict(COEFFICIENTS, **(coefficients or {}))
+    # inputs that are the same in every scenario (broadcast from a single value) are shared
+    # with the constants, rather than as a value for every scenario
+    input_names = [key for key in INPUT_KEYS if n == 1 or columns[key].strides != (0,)]
+    array_names = [name for name, value in k.items() if np.ndim(value)]
+    scalars = {key: columns[key][0] for key in INPUT_KEYS if key not in input_names}
+    scalars.update((name, value) for name, value in k.items() if name not in array_names)
+    workers = workers or os.cpu_count()
+    shard_size = max(1, min(shard_size, -(-n // (workers * SHARDS_PER_WORKER))))
+
+    blocks, arrays = {}, {}
+    try:
+        for name, shape in [
+            ("scalars", (len(scalars),)),
+            ("inputs", (len(input_names), n)),
+            ("arrays", (len(array_names), n)),
+            ("output", (n, len(SECTOR_KEYS) + len(ELEC_SECTOR_KEYS))),
+        ]:
+            blocks[name], arrays[name] = _create(shape)
+        arrays["scalars"][:] = list(scalars.values())
+        for i, key in enumerate(input_names):
+            arrays["inputs"][i] = columns[key]
+        for i, name in enumerate(array_names):
+            arrays["arrays"][i] = k[name]
+
+        layout = {name: (blocks[name].name, array.shape) for name, array in arrays.items()}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(layout, list(scalars), input_names, array_names),
+        ) as executor:
+            starts = range(0, n, shard_size)
+            stops = [min(start + shard_size, n) for start in starts]
+            # raise any worker's exception
+            list(executor.map(_evaluate_shard, starts, stops))
+
+        return BatchResult(
+            arrays["output"][:, : len(SECTOR_KEYS)].copy(),
+            arrays["output"][:, len(SECTOR_KEYS) :].copy(),
+        )
+    finally:
+        # the arrays have to go before the blocks they're in can be closed
+        arrays.clear()
+        for block in blocks.values():
+            block.close()
+            block.unlink()
@@ -0,0 +1,122 @@
+"""
+Pathways of the user inputs over the years from 2015 to 2050.
+
+The apps compare a single scenario with 2015. A pathway instead gives each user input that it
+changes a path over the years, from its baseline value (its value in 2015) to its value in the
+scenario: Linear, SCurve or Step. evaluate_pathway() evaluates every year at once with the batch
+engine (see batch.py), as a scenario per year, and returns the GHG emissions of each sector in
+each year and cumulative emissions since the first year.
+
+Percentages that add up to 100 (the grid mix and the split of the population between urban,
+suburban and rural municipalities) only add up to 100 in every year if each of them that changes
+follows the same path, e.g. all Linear(value, 2020, 2035).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from batch import evaluate_batch
+from ghg_calc import ELEC_SECTOR_KEYS, SECTOR_KEYS, user_inputs
+
+YEARS = np.arange(2015, 2051)
+
+
+def _check_span(path):
+    # progress() is the share of the span from start to end that has passed, so a path needs one
+    if not path.end > path.start:
+        raise ValueError(f"{path!r} has to end after it starts (use Step for a change in one year)")
+    return path
+
+
+class Linear(namedtuple("Linear", ["value", "start", "end"], defaults=[2015, 2050])):
+    """From the baseline in *start* to *value* in *end* by the same amount each year."""
+
+    def __new__(cls, *args, **kwargs):
+        return _check_span(super().__new__(cls, *args, **kwargs))
+
+    def progress(self, years):
+        return np.clip((years - self.start) / (self.end - self.start), 0, 1)
+
+
+class SCurve(
+    namedtuple("SCurve", ["value", "start", "end", "steepness"], defaults=[2015, 2050, 10])
+):
+    """
+    From the baseline in *start* to *value* in *end* along a logistic curve: slowly at first,
+    fastest halfway, then slowly again. The greater *steepness*, the more of the change is made
+    around halfway.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        return _check_span(super().__new__(cls, *args, **kwargs))
+
+    def progress(self, years):
+        t = np.clip((years - self.start) / (self.end - self.start), 0, 1)
+        curve = 1 / (1 + np.exp(-self.steepness * (t - 0.5)))
+        # scaled so that it runs from 0 to 1
+        first = 1 / (1 + np.exp(self.steepness / 2))
+        return np.clip((curve - first) / (1 - 2 * first), 0, 1)
+
+
+class Step(namedtuple("Step", ["value", "year"])):
+    """The baseline until *year*, *value* from then on."""
+
+    def progress(self, years):
+        return (years >= self.year).astype(float)
+
+
+PathwayResult = namedtuple("PathwayResult", ["years", "inputs", "ghg", "elec_btu", "cumulative"])
+PathwayResult.__doc__ = """
+Results of evaluating a pathway.
+
+*years* is the array of years and *inputs* a dict of arrays of the user inputs in each year, keyed
+like user_inputs.
+
+*ghg* and *elec_btu* are dicts keyed like ScenarioResult.ghg and ScenarioResult.elec_btu of
+arrays of GHG emissions (MMTCO2e) and electric BTU in each year. *cumulative* is keyed like *ghg*,
+of GHG emissions in all the years up to and including each year.
+"""
+
+
+def pathway_inputs(paths, years=YEARS, inputs=None):
+    """
+    Return a dict of arrays of each user input in each of *years*.
+
+    *paths* is a dict of paths (e.g. Linear) keyed by user input. Inputs start from *inputs*
+    (default the baseline, user_inputs); those without a path keep their value every year.
+    """
+    inputs = dict(user_inputs if inputs is None else inputs)
+    unknown = set(paths) - set(inputs)
+    if unknown:
+        raise ValueError(f"Unknown user inputs: {', '.join(sorted(unknown))}")
+
+    years = np.asarray(years)
+    columns = {}
+    for key, value in inputs.items():
+        if key in paths:
+            path = paths[key]
+            columns[key] = value + (path.value - value) * path.progress(years)
+        else:
+            columns[key] = np.full(len(years), value, dtype=float)
+    return columns
+
+
+def evaluate_pathway(paths, years=YEARS, inputs=None, coefficients=None):
+    """
+    Evaluate the pathway with *paths* in each of *years*, which should be consecutive; see
+    pathway_inputs() for *paths* and *inputs*. *coefficients* is passed to evaluate_batch().
+
+    Return a PathwayResult.
+    """
+    years = np.asarray(years)
+    columns = pathway_inputs(paths, years, inputs)
+    result = evaluate_batch(columns, coefficients)
+    cumulative = np.cumsum(result.ghg, axis=0)
+    return PathwayResult(
+        years=years,
+        inputs=columns,
+        ghg={key: result.ghg[:, i] for i, key in enumerate(SECTOR_KEYS)},
+        elec_btu={key: result.elec_btu[:, i] for i, key in enumerate(ELEC_SECTOR_KEYS)},
+        cumulative={key: cumulative[:, i] for i, key in enumerate(SECTOR_KEYS)},
+    )
@@ -0,0 +1,364 @@
+"""
+The model as polynomials in the user inputs.
+
+Almost every calculation in ghg_calc.py multiplies and adds terms that are linear in the user
+inputs, so each sector's results are polynomials in the inputs (with reg_fleet_mpg appearing
+as 1/reg_fleet_mpg). The exceptions are the branches on change_elec_use in calc_res_ghg() (one
+for each of the urban, suburban and rural sub-sectors) and on change_forest in calc_lulucf(), so
+the model is a polynomial for each combination of branches.
+
+compile_model() runs the calc functions with Polynomial objects in place of the user inputs, once
+for each combination of branches, and collects the polynomial of each sector's results, so that
+evaluating a scenario is a dot product of precomputed coefficients with the values of the
+monomials. Most sectors have a few dozen monomials, but sequestration has about 800, as it
+multiplies every other sector by air_capture; multiplied out, the model is more arithmetic than
+the factored calculations in batch.py, which remains the faster way to evaluate plain sweeps.
+Nor is it a faster way to evaluate single scenarios: CompiledModel.evaluate() takes about half
+as long again as ghg_calc.evaluate_scenario(), which the apps use. The polynomials are for
+analysis that needs the model in closed form, like the derivatives of jacobian() that optimize.py
+steps along.
+
+The terms are multiplied out, so results agree with ghg_calc.py to within floating point
+rounding rather than exactly; ghg_calc.py remains the reference for the model.
+"""
+
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from batch import INPUT_KEYS
+from ghg_calc import (
+    CALC_FUNCS,
+    ELEC_SECTOR_KEYS,
+    SECTOR_KEYS,
+    ScenarioResult,
+    evaluate_parts,
+    result_from_parts,
+    user_inputs,
+)
+
+# The branches taken while tracing the calc functions (see _trace()), per thread, so that threads
+# tracing at the same time don't take each other's branches
+_tracing = threading.local()
+
+# held while compiling the model, so that it is only compiled once
+_compile_lock = threading.Lock()
+
+
+class Polynomial:
+    """
+    A sparse polynomial in the user inputs.
+
+    *terms* maps monomials to their coefficients. A monomial is a tuple of (input, exponent)
+    pairs, sorted by input; () is the constant term.
+    """
+
+    __slots__ = ("terms",)
+
+    def __init__(self, terms=None):
+        self.terms = terms or {}
+
+    @classmethod
+    def variable(cls, key):
+        return cls({((key, 1),): 1.0})
+
+    def __repr__(self):
+        return f"Polynomial({self.terms!r})"
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __add__(self, other):
+        other = _as_polynomial(other)
+        if other is NotImplemented:
+            return other
+        terms = dict(self.terms)
+        for monomial, coef in other.terms.items():
+            terms[monomial] = terms.get(monomial, 0.0) + coef
+        return Polynomial({monomial: coef for monomial, coef in terms.items() if coef})
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Polynomial({monomial: -coef for monomial, coef in self.terms.items()})
+
+    def __sub__(self, other):
+        return self + -other
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        if isinstance(other, (int, float)):
+            return Polynomial({m: coef * other for m, coef in self.terms.items() if coef * other})
+        other = _as_polynomial(other)
+        if other is NotImplemented:
+            return other
+        terms = {}
+        for monomial_1, coef_1 in self.terms.items():
+            for monomial_2, coef_2 in other.terms.items():
+                monomial = _multiply_monomials(monomial_1, monomial_2)
+                terms[monomial] = terms.get(monomial, 0.0) + coef_1 * coef_2
+        return Polynomial({monomial: coef for monomial, coef in terms.items() if coef})
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, (int, float)):
+            return Polynomial({monomial: coef / other for monomial, coef in self.terms.items()})
+        if isinstance(other, Polynomial) and len(other) == 1:
+            ((monomial, coef),) = other.terms.items()
+            inverse = tuple((key, -exponent) for key, exponent in monomial)
+            return self * Polynomial({inverse: 1 / coef})
+        raise ValueError("A Polynomial can only be divided by a number or a monomial")
+
+    def __rtruediv__(self, other):
+        return Polynomial({(): float(other)}) / self
+
+    # The calc functions only compare inputs with numbers to choose a branch, so comparisons
+    # return the branch being traced rather than comparing anything (see _trace())
+    def __lt__(self, other):
+        return _decide(self - other, "<")
+
+    def __le__(self, other):
+        return _decide(self - other, "<=")
+
+    def __gt__(self, other):
+        return _decide(self - other, ">")
+
+    def __ge__(self, other):
+        return _decide(self - other, ">=")
+
+    def inputs(self):
+        """Return the user inputs in this polynomial."""
+        return sorted({key for monomial in self.terms for key, _ in monomial})
+
+    def __call__(self, values):
+        """
+        Evaluate the polynomial for *values*, a mapping of user inputs to numbers or to NumPy
+        arrays of one value per scenario.
+        """
+        total = 0.0
+        for monomial, coef in self.terms.items():
+            term = coef
+            for key, exponent in monomial:
+                term = term * (values[key] if exponent == 1 else values[key] ** exponent)
+            total = total + term
+        return total
+
+
+def _as_polynomial(value):
+    if isinstance(value, Polynomial):
+        return value
+    if isinstance(value, (int, float)):
+        return Polynomial({(): float(value)} if value else {})
+    return NotImplemented
+
+
+@lru_cache(maxsize=None)
+def _multiply_monomials(monomial_1, monomial_2):
+    exponents = dict(monomial_1)
+    for key, exponent in monomial_2:
+        exponents[key] = exponents.get(key, 0) + exponent
+    return tuple(sorted((key, exponent) for key, exponent in exponents.items() if exponent))
+
+
+Condition = namedtuple("Condition", ["polynomial", "op"])
+Condition.__doc__ = """A branch of the model: whether *polynomial* *op* 0."""
+
+_OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+
+def _decide(polynomial, op):
+    decisions = getattr(_tracing, "decisions", None)
+    if decisions is None:
+        raise TypeError("Polynomials can only be compared while compiling the model")
+    decisions.conditions.append(Condition(polynomial, op))
+    return decisions.branches[len(decisions.conditions) - 1]
+
+
+class _Decisions:
+    def __init__(self, branches):
+        self.branches = branches
+        self.conditions = []
+
+
+def _trace(branches):
+    """
+    Run the calc functions with Polynomials as inputs, taking the branches in *branches* at
+    each comparison in turn. Return the ScenarioResult of Polynomials and the conditions.
+    """
+    decisions = _tracing.decisions = _Decisions(branches)
+    try:
+        inputs = {key: Polynomial.variable(key) for key in user_inputs}
+        result = result_from_parts(evaluate_parts(inputs, calc_funcs=CALC_FUNCS))
+    finally:
+        _tracing.decisions = None
+    return result, decisions.conditions
+
+
+# The results of the compiled model, in the order of the columns of CompiledModel.coefs
+OUTPUTS = [("ghg", key) for key in SECTOR_KEYS] + [("elec_btu", key) for key in ELEC_SECTOR_KEYS]
+
+
+class CompiledModel:
+    """
+    The model as polynomials (see compile_model()).
+
+    *conditions* are the branches of the model, in the order the calc functions take them; a
+    combination of branches is numbered by the bits of the outcome of each (see branch()).
+
+    *monomials* are every monomial in any of the polynomials, each after the monomial it
+    extends by one factor, so that all of them can be evaluated with one multiplication each.
+
+    *coefs* is an array of the coefficients of each monomial in the polynomial of each result
+    (in the order of OUTPUTS), for each combination of branches.
+    """
+
+    def __init__(self, conditions, monomials, coefs):
+        self.conditions = conditions
+        self.monomials = monomials
+        self.coefs = coefs
+
+        # how to evaluate each monomial: (position of the monomial it extends, input, exponent)
+        position = {monomial: i for i, monomial in enumerate(monomials)}
+        self._plan = [
+            (position[monomial[:-1]], *monomial[-1]) for monomial in monomials if monomial
+        ]
+
+        # the positions of the monomials of each degree, with the positions of those they extend
+        # and the input and exponent they extend them by, for evaluate() and jacobian()
+        index = {key: i for i, key in enumerate(INPUT_KEYS)}
+        self._levels = []
+        for degree in range(1, max(len(monomial) for monomial in monomials) + 1):
+            level = [i for i, monomial in enumerate(monomials) if len(monomial) == degree]
+            plan = [self._plan[i - 1] for i in level]
+            self._levels.append(
+                (
+                    np.array(level),
+                    np.array([parent for parent, _, _ in plan]),
+                    np.array([index[key] for _, key, _ in plan]),
+                    np.array([exponent for _, _, exponent in plan], dtype=float),
+                )
+            )
+
+    def __repr__(self):
+        return f"<CompiledModel {len(self.monomials)} monomials, {len(self.coefs)} branches>"
+
+    def polynomial(self, output, branch):
+        """
+        Return the Polynomial of *output* (a key of ScenarioResult.ghg, or ("elec_btu", key)
+        for electric BTU) for combination of branches *branch*.
+        """
+        if not isinstance(output, tuple):
+            output = ("ghg", output)
+        coefs = self.coefs[branch, :, OUTPUTS.index(output)]
+        return Polynomial(
+            {monomial: float(coef) for monomial, coef in zip(self.monomials, coefs) if coef}
+        )
+
+    def branch(self, values):
+        """
+        Return the combination of branches taken for *values* (see Polynomial.__call__()), as
+        a number whose bits are the outcomes of the conditions.
+        """
+        branch = 0
+        for i, (polynomial, op) in enumerate(self.conditions):
+            branch = branch + (_OPS[op](polynomial(values), 0).astype(int) << i)
+        return branch
+
+    def evaluate(self, user_inputs):
+        """
+        Return the ScenarioResult for *user_inputs* (see ghg_calc.evaluate_scenario()), from the
+        polynomials. This is for checking them against the model; ghg_calc.evaluate_scenario()
+        is quicker.
+        """
+        x = np.array([user_inputs[key] for key in INPUT_KEYS], dtype=float)
+        values = np.empty(len(self.monomials))
+        values[0] = 1
+        for level, parents, keys, exponents in self._levels:
+            values[level] = values[parents] * x[keys] ** exponents
+        results = (values @ self.coefs[self.branch(user_inputs)]).tolist()
+
+        ghg = dict(zip(SECTOR_KEYS, results))
+        elec_btu = dict(zip(ELEC_SECTOR_KEYS, results[len(SECTOR_KEYS) :]))
+        return ScenarioResult(ghg, elec_btu)
+
+    def jacobian(self, user_inputs):
+        """
+        Return the partial derivatives of the results for *user_inputs* with respect to each
+        input, an array of OUTPUTS x INPUT_KEYS.
+
+        The derivatives are exact (they are of the polynomials), and are calculated alongside
+        the values of the monomials, a degree at a time, from those of the monomials they extend
+        (forward-mode differentiation). Where the model branches (e.g. change_forest at 0), they
+        are those of the branch taken.
+        """
+        x = np.array([user_inputs[key] for key in INPUT_KEYS], dtype=float)
+        values = np.empty(len(self.monomials))
+        derivatives = np.zeros((len(self.monomials), len(INPUT_KEYS)))
+        values[0] = 1
+        for level, parents, keys, exponents in self._levels:
+            factors = x[keys] ** exponents
+            values[level] = values[parents] * factors
+            # product rule: d(parent * x ** exponent)
+            derivatives[level] = derivatives[parents] * factors[:, None]
+            derivatives[level, keys] += values[parents] * exponents * x[keys] ** (exponents - 1)
+        return self.coefs[self.branch(user_inputs)].T @ derivatives
+
+
+def jacobian(user_inputs):
+    """
+    Return the partial derivatives of the GHG emissions of each sector for *user_inputs* with
+    respect to each input, as a dict keyed like ScenarioResult.ghg of dicts keyed by input.
+    """
+    matrix = compile_model().jacobian(user_inputs)
+    return {
+        key: dict(zip(INPUT_KEYS, matrix[OUTPUTS.index(("ghg", key))].tolist()))
+        for key in SECTOR_KEYS
+    }
+
+
+def compile_model():
+    """
+    Compile the model into polynomials, tracing the calc functions once for each combination of
+    branches. The compiled model is cached, as it depends only on the constants in ghg_calc.py.
+    """
+    with _compile_lock:
+        return _compile_model()
+
+
+@lru_cache(maxsize=1)
+def _compile_model():
+    # trace once to find the number of branches
+    _, conditions = _trace([True] * 64)
+    polynomials = []
+    for branch in range(2 ** len(conditions)):
+        # bit i of the combination is the outcome of condition i
+        result, _ = _trace([bool(branch >> i & 1) for i in range(len(conditions))])
+        polynomials.append([_as_polynomial(getattr(result, field)[key]) for field, key in OUTPUTS])
+
+    # every monomial, and those they extend, ordered so that each comes after its parent
+    monomials = {()}
+    for polynomial in (polynomial for branch in polynomials for polynomial in branch):
+        for monomial in polynomial.terms:
+            while monomial not in monomials:
+                monomials.add(monomial)
+                monomial = monomial[:-1]
+    monomials = sorted(monomials, key=lambda monomial: (len(monomial), monomial))
+
+    position = {monomial: i for i, monomial in enumerate(monomials)}
+    coefs = np.zeros((len(polynomials), len(monomials), len(OUTPUTS)))
+    for branch, branch_polynomials in enumerate(polynomials):
+        for output, polynomial in enumerate(branch_polynomials):
+            for monomial, coef in polynomial.terms.items():
+                coefs[branch, position[monomial], output] = coef
+
+    return CompiledModel(conditions, monomials, coefs)
@@ -0,0 +1,182 @@
+"""
+Precomputed results for the slider positions of each page.
+
+Each page only has a few sliders, each with a fixed start, end and step, so the results for
+every position of a page's sliders (with every other input at the value it starts at on the page,
+see ghg_calc.page_inputs()) can be calculated ahead of time and looked up instead of calculated
+while the user drags them. Run
+
+    python bokeh_apps/precompute.py
+
+to write the tables to TABLES_PATH, which the apps load when the server starts. Results are
+calculated live for anything not in the tables, e.g. values typed into a TextInput.
+
+A page's table holds every combination of its slider positions if there are at most
+*max_positions* of them; otherwise, as combinations can run into the billions (the four sliders
+of the non-energy page have 201 ** 4 positions), it holds the positions of each slider with the
+others at their starting values.
+"""
+
+import argparse
+import os
+from functools import lru_cache
+from math import prod
+
+import numpy as np
+
+from batch import coefficients_version, evaluate_batch
+from ghg_calc import (
+    ELEC_SECTOR_KEYS,
+    PAGE_SLIDERS,
+    SECTOR_KEYS,
+    SLIDER_RANGES,
+    ScenarioResult,
+    page_inputs,
+)
+
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slider_tables.npz")
+
+# most combinations of slider positions stored for a page
+MAX_POSITIONS = 250000
+
+# changed when the tables are calculated differently, so that older tables are ignored
+TABLES_VERSION = 2
+
+
+def slider_positions(key):
+    """Return an array of the positions of the slider for user input *key*."""
+    start, end, step = SLIDER_RANGES[key]
+    return start + step * np.arange(int((end - start) / step + 1e-9) + 1)
+
+
+def slider_index(key, value):
+    """Return the position of *value* on the slider for user input *key*, or None if off it."""
+    start, end, step = SLIDER_RANGES[key]
+    index = round((value - start) / step)
+    if index < 0 or start + index * step > end + 1e-9 * step:
+        return None
+    if abs(start + index * step - value) > 1e-9 * step:
+        return None
+    return index
+
+
+def page_tables(page, max_positions=MAX_POSITIONS):
+    """
+    Calculate the tables of results for *page*, keyed by name: the page itself if the table has
+    every combination of slider positions, otherwise "<page>.<input>" for each slider.
+
+    Each table is an array with an axis for each of its sliders' positions, and a last axis of
+    GHG emissions (in the order of SECTOR_KEYS) followed by electric BTU (ELEC_SECTOR_KEYS).
+    """
+    keys = PAGE_SLIDERS[page]
+    axes = [slider_positions(key) for key in keys]
+    inputs = page_inputs(page)
+
+    if prod(len(axis) for axis in axes) <= max_positions:
+        grid = np.meshgrid(*axes, indexing="ij")
+        scenarios = {key: values.ravel() for key, values in zip(keys, grid)}
+        return {page: _evaluate(inputs, scenarios).reshape(grid[0].shape + (-1,))}
+
+    return {f"{page}.{key}": _evaluate(inputs, {key: axis}) for key, axis in zip(keys, axes)}
+
+
+def _evaluate(inputs, scenarios):
+    result = evaluate_batch(dict(inputs, **scenarios))
+    return np.hstack([result.ghg, result.elec_btu])
+
+
+def write_tables(path=TABLES_PATH, max_positions=MAX_POSITIONS, pages=PAGE_SLIDERS):
+    """Calculate the tables of every page in *pages* and write them to *path*."""
+    tables = {}
+    for page in pages:
+        tables.update(page_tables(page, max_positions))
+    np.savez_compressed(
+        path,
+        coefficients_version=coefficients_version(),
+        tables_version=TABLES_VERSION,
+        **tables,
+    )
+    return tables
+
+
+def load_tables(path=None):
+    """
+    Return the tables written to *path* (default TABLES_PATH) by write_tables(), keyed by name.
+    Return no tables if the file doesn't exist or was written with constants other than those in
+    ghg_calc.py, or by an earlier version of write_tables(). Each file is only read once.
+    """
+    return _read_tables(TABLES_PATH if path is None else str(path))
+
+
+@lru_cache(maxsize=None)
+def _read_tables(path):
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        if str(data["coefficients_version"]) != coefficients_version():
+            return {}
+        if "tables_version" not in data.files or data["tables_version"] != TABLES_VERSION:
+            return {}
+        return {
+            name: data[name]
+            for name in data.files
+            if name not in ("coefficients_version", "tables_version")
+        }
+
+
+@lru_cache(maxsize=None)
+def _page_inputs(page):
+    # lookup() is called on every change, so the inputs a page starts at are only built once
+    return page_inputs(page)
+
+
+def lookup(page, inputs, tables=None):
+    """
+    Return the ScenarioResult for *inputs* from the tables of *page*, or None if it isn't in
+    them. *tables* defaults to those in TABLES_PATH (see load_tables()).
+    """
+    if tables is None:
+        tables = load_tables()
+    keys = PAGE_SLIDERS[page]
+    start = _page_inputs(page)
+    if any(inputs[key] != value for key, value in start.items() if key not in keys):
+        return None
+
+    if page in tables:
+        index = tuple(slider_index(key, inputs[key]) for key in keys)
+        if None in index:
+            return None
+        row = tables[page][index]
+    else:
+        changed = [key for key in keys if inputs[key] != start[key]]
+        if len(changed) > 1 or f"{page}.{keys[0]}" not in tables:
+            return None
+        # the page's start is in the table of every slider on the page
+        key = changed[0] if changed else keys[0]
+        index = slider_index(key, inputs[key])
+        if index is None:
+            return None
+        row = tables[f"{page}.{key}"][index]
+
+    row = row.tolist()
+    return ScenarioResult(
+        ghg=dict(zip(SECTOR_KEYS, row)),
+        elec_btu=dict(zip(ELEC_SECTOR_KEYS, row[len(SECTOR_KEYS) :])),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", default=TABLES_PATH, help="file to write the tables to")
+    parser.add_argument(
+        "--max-positions",
+        type=int,
+        default=MAX_POSITIONS,
+        help="most combinations of slider positions stored for a page",
+    )
+    args = parser.parse_args()
+
+    tables = write_tables(args.output, args.max_positions)
+    for name, table in tables.items():
+        print(f"{name}: {table.shape[:-1]}")
+    print(f"Wrote {os.path.getsize(args.output)} bytes to {args.output}")
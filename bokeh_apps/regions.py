@@ -0,0 +1,155 @@
+"""
+Evaluate the model for many regions (e.g. the nine counties, or municipalities) at once.
+
+The constants in ghg_calc.py are for the whole DVRPC region. A RegionTable has a row per region of
+the constants that differ between them, usually those in REGION_TOTALS, which are totals for the
+region (population, energy consumed, inventory emissions, ...); the others, like the grid mix and
+emissions factors, are the same for every region unless the table has a column for them. Every
+constant calculated from the table's (e.g. POP, or CI_ENERGY_ELEC) is recalculated for each region
+(see batch.derive_coefficients()), and so are the baseline user inputs calculated from them (e.g.
+urban_pop_percent), so a scenario's inputs that aren't given take each region's own baseline.
+
+evaluate_regions() evaluates one or more scenarios in every region in a single batch. The model is
+additive in the totals, so if the regions' totals add up to the whole region's, so do their
+results (see region_totals()).
+"""
+
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+from batch import COEFFICIENTS, INPUT_KEYS, BatchResult, derive_coefficients, evaluate_batch
+from ghg_calc import CI_FUELS, user_inputs
+
+# constants that are totals for the region, which a table of regions should have a column for
+REGION_TOTALS = [
+    "URBAN_POP",
+    "SUBURBAN_POP",
+    "RURAL_POP",
+    "RES_NG",
+    "CI_NG",
+    *[f"CI_{fuel}_BTU" for fuel in ["ELEC", *CI_FUELS]],
+    "F_ELEC",
+    "F_D",
+    "ICR_ELEC",
+    "ICR_D",
+    "MP_ELEC",
+    "MP_RFO",
+    "MP_DFO",
+    "OR_ELEC",
+    "OR_MG",
+    "OR_DFO",
+    "OR_LPG",
+    "FOREST_ACRE_2010",
+    "FOREST_ACRE_2015",
+    "SEQ_URBAN_TREES",
+    "SEQ_FORESTS",
+    "GHG_FOREST_CHANGE",
+    "GHG_RES",
+    "GHG_CI",
+    "GHG_HIGHWAY",
+    "GHG_TRANSIT",
+    "GHG_F",
+    "GHG_ICR",
+    "GHG_AVIATION",
+    "GHG_MP",
+    "GHG_OR",
+    "GHG_AG",
+    "GHG_SOLID_WASTE",
+    "GHG_WASTEWATER",
+    "GHG_IP",
+]
+
+RegionTable = namedtuple("RegionTable", ["regions", "constants"])
+RegionTable.__doc__ = """
+Constants for each of a list of regions.
+
+*regions* is the list of the regions' names, and *constants* a dict of arrays with a value for
+each region, keyed by the name of a constant in ghg_calc.py.
+"""
+
+RegionResult = namedtuple("RegionResult", ["regions", "ghg", "elec_btu"])
+RegionResult.__doc__ = """
+Result of evaluating N scenarios in each of R regions.
+
+*regions* is the list of the regions' names. *ghg* is an N x R x 8 array of GHG emissions
+(MMTCO2e) and *elec_btu* an N x R x 5 array of electric BTU consumed, the last axis in the order
+of SECTOR_KEYS and ELEC_SECTOR_KEYS respectively, as in BatchResult.
+"""
+
+
+def load_regions(path, name_column="region"):
+    """
+    Return a RegionTable read from the CSV file at *path*, with a row per region: the name of
+    the region in *name_column* and a column for each constant, headed by its name.
+    """
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return RegionTable([], {})
+    names = [name for name in rows[0] if name != name_column]
+    unknown = set(names) - set(COEFFICIENTS)
+    if unknown:
+        raise ValueError(f"Unknown constants: {', '.join(sorted(unknown))}")
+    return RegionTable(
+        [row[name_column] for row in rows],
+        {name: np.array([float(row[name]) for row in rows]) for name in names},
+    )
+
+
+def apportion(shares, names=REGION_TOTALS):
+    """
+    Return a RegionTable that splits the constants *names* of the whole region between regions
+    by *shares*, a dict of the share of each region keyed by its name (e.g. its share of the
+    population), for regions whose own figures aren't known yet.
+    """
+    regions = list(shares)
+    share = np.array([shares[region] for region in regions], dtype=float)
+    return RegionTable(regions, {name: COEFFICIENTS[name] * share for name in names})
+
+
+def evaluate_regions(table, scenarios=None):
+    """
+    Evaluate each of *scenarios* in every region of *table*, a RegionTable.
+
+    *scenarios* is a dict of user inputs changed from their baseline, or a list of them (default
+    the baseline). Inputs that a scenario doesn't change take the region's baseline value.
+
+    Return a RegionResult.
+    """
+    if scenarios is None:
+        scenarios = [{}]
+    elif isinstance(scenarios, dict):
+        scenarios = [scenarios]
+    unknown = set().union(*scenarios) - set(INPUT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown user inputs: {', '.join(sorted(unknown))}")
+
+    n, r = len(scenarios), len(table.regions)
+    coefficients, baseline = derive_coefficients(table.constants)
+    # a row for each region in each scenario, scenario by scenario
+    coefficients = {
+        name: np.tile(value, n) if np.ndim(value) else value for name, value in coefficients.items()
+    }
+    columns = {}
+    for key in INPUT_KEYS:
+        default = np.broadcast_to(baseline.get(key, user_inputs[key]), (r,))
+        columns[key] = np.concatenate(
+            [
+                np.full(r, scenario[key], dtype=float) if key in scenario else default
+                for scenario in scenarios
+            ]
+        )
+
+    result = evaluate_batch(columns, coefficients)
+    return RegionResult(
+        list(table.regions),
+        result.ghg.reshape(n, r, -1),
+        result.elec_btu.reshape(n, r, -1),
+    )
+
+
+def region_totals(result):
+    """Return a BatchResult of the results of each scenario in *result* summed over the regions."""
+    return BatchResult(result.ghg.sum(axis=1), result.elec_btu.sum(axis=1))
@@ -0,0 +1,228 @@
+"""
+Results of scenarios shared between sessions and server processes.
+
+The calculations' caches in ghg_calc.py (see cache_calcs()) only last as long as the process,
+and each server process has its own, so several processes all calculate the same scenarios (the
+baseline most of all). A ResultCache stores the results of scenarios in an SQLite database in WAL
+mode, which every process can read while another writes, keyed by a hash of the scenario's inputs
+and of the constants they were calculated with (batch.coefficients_version()), so results
+calculated with other constants are never returned.
+
+The database holds at most MAX_ROWS results; the oldest are deleted to make room for new ones.
+Results are written in batches (every WRITE_INTERVAL seconds at most), rather than one at a time,
+since dragging a slider calculates a scenario for most of the values it passes. Run
+
+    python bokeh_apps/result_cache.py
+
+to create the database at CACHE_PATH, with the baseline in it. ScenarioState uses it when the file
+exists, like the tables of precompute.py.
+"""
+
+import argparse
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache
+from hashlib import sha256
+
+from batch import INPUT_KEYS, coefficients_version
+from ghg_calc import ELEC_SECTOR_KEYS, SECTOR_KEYS, ScenarioResult, evaluate_scenario, user_inputs
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.sqlite3")
+
+# seconds to wait for another process to finish writing, after which a result just isn't stored
+TIMEOUT = 0.05
+
+# the most results kept in the database
+MAX_ROWS = 100000
+
+# seconds a result can wait to be written with others
+WRITE_INTERVAL = 1.0
+
+# the default cache of ScenarioState: shared_cache() (while None is no cache)
+SHARED = object()
+
+
+def scenario_key(inputs, version=None):
+    """
+    Return the key of the results of *inputs* (keyed like user_inputs) calculated with the
+    constants of *version* (default those in ghg_calc.py; see batch.coefficients_version()).
+
+    Inputs are compared as floats, so 10 from a slider and 10.0 from a text input have the same key.
+    """
+    if version is None:
+        version = coefficients_version()
+    # adding 0.0 makes -0.0 0.0
+    values = tuple(float(inputs[key]) + 0.0 for key in INPUT_KEYS)
+    return sha256(f"{version}:{values!r}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Results of scenarios stored in the SQLite database at *path*, which is created if it doesn't
+    exist, keeping the newest *max_rows*.
+
+    Results put() are kept in memory until they're written together, by a thread that writes
+    them *write_interval* seconds after the first of them was put (at once if it's 0), or by
+    flush().
+
+    Errors from the database (e.g. it's locked by another process for longer than TIMEOUT) are
+    treated as a miss by get() and ignored by flush(), so the cache can't break the apps; results
+    are calculated instead.
+    """
+
+    def __init__(
+        self, path=CACHE_PATH, version=None, max_rows=MAX_ROWS, write_interval=WRITE_INTERVAL
+    ):
+        self.path = path
+        self.version = coefficients_version() if version is None else version
+        self.max_rows = max_rows
+        self.write_interval = write_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}
+        # set when there are results to write, for the writer thread
+        self._due = threading.Event()
+        self._writer = None
+
+    def _connection(self):
+        # sqlite3 connections can't be shared by threads, or by processes after a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, version TEXT NOT NULL, result BLOB NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, inputs):
+        """Return the ScenarioResult of *inputs*, or None if it isn't stored."""
+        key = scenario_key(inputs, self.version)
+        with self._lock:
+            blob = self._pending.get(key)
+        if blob is None:
+            try:
+                row = (
+                    self._connection()
+                    .execute("SELECT result FROM results WHERE key = ?", (key,))
+                    .fetchone()
+                )
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            blob = row[0]
+        values = array("d")
+        values.frombytes(blob)
+        return ScenarioResult(
+            ghg=dict(zip(SECTOR_KEYS, values)),
+            elec_btu=dict(zip(ELEC_SECTOR_KEYS, values[len(SECTOR_KEYS) :])),
+        )
+
+    def put(self, inputs, result):
+        """Store *result*, the ScenarioResult of *inputs*."""
+        values = array("d", [result.ghg[key] for key in SECTOR_KEYS])
+        values.extend(result.elec_btu[key] for key in ELEC_SECTOR_KEYS)
+        with self._lock:
+            self._pending[scenario_key(inputs, self.version)] = values.tobytes()
+            if self.write_interval > 0:
+                # threads don't survive a fork, so the writer is started by the process using it
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(
+                        target=self._write_pending, name="result-cache", daemon=True
+                    )
+                    self._writer.start()
+                self._due.set()
+        if self.write_interval <= 0:
+            self.flush()
+
+    def _write_pending(self):
+        while True:
+            self._due.wait()
+            time.sleep(self.write_interval)
+            # results put from now on are for the next write, if not this one
+            self._due.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Write the results put() that haven't been yet, and delete the oldest results beyond
+        max_rows.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR IGNORE INTO results VALUES (?, ?, ?)",
+                    [(key, self.version, blob) for key, blob in pending.items()],
+                )
+                # rowids are assigned in increasing order, so the oldest results have the lowest
+                connection.execute(
+                    "DELETE FROM results WHERE rowid <= (SELECT MAX(rowid) FROM results) - ?",
+                    (self.max_rows,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self, stale_only=False):
+        """Delete every result, or if *stale_only*, those calculated with other constants."""
+        if not stale_only:
+            with self._lock:
+                self._pending = {}
+        if stale_only:
+            self._connection().execute("DELETE FROM results WHERE version != ?", (self.version,))
+        else:
+            self._connection().execute("DELETE FROM results")
+
+    def __len__(self):
+        self.flush()
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def shared_cache(path=None):
+    """
+    Return the ResultCache at *path* (default CACHE_PATH) for this process, or None if the file
+    doesn't exist. Its results still waiting to be written are written when the process exits.
+    """
+    return _shared_cache(CACHE_PATH if path is None else str(path))
+
+
+@lru_cache(maxsize=None)
+def _shared_cache(path):
+    if not os.path.exists(path):
+        return None
+    cache = ResultCache(path)
+    atexit.register(cache.flush)
+    return cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--path", default=CACHE_PATH, help="file of the database")
+    parser.add_argument(
+        "--clear",
+        choices=["all", "stale"],
+        help="delete every result, or those calculated with other constants",
+    )
+    args = parser.parse_args()
+
+    cache = ResultCache(args.path)
+    if args.clear:
+        cache.clear(stale_only=args.clear == "stale")
+    if cache.get(user_inputs) is None:
+        cache.put(user_inputs, evaluate_scenario(user_inputs))
+        cache.flush()
+    print(f"{len(cache)} results in {args.path}")
@@ -0,0 +1,77 @@
+"""
+Per-session scenario state.
+
+Bokeh runs each app script once per session (i.e. per browser tab), but modules imported by the
+scripts, like ghg_calc, are shared by every session served by the process. So the inputs a user
+changes can't be kept in a module-level dict; each session creates its own ScenarioState when
+the app script runs and passes its inputs explicitly to the calc functions.
+"""
+
+from types import MappingProxyType
+
+from ghg_calc import INPUT_CALCS, evaluate_parts, result_from_parts, user_inputs
+from precompute import lookup
+from result_cache import SHARED, shared_cache
+
+
+class ScenarioState:
+    """
+    The inputs of one session's scenario, starting from the baseline values in user_inputs.
+
+    *inputs* are changes to the baseline, keyed like user_inputs.
+
+    If *page* (a key of ghg_calc.PAGE_SLIDERS) is given, results are taken from the page's
+    precomputed tables when they have them (see precompute.py). Otherwise they're taken from
+    *cache*, a ResultCache shared with other sessions and processes (default the one at
+    result_cache.CACHE_PATH, if it exists; None for no cache), and results calculated are stored
+    in it.
+
+    The results of the last evaluation are kept, so that evaluate() only runs the
+    calculations affected by the inputs changed since then (see ghg_calc.INPUT_CALCS).
+    Inputs must therefore be changed with update(); the inputs attribute is read-only.
+    """
+
+    def __init__(self, inputs=None, page=None, cache=SHARED):
+        self.page = page
+        self.cache = shared_cache() if cache is SHARED else cache
+        self._inputs = dict(user_inputs)
+        self._parts = None
+        self._stale = set()
+        if inputs:
+            self.update(inputs)
+
+    @property
+    def inputs(self):
+        return MappingProxyType(self._inputs)
+
+    def update(self, changes=None, **kwargs):
+        """Change the inputs in *changes* (a dict) and/or *kwargs*, keyed like user_inputs."""
+        changes = dict(changes or {}, **kwargs)
+        unknown = set(changes) - set(self._inputs)
+        if unknown:
+            raise KeyError(f"Unknown user inputs: {', '.join(sorted(unknown))}")
+        for key, value in changes.items():
+            if value != self._inputs[key]:
+                self._stale.update(INPUT_CALCS[key])
+        self._inputs.update(changes)
+
+    def evaluate(self):
+        """Return the ScenarioResult for the current inputs."""
+        if self.page is not None:
+            result = lookup(self.page, self._inputs)
+            if result is not None:
+                return result
+        if self.cache is not None:
+            result = self.cache.get(self._inputs)
+            if result is not None:
+                # the calculations' results are left as they are, and so are still stale
+                return result
+        self._parts = evaluate_parts(self._inputs, self._parts, self._stale)
+        self._stale = set()
+        result = result_from_parts(self._parts)
+        if self.cache is not None:
+            self.cache.put(self._inputs, result)
+        return result
+
+    def copy(self):
+        return ScenarioState(self._inputs, self.page, self.cache)
@@ -0,0 +1,128 @@
+"""
+Sensitivity of the results to the user inputs.
+
+sobol_indices() estimates first-order and total-order Sobol indices of GHG emissions by sector
+and of net emissions, with the sample design and estimators of Saltelli et al. (2010), over the
+range of each input's slider in the apps (ghg_calc.SLIDER_RANGES). tornado() is the cheaper
+one-at-a-time alternative: the results at each end of each input's range, others at baseline.
+
+The grid mix and the split of the population between urban, suburban and rural municipalities
+are percentages that add up to 100, so they're varied together: sobol_indices() treats each of
+them as a single factor, drawn uniformly from the mixes that add up to 100, and tornado() takes
+each percentage from 0 to 100 with the others scaled in proportion.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from batch import evaluate_batch
+from ghg_calc import SECTOR_KEYS, SLIDER_RANGES, input_range, user_inputs
+
+GRID_KEYS = [key for key in user_inputs if key.startswith("grid_")]
+POP_KEYS = ["urban_pop_percent", "suburban_pop_percent", "rural_pop_percent"]
+
+# the inputs varied together as each factor
+FACTORS = {"grid": GRID_KEYS, "pop": POP_KEYS, **{key: [key] for key in SLIDER_RANGES}}
+
+# results the indices are calculated for: GHG emissions of each sector and their sum
+OUTPUTS = SECTOR_KEYS + ["net"]
+
+SobolIndices = namedtuple("SobolIndices", ["factors", "outputs", "first_order", "total_order"])
+SobolIndices.__doc__ = """
+Sobol indices of each output for each factor.
+
+*factors* is a list of keys of FACTORS and *outputs* a list of OUTPUTS.
+
+*first_order* and *total_order* are arrays of outputs x factors. The first-order index is the
+share of the variance of the output due to the factor alone, the total-order index the share
+due to the factor and all of its interactions with the others.
+"""
+
+TornadoBar = namedtuple("TornadoBar", ["input", "low", "high"])
+TornadoBar.__doc__ = """
+The output with *input* at the start (*low*) and end (*high*) of its range.
+"""
+
+
+def sample(factors, n, rng):
+    """Return *n* scenarios with *factors* drawn at random by *rng*, as a dict of columns."""
+    columns = {}
+    for factor in factors:
+        keys = FACTORS[factor]
+        if len(keys) > 1:
+            # uniformly distributed over the percentages that add up to 100
+            values = rng.dirichlet(np.ones(len(keys)), n) * 100
+            columns.update(zip(keys, values.T))
+        else:
+            start, end, _ = SLIDER_RANGES[keys[0]]
+            columns[keys[0]] = rng.uniform(start, end, n)
+    return columns
+
+
+def evaluate_outputs(scenarios):
+    """Return an array of the OUTPUTS of each of *scenarios*, one row per scenario."""
+    ghg = evaluate_batch(scenarios).ghg
+    return np.column_stack([ghg, ghg.sum(axis=1)])
+
+
+def sobol_indices(n=8192, seed=0, factors=None):
+    """
+    Estimate the Sobol indices of the OUTPUTS for *factors* (default all keys of FACTORS) from
+    *n* x (len(factors) + 2) evaluations. Inputs that aren't in *factors* are left at their
+    baseline values.
+
+    Return SobolIndices.
+    """
+    factors = list(FACTORS if factors is None else factors)
+    rng = np.random.default_rng(seed)
+    a = sample(factors, n, rng)
+    b = sample(factors, n, rng)
+
+    # a with the inputs of each factor in turn from b, all evaluated in one batch
+    ab = {
+        key: np.concatenate([b[key] if key in FACTORS[factor] else a[key] for factor in factors])
+        for key in a
+    }
+    y = evaluate_outputs({key: np.concatenate([a[key], b[key], ab[key]]) for key in a})
+    y_a, y_b = y[:n], y[n : 2 * n]
+    y_ab = y[2 * n :].reshape(len(factors), n, -1)
+
+    variance = y[: 2 * n].var(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first_order = np.mean(y_b * (y_ab - y_a), axis=1) / variance
+        total_order = np.mean((y_a - y_ab) ** 2, axis=1) / 2 / variance
+    # outputs that don't vary with any of the factors
+    first_order[:, variance == 0] = 0
+    total_order[:, variance == 0] = 0
+
+    return SobolIndices(factors, list(OUTPUTS), first_order.T, total_order.T)
+
+
+def _with_share(key, value):
+    """Return the inputs with the percentage *key* set to *value*, the rest of its mix scaled."""
+    mix = GRID_KEYS if key in GRID_KEYS else POP_KEYS
+    rest = 100 - user_inputs[key]
+    inputs = {key: value}
+    for other in mix:
+        if other != key:
+            inputs[other] = user_inputs[other] * (100 - value) / rest
+    return inputs
+
+
+def tornado(output="net"):
+    """
+    Return a TornadoBar for every user input, by descending difference between *output* (one of
+    OUTPUTS) at the start and end of the input's range.
+    """
+    scenarios = []
+    for key in user_inputs:
+        for value in input_range(key):
+            if key in SLIDER_RANGES:
+                scenarios.append({key: value})
+            else:
+                scenarios.append(_with_share(key, value))
+
+    y = evaluate_outputs(scenarios)[:, OUTPUTS.index(output)].reshape(-1, 2)
+    bars = [TornadoBar(key, low, high) for key, (low, high) in zip(user_inputs, y.tolist())]
+    return sorted(bars, key=lambda bar: abs(bar.high - bar.low), reverse=True)
@@ -0,0 +1,288 @@
+"""
+Evaluate a file of scenarios and write their results, without the apps. Run
+
+    python bokeh_apps/sweep.py scenarios.csv results.csv
+
+The input is a CSV or Parquet file (by its extension, .parquet or .pq) with a row per scenario
+and a column for each user input it changes; inputs without a column take their baseline value.
+Values are checked as the API checks them (see main/views.py): each must be a number in the range
+of its input, and mixes must add up to 100. A chunk with any that aren't stops the run, which can
+be resumed from that chunk once the file is corrected.
+The output, in either format, has the input's columns (including any that aren't user inputs,
+like an id for each scenario) followed by the GHG emissions of each sector (ghg_<sector>) and its
+electric BTU (elec_btu_<sector>). A Parquet output is a directory of files, one per chunk.
+
+Scenarios are read, evaluated with the batch engine and written a chunk at a time, so memory use
+doesn't depend on the size of the file; with --workers, chunks are evaluated by that many
+processes. After each chunk the progress is saved next to the output (<output>.progress), and
+with --resume an interrupted run carries on from the last chunk written.
+
+Parquet needs pyarrow, which the apps don't, so it's only imported to read or write Parquet.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch import CHUNK_SIZE, INPUT_KEYS, coefficients_version, evaluate_batch
+from ghg_calc import (
+    ELEC_SECTOR_KEYS,
+    MIX_TOLERANCE,
+    MIXES,
+    SECTOR_KEYS,
+    input_range,
+    user_inputs,
+)
+
+RESULT_COLUMNS = [f"ghg_{key}" for key in SECTOR_KEYS] + [
+    f"elec_btu_{key}" for key in ELEC_SECTOR_KEYS
+]
+
+
+def is_parquet(path):
+    return os.path.splitext(str(path))[1].lower() in (".parquet", ".pq")
+
+
+def count_rows(path):
+    """
+    Return the number of scenarios in the file at *path*, or None if it can't be known without
+    reading the whole file (CSV).
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yield DataFrames of *chunk_size* scenarios (fewer in the last) from the file at *path*,
+    indexed by the number of each scenario in the file, from 0.
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            frame = batch.to_pandas()
+            frame.index = pd.RangeIndex(start, start + len(frame))
+            start += len(frame)
+            yield frame
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def input_errors(scenarios, index):
+    """
+    Return a list of what's wrong with *scenarios*, arrays of the values of user inputs, by the
+    rules of the API (see main/views.py): values that are missing, aren't numbers or are out of
+    the range of their input, and mixes that don't add up to 100. Each error names the first
+    scenario it's in by its number in *index*.
+    """
+
+    def error(wrong, message):
+        rows = index[wrong]
+        more = f" and {len(rows) - 1} more" if len(rows) > 1 else ""
+        return f"{message} in scenario {rows[0]}{more}"
+
+    errors = []
+    for key, values in scenarios.items():
+        start, end = input_range(key)
+        missing = ~np.isfinite(values)
+        if missing.any():
+            errors.append(error(missing, f"{key} must be a finite number"))
+        outside = ~missing & ((values < start) | (values > end))
+        if outside.any():
+            errors.append(error(outside, f"{key} must be between {start} and {end}"))
+    if errors:
+        return errors
+    for mix, keys in MIXES.items():
+        if set(keys) & scenarios.keys():
+            total = sum(scenarios.get(key, user_inputs[key]) for key in keys)
+            wrong = np.abs(total - 100) > MIX_TOLERANCE
+            if wrong.any():
+                errors.append(error(wrong, f"the {mix} ({', '.join(keys)}) doesn't add up to 100"))
+    return errors
+
+
+def evaluate_chunk(frame):
+    """
+    Return a DataFrame of the results (RESULT_COLUMNS) of the scenarios in *frame*. Raise
+    ValueError if any of their inputs are wrong (see input_errors()).
+    """
+    scenarios = {
+        key: pd.to_numeric(frame[key], errors="coerce").to_numpy(dtype=float)
+        for key in frame
+        if key in user_inputs
+    }
+    errors = input_errors(scenarios, frame.index)
+    if errors:
+        raise ValueError("; ".join(errors))
+    if not scenarios:
+        # every scenario is the baseline
+        scenarios = {INPUT_KEYS[0]: np.full(len(frame), user_inputs[INPUT_KEYS[0]])}
+    result = evaluate_batch(scenarios, chunk_size=len(frame))
+    return pd.DataFrame(
+        np.hstack([result.ghg, result.elec_btu]), columns=RESULT_COLUMNS, index=frame.index
+    )
+
+
+class _CsvOutput:
+    # opened in text mode, as pandas before 1.2 can't write CSV to a binary file; as the file is
+    # only written, tell() gives the byte offsets that truncate() and seek() take
+    def __init__(self, path, progress):
+        if progress["rows"]:
+            self.file = open(path, "r+", encoding="utf-8", newline="")
+            # anything after the last chunk recorded was written by an interrupted run
+            self.file.truncate(progress["bytes"])
+            self.file.seek(progress["bytes"])
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+
+    def write(self, frame, progress):
+        frame.to_csv(self.file, header=not progress["rows"], index=False)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        progress["bytes"] = self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetOutput:
+    def __init__(self, path, progress):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa, self.pq = pa, pq
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        if not progress["rows"]:
+            for name in os.listdir(path):
+                if name.startswith("part-"):
+                    os.remove(os.path.join(path, name))
+
+    def write(self, frame, progress):
+        part = os.path.join(self.path, f"part-{progress['parts']:05d}.parquet")
+        table = self.pa.Table.from_pandas(frame, preserve_index=False)
+        self.pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        progress["parts"] += 1
+
+    def close(self):
+        pass
+
+
+def _load_progress(path, resume):
+    progress = {"rows": 0, "bytes": 0, "parts": 0, "coefficients_version": coefficients_version()}
+    if resume and os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved["coefficients_version"] != progress["coefficients_version"]:
+            raise ValueError(
+                "The results written so far were calculated with other constants; "
+                "start again without resuming"
+            )
+        progress.update(saved)
+    return progress
+
+
+def _save_progress(path, progress):
+    with open(path + ".tmp", "w") as f:
+        json.dump(progress, f)
+    os.replace(path + ".tmp", path)
+
+
+def _skip(chunks, rows):
+    """Yield the DataFrames of *chunks* after their first *rows* rows."""
+    for frame in chunks:
+        if rows >= len(frame):
+            rows -= len(frame)
+            continue
+        yield frame.iloc[rows:]
+        rows = 0
+
+
+def run(input_path, output_path, chunk_size=CHUNK_SIZE, workers=1, resume=False, report=None):
+    """
+    Evaluate the scenarios in the file at *input_path* and write them with their results to
+    *output_path*, a chunk of *chunk_size* scenarios at a time, by *workers* processes.
+
+    If *resume*, carry on from the progress saved by an earlier run with the same paths.
+    *report*, if given, is called with the number of scenarios written so far after each chunk.
+
+    Return the number of scenarios written.
+    """
+    output_path = str(output_path)
+    progress_path = output_path + ".progress"
+    progress = _load_progress(progress_path, resume)
+    output = (_ParquetOutput if is_parquet(output_path) else _CsvOutput)(output_path, progress)
+    chunks = _skip(read_chunks(input_path, chunk_size), progress["rows"])
+
+    def write(frame, results):
+        output.write(pd.concat([frame, results], axis=1), progress)
+        progress["rows"] += len(frame)
+        _save_progress(progress_path, progress)
+        if report:
+            report(progress["rows"])
+
+    try:
+        if workers == 1:
+            for frame in chunks:
+                write(frame, evaluate_chunk(frame))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # at most two chunks per worker are read ahead, to bound memory
+                pending = []
+                for frame in chunks:
+                    pending.append((frame, executor.submit(evaluate_chunk, frame)))
+                    if len(pending) >= 2 * workers:
+                        frame, future = pending.pop(0)
+                        write(frame, future.result())
+                for frame, future in pending:
+                    write(frame, future.result())
+    finally:
+        output.close()
+    return progress["rows"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", help="CSV or Parquet file of scenarios")
+    parser.add_argument("output", help="CSV or Parquet file to write the results to")
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help="scenarios evaluated at a time"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="processes to evaluate chunks with")
+    parser.add_argument(
+        "--resume", action="store_true", help="carry on from where an earlier run stopped"
+    )
+    parser.add_argument("--quiet", action="store_true", help="don't report progress")
+    args = parser.parse_args()
+
+    total = count_rows(args.input)
+    # scenarios written by an earlier run, which don't count towards the rate
+    resumed = _load_progress(args.output + ".progress", args.resume)["rows"]
+    start = time.perf_counter()
+
+    def report(rows):
+        rate = (rows - resumed) / (time.perf_counter() - start)
+        done = f"{rows}/{total} ({rows / total:.0%})" if total else str(rows)
+        print(f"{done} scenarios, {rate:,.0f} a second", file=sys.stderr)
+
+    rows = run(
+        args.input,
+        args.output,
+        args.chunk_size,
+        args.workers,
+        args.resume,
+        None if args.quiet else report,
+    )
+    print(f"Wrote {rows} scenarios to {args.output}")
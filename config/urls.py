@@ -29,4 +29,5 @@ urlpatterns = [
     path("non-energy/", views.non_energy, name="non_energy"),
     path("carbon-sequestration-and-storage/", views.sequestration_storage, name="seq"),
     path("electricity-grid/", views.electricity_grid, name="grid"),
+    path("api/scenarios/", views.scenarios_api, name="scenarios_api"),
 ]
@@ -1,3 +1,87 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ghg_calc import SECTOR_KEYS, evaluate_scenario, user_inputs
+from main.views import MAX_SCENARIOS
+
+
+class ScenariosApiTest(TestCase):
+    def post(self, body):
+        return self.client.post(
+            reverse("scenarios_api"), json.dumps(body), content_type="application/json"
+        )
+
+    def test_one_scenario(self):
+        response = self.post({"change_pop": 10})
+        self.assertEqual(response.status_code, 200)
+        expected = evaluate_scenario(dict(user_inputs, change_pop=10))
+        for key in SECTOR_KEYS:
+            self.assertAlmostEqual(response.json()["ghg"][key], expected.ghg[key], places=12)
+
+    def test_many_scenarios(self):
+        scenarios = [{"change_air_travel": value} for value in range(-100, 101, 10)]
+        data = self.post(scenarios).json()
+        self.assertEqual(len(data["ghg"]["aviation"]), len(scenarios))
+        self.assertEqual(len(data["elec_btu"]["res"]), len(scenarios))
+        self.assertEqual(self.post([]).json()["ghg"]["aviation"], [])
+
+    def test_empty_scenarios(self):
+        data = self.post([{}, {}, {}]).json()
+        self.assertEqual(len(data["ghg"]["aviation"]), 3)
+        data = self.post([{}, {"change_air_travel": -50}, {}]).json()
+        expected = evaluate_scenario(dict(user_inputs, change_air_travel=-50))
+        aviation = data["ghg"]["aviation"]
+        self.assertEqual(aviation[0], aviation[2])
+        self.assertAlmostEqual(aviation[1], expected.ghg["aviation"], places=12)
+
+    def test_invalid_scenarios(self):
+        response = self.post(
+            [{"change_pop": 10}, {"change_pop": 1000, "grid_coal": "a lot", "pop": 1}]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"],
+            [
+                "scenario 1: change_pop must be between -100 and 100",
+                "scenario 1: grid_coal must be a number",
+                "scenario 1: pop is not a user input",
+            ],
+        )
+        response = self.post({"grid_coal": 50})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("grid mix", response.json()["errors"][0])
+
+    def test_numbers_too_big(self):
+        # JSON integers can be too big for a float
+        response = self.client.post(
+            reverse("scenarios_api"),
+            '{"reg_fleet_mpg": 1' + "0" * 400 + "}",
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], ["reg_fleet_mpg must be finite"])
+
+    def test_not_json(self):
+        response = self.client.post(
+            reverse("scenarios_api"), "change_pop=10", content_type="text/plain"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse("scenarios_api")).status_code, 405)
+
+    def test_too_many_scenarios(self):
+        # MAX_SCENARIOS scenarios of a dozen inputs fit in the default limit on request bodies
+        scenario = {key: -12.5 for key in list(user_inputs)[:12]}
+        body = json.dumps([scenario] * MAX_SCENARIOS)
+        self.assertLessEqual(len(body), settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+        response = self.post([{}] * (MAX_SCENARIOS + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_SCENARIOS), response.json()["errors"][0])
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1000)
+    def test_body_too_big(self):
+        response = self.post([{"change_pop": 10}] * 100)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], ["the request body must be at most 1000 bytes"])
@@ -1,12 +1,36 @@
-from django.http import HttpRequest, HttpResponse
+import json
+import math
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 from bokeh.embed import server_document
 
 from environment import bokeh_base_url, relative_urls
 
+# The model, from bokeh_apps/, which has to be on the path (PYTHONPATH) as it is for the apps;
+# its modules import each other by name
+from batch import evaluate_batch
+from ghg_calc import (
+    ELEC_SECTOR_KEYS,
+    MIX_TOLERANCE,
+    MIXES,
+    SECTOR_KEYS,
+    input_range,
+    user_inputs,
+)
+
 url_prefix = "/app/ghg"
 
+# most scenarios evaluated in one request. Request bodies are also limited, by Django's
+# DATA_UPLOAD_MAX_MEMORY_SIZE: its default, 2.5 MB, fits this many scenarios of up to ~250 bytes
+# (a dozen or so inputs each)
+MAX_SCENARIOS = 10000
+
 
 def index(request):
     return render(request, "main/intro.html")
@@ -14,69 +38,182 @@ def index(request):
 
 def pop(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_pop", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "pop"},
     )
     return render(request, "main/pop.html", dict(script=script))
 
 
 def electricity_grid(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_grid", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "grid"},
     )
     return render(request, "main/grid.html", dict(script=script))
 
 
 def res_stationary(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_res", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "res"},
     )
     return render(request, "main/res.html", dict(script=script))
 
 
 def non_res_stationary(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_non_res", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "non_res"},
     )
     return render(request, "main/non_res.html", dict(script=script))
 
 
 def on_road_motor_veh(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_on_road", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "on_road"},
     )
     return render(request, "main/on_road.html", dict(script=script))
 
 
 def rail(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_rail", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "rail"},
     )
     return render(request, "main/rail.html", dict(script=script))
 
 
 def aviation(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_aviation", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "aviation"},
     )
     return render(request, "main/aviation.html", dict(script=script))
 
 
 def mobile_other(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_other", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "other"},
     )
     return render(request, "main/other.html", dict(script=script))
 
 
 def non_energy(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_non_energy", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "non_energy"},
     )
     return render(request, "main/non_energy.html", dict(script=script))
 
 
 def sequestration_storage(request: HttpRequest) -> HttpResponse:
     script = server_document(
-        bokeh_base_url + url_prefix + "/bokeh_seq", relative_urls=relative_urls
+        bokeh_base_url + url_prefix + "/ghg",
+        relative_urls=relative_urls,
+        arguments={"page": "seq"},
     )
     return render(request, "main/seq.html", dict(script=script))
+
+
+def is_finite(number):
+    """Return whether *number* is finite as a float; JSON integers too big for one aren't."""
+    try:
+        return math.isfinite(float(number))
+    except OverflowError:
+        return False
+
+
+def input_errors(scenario):
+    """
+    Return a list of what's wrong with *scenario*, a dict of user inputs changed from their
+    baseline: inputs that don't exist, aren't numbers or are out of the range of their slider
+    (0 to 100 for percentages), and mixes that don't add up to 100.
+    """
+    if not isinstance(scenario, dict):
+        return ["must be an object of user inputs"]
+    errors = []
+    for key, value in scenario.items():
+        if key not in user_inputs:
+            errors.append(f"{key} is not a user input")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{key} must be a number")
+        elif not is_finite(value):
+            errors.append(f"{key} must be finite")
+        else:
+            start, end = input_range(key)
+            if not start <= value <= end:
+                errors.append(f"{key} must be between {start} and {end}")
+    if errors:
+        return errors
+    for mix, keys in MIXES.items():
+        if set(keys) & scenario.keys():
+            total = sum(scenario.get(key, user_inputs[key]) for key in keys)
+            if abs(total - 100) > MIX_TOLERANCE:
+                errors.append(f"the {mix} ({', '.join(keys)}) adds up to {total:g}, not 100")
+    return errors
+
+
+# The API is for scripts, which don't have the CSRF cookie, rather than for the pages. It only
+# evaluates the scenarios posted, changing nothing and using no session, so there's nothing for a
+# forged request to do.
+@csrf_exempt
+@require_POST
+def scenarios_api(request: HttpRequest) -> JsonResponse:
+    """
+    Evaluate the scenarios POSTed as JSON: a scenario, an object of user inputs changed from
+    their baseline, or a list of them (at most MAX_SCENARIOS).
+
+    Respond with {"ghg": {sector: ...}, "elec_btu": {sector: ...}}, the sectors' GHG emissions
+    (MMTCO2e) and electric BTU; each is a number for a scenario, a list with a number for each
+    scenario for a list. If any scenario is invalid, or the body is larger than
+    DATA_UPLOAD_MAX_MEMORY_SIZE, respond 400 with {"errors": [...]}.
+    """
+    try:
+        body = json.loads(request.body)
+    except RequestDataTooBig:
+        return JsonResponse(
+            {
+                "errors": [
+                    f"the request body must be at most {settings.DATA_UPLOAD_MAX_MEMORY_SIZE} bytes"
+                ]
+            },
+            status=400,
+        )
+    except ValueError:
+        return JsonResponse({"errors": ["the request body must be JSON"]}, status=400)
+
+    single = isinstance(body, dict)
+    scenarios = [body] if single else body
+    if not isinstance(scenarios, list):
+        return JsonResponse({"errors": ["expected a scenario or a list of them"]}, status=400)
+    if len(scenarios) > MAX_SCENARIOS:
+        return JsonResponse(
+            {"errors": [f"at most {MAX_SCENARIOS} scenarios can be evaluated at once"]},
+            status=400,
+        )
+
+    errors = []
+    for i, scenario in enumerate(scenarios):
+        prefix = "" if single else f"scenario {i}: "
+        errors.extend(prefix + error for error in input_errors(scenario))
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    result = evaluate_batch(scenarios)
+    ghg, elec_btu = result.ghg.T.tolist(), result.elec_btu.T.tolist()
+    if single:
+        ghg, elec_btu = [values[0] for values in ghg], [values[0] for values in elec_btu]
+    return JsonResponse(
+        {"ghg": dict(zip(SECTOR_KEYS, ghg)), "elec_btu": dict(zip(ELEC_SECTOR_KEYS, elec_btu))}
+    )
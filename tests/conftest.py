@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# The modules in bokeh_apps/ import each other by name, as `bokeh serve` puts the directory of
+# the app being served on the path. Do the same here so they can be imported by the tests.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "bokeh_apps"))
+
+import precompute  # noqa: E402
+import result_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_local_files(tmp_path_factory, monkeypatch):
+    """
+    Keep the tests from using the precomputed tables and the shared result cache in bokeh_apps/,
+    which are used when they exist (e.g. after dev_start), so that the tests don't depend on them.
+    Tests that use them point TABLES_PATH or CACHE_PATH at their own.
+    """
+    missing = tmp_path_factory.getbasetemp() / "missing"
+    monkeypatch.setattr(precompute, "TABLES_PATH", str(missing / "slider_tables.npz"))
+    monkeypatch.setattr(result_cache, "CACHE_PATH", str(missing / "results.sqlite3"))
@@ -0,0 +1,103 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import ghg_calc as g
+from background import BackgroundUpdater
+from scenario import ScenarioState
+
+
+class Doc:
+    """Stands in for a Document, running its next tick callbacks when told to."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.added = threading.Event()
+        self.timeouts = []
+        self.destroyed = []
+
+    def add_timeout_callback(self, callback, timeout_milliseconds):
+        self.timeouts.append(callback)
+
+    def on_session_destroyed(self, callback):
+        self.destroyed.append(callback)
+
+    def add_next_tick_callback(self, callback):
+        self.callbacks.append(callback)
+        self.added.set()
+
+    def tick(self):
+        assert self.added.wait(10)
+        self.added.clear()
+        callback = self.callbacks.pop(0)
+        callback()
+
+
+def compute(scenario):
+    return scenario.evaluate().ghg
+
+
+def test_request_applies_results():
+    doc, applied = Doc(), []
+    updater = BackgroundUpdater(doc, ScenarioState(), compute, applied.append, window=0)
+    updater.request(change_pop=10)
+    doc.tick()
+    assert applied == [g.evaluate_scenario(dict(g.user_inputs, change_pop=10)).ghg]
+    assert updater.dropped == 0
+
+
+def test_superseded_results_are_dropped():
+    doc, applied = Doc(), []
+    release = threading.Event()
+
+    def slow_compute(scenario):
+        release.wait(10)
+        return compute(scenario)
+
+    updater = BackgroundUpdater(
+        doc, ScenarioState(), slow_compute, applied.append, ThreadPoolExecutor(1), window=0
+    )
+    updater.request(change_pop=10)
+    # changed while the first evaluation runs; evaluated together once it's done
+    updater.request(change_pop=20)
+    updater.request(change_air_travel=-50)
+    release.set()
+    doc.tick()
+    assert applied == [] and updater.dropped == 1
+    doc.tick()
+    expected = g.evaluate_scenario(dict(g.user_inputs, change_pop=20, change_air_travel=-50))
+    assert applied == [expected.ghg]
+
+
+def test_changes_in_window_are_evaluated_together(caplog):
+    doc, applied = Doc(), []
+    updater = BackgroundUpdater(doc, ScenarioState(), compute, applied.append)
+    # a slider being dragged
+    for value in range(1, 11):
+        updater.request(change_pop=value)
+    updater.request(change_air_travel=-50)
+    assert len(doc.timeouts) == 1 and updater.evaluations == 0
+    doc.timeouts.pop()()
+    doc.tick()
+    expected = g.evaluate_scenario(dict(g.user_inputs, change_pop=10, change_air_travel=-50))
+    assert applied == [expected.ghg]
+    assert updater.evaluations == 1 and updater.skipped == 10
+    with caplog.at_level(logging.INFO):
+        doc.destroyed[0](None)
+    assert "11 changes took 1 evaluations (10 skipped, 0 dropped)" in caplog.text
+
+
+def test_errors_are_logged(caplog):
+    def fail(scenario):
+        raise ValueError("bad input")
+
+    doc, applied = Doc(), []
+    updater = BackgroundUpdater(doc, ScenarioState(), fail, applied.append, window=0)
+    updater.request(change_pop=10)
+    doc.tick()
+    assert applied == [] and "bad input" in caplog.text
+    # the session carries on
+    updater.compute = compute
+    updater.request(change_pop=20)
+    doc.tick()
+    assert len(applied) == 1
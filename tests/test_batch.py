@@ -0,0 +1,181 @@
+"""Test that the batch engine returns the same results as the functions in ghg_calc.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+import ghg_calc as g
+
+
+def random_scenarios(n, seed=0):
+    """Return a list of *n* scenarios, each changing a few inputs from the baseline."""
+    rng = np.random.default_rng(seed)
+    ranges = {
+        "change_pop": (-100, 100),
+        "grid_coal": (0, 100),
+        "grid_ng": (0, 100),
+        "res_energy_change": (-100, 100),
+        "urb_energy_elec": (0, 100),
+        "sub_energy_elec": (0, 100),
+        "rur_energy_elec": (0, 100),
+        "ci_energy_elec": (0, 100),
+        "ci_energy_change": (-100, 100),
+        "reg_fleet_mpg": (1, 100),
+        "veh_miles_elec": (0, 100),
+        "rt_energy_elec_motion": (0, 100),
+        "change_freight_rail": (-100, 100),
+        "or_energy_elec_motion": (0, 100),
+        "change_forest": (-20, 20),
+        "ff_carbon_capture": (0, 100),
+        "air_capture": (0, 100),
+    }
+    scenarios = []
+    for _ in range(n):
+        scenario = dict(g.user_inputs)
+        for key in rng.choice(list(ranges), 5, replace=False):
+            scenario[key] = rng.uniform(*ranges[key])
+        scenarios.append(scenario)
+    return scenarios
+
+
+def expected(scenarios):
+    results = [g.evaluate_scenario(scenario) for scenario in scenarios]
+    ghg = np.array([[result.ghg[key] for key in g.SECTOR_KEYS] for result in results])
+    elec_btu = np.array(
+        [[result.elec_btu[key] for key in g.ELEC_SECTOR_KEYS] for result in results]
+    )
+    return ghg, elec_btu
+
+
+def test_evaluate_batch_matches_evaluate_scenario():
+    scenarios = random_scenarios(200)
+    ghg, elec_btu = expected(scenarios)
+    result = batch.evaluate_batch(scenarios)
+    assert result.ghg.shape == (200, 8)
+    assert result.elec_btu.shape == (200, 5)
+    np.testing.assert_allclose(result.ghg, ghg, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(result.elec_btu, elec_btu, rtol=1e-12)
+
+
+def test_evaluate_batch_baseline():
+    result = batch.evaluate_batch({})
+    ghg, elec_btu = expected([g.user_inputs])
+    np.testing.assert_allclose(result.ghg, ghg, rtol=1e-12)
+
+
+def test_evaluate_batch_accepts_dataframe_and_structured_array():
+    scenarios = random_scenarios(20)
+    df = pd.DataFrame(scenarios)
+    structured = df.to_records(index=False)
+    ghg, _ = expected(scenarios)
+    np.testing.assert_allclose(batch.evaluate_batch(df).ghg, ghg, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(batch.evaluate_batch(structured).ghg, ghg, rtol=1e-12, atol=1e-12)
+
+
+def test_evaluate_batch_chunks():
+    scenarios = pd.DataFrame(random_scenarios(50))
+    np.testing.assert_array_equal(
+        batch.evaluate_batch(scenarios, chunk_size=7).ghg, batch.evaluate_batch(scenarios).ghg
+    )
+
+
+def test_evaluate_batch_coefficient_per_scenario():
+    scenarios = {"change_pop": [0, 0]}
+    result = batch.evaluate_batch(scenarios, coefficients={"GHG_AVIATION": np.array([1.0, 2.0])})
+    np.testing.assert_allclose(result.ghg[:, g.SECTOR_KEYS.index("aviation")], [1.0, 2.0])
+
+
+def test_evaluate_batch_empty_scenarios():
+    assert batch.evaluate_batch([{}, {}, {}]).ghg.shape == (3, 8)
+    scenarios = [{}, {"change_pop": 10}, {}]
+    ghg, elec_btu = expected([dict(g.user_inputs, **scenario) for scenario in scenarios])
+    result = batch.evaluate_batch(scenarios)
+    np.testing.assert_allclose(result.ghg, ghg, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(result.elec_btu, elec_btu, rtol=1e-12)
+    assert batch.evaluate_batch([]).ghg.shape == (0, 8)
+
+
+def test_evaluate_batch_coefficients_need_a_value_per_scenario():
+    with pytest.raises(ValueError):
+        batch.evaluate_batch({"change_pop": [0, 0]}, coefficients={"GHG_AVIATION": [1.0, 2.0, 3.0]})
+    with pytest.raises(ValueError):
+        batch.evaluate_batch({}, coefficients={"GHG_AVIATION": [1.0, 2.0], "POP": [1.0, 2.0, 3.0]})
+
+
+def test_evaluate_batch_unknown_input():
+    with pytest.raises(ValueError):
+        batch.evaluate_batch({"not_an_input": [1, 2]})
+
+
+def test_res_btu_subsectors_switch_either_way():
+    # urban more electric, suburban less, rural unchanged, in the same scenario
+    scenarios = [
+        dict(g.user_inputs, urb_energy_elec=80, sub_energy_elec=5, change_pop=10),
+        dict(g.user_inputs, urb_energy_elec=5, sub_energy_elec=80, rur_energy_elec=0),
+    ]
+    ghg, elec_btu = expected(scenarios)
+    result = batch.evaluate_batch(scenarios)
+    np.testing.assert_allclose(result.ghg, ghg, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(result.elec_btu, elec_btu, rtol=1e-12)
+
+    columns = batch.scenarios_to_columns(scenarios)
+    btu = batch.calc_res_btu(columns, batch.COEFFICIENTS)
+    assert btu.shape == (2, len(batch.RES_SUBSECTORS), len(batch.RES_FUELS))
+
+
+def test_res_btu_coefficient_per_scenario():
+    scenarios = {"urb_energy_elec": [80, 80], "sub_energy_elec": [5, 5]}
+    coefficients = {"RES_NG_SPACE_USEFUL": np.array([g.RES_NG_SPACE_USEFUL, 0.95])}
+    per_scenario = batch.evaluate_batch(scenarios, coefficients=coefficients)
+    scalar = batch.evaluate_batch(scenarios, coefficients={"RES_NG_SPACE_USEFUL": 0.95})
+    np.testing.assert_array_equal(per_scenario.ghg[0], batch.evaluate_batch(scenarios).ghg[0])
+    np.testing.assert_allclose(per_scenario.ghg[1], scalar.ghg[1], rtol=1e-14)
+    assert per_scenario.ghg[0, 1] != per_scenario.ghg[1, 1]
+
+
+def test_ci_ghg_by_fuel():
+    # sweep of every combination of C&I electrification and energy change
+    elec, change = np.meshgrid(np.linspace(0, 100, 11), np.linspace(-100, 100, 21))
+    columns = batch.scenarios_to_columns(
+        {"ci_energy_elec": elec.ravel(), "ci_energy_change": change.ravel()}
+    )
+    k = batch.COEFFICIENTS
+    grid = batch.calc_grid_lb_mwh(columns, k)
+    by_fuel, elec_btu = batch.calc_ci_ghg_by_fuel(columns, k, grid)
+    ci_ghg, _ = batch.calc_ci_ghg(columns, k, grid)
+    assert by_fuel.shape == (elec.size, 1 + len(g.CI_FUELS))
+    np.testing.assert_allclose(by_fuel.sum(axis=1), ci_ghg, rtol=1e-12, atol=1e-15)
+
+    for i in [0, 57, elec.size - 1]:
+        expected_by_fuel, expected_elec_btu = g.calc_ci_ghg_by_fuel(
+            elec.ravel()[i], g.GRID_COAL, g.GRID_NG, g.GRID_OIL, g.GRID_OTHER_FF, change.ravel()[i]
+        )
+        np.testing.assert_allclose(
+            by_fuel[i], [expected_by_fuel[fuel] for fuel in ["ELEC", *g.CI_FUELS]], rtol=1e-12
+        )
+        assert elec_btu[i] == pytest.approx(expected_elec_btu, rel=1e-12)
+
+
+def test_derive_coefficients():
+    derived, baseline = batch.derive_coefficients({"URBAN_ELEC_MWH_CAP": 3.0})
+    assert derived["URB_ELEC_SPACE_BTU"] == pytest.approx(
+        3.0 * g.RES_ELEC_SPACE * g.RES_ELEC_SPACE_USEFUL * g.BTU_MWH
+    )
+    assert derived["URB_ENERGY_ELEC"] > g.URB_ENERGY_ELEC
+    assert "SUB_ENERGY_ELEC" not in derived
+    assert baseline == {"urb_energy_elec": pytest.approx(derived["URB_ENERGY_ELEC"] * 100)}
+
+    # the same values as the constants they're calculated from give the same constants
+    derived, baseline = batch.derive_coefficients({"URBAN_POP": np.array([g.URBAN_POP] * 2)})
+    assert derived["POP"].tolist() == [g.POP] * 2
+    assert baseline["urban_pop_percent"].tolist() == [g.URBAN_POP_PERCENT] * 2
+
+    with pytest.raises(ValueError):
+        batch.derive_coefficients({"NOT_A_CONSTANT": 1})
+
+
+def test_evaluate_batch_one_scenario_per_coefficient():
+    result = batch.evaluate_batch({"change_pop": 10}, coefficients={"GHG_AVIATION": [1.0, 2.0]})
+    assert result.ghg.shape == (2, 8)
+    np.testing.assert_array_equal(result.ghg[0, :5], result.ghg[1, :5])
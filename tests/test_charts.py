@@ -0,0 +1,50 @@
+from bokeh.document import Document
+from bokeh.models import ColumnDataSource
+
+import ghg_calc as g
+from charts import (
+    update_source,
+    wrangle_data_for_bar_chart,
+    wrangle_data_for_pie_chart,
+)
+
+
+def changes(source, data):
+    """
+    Return the changes sent to the browser when *source* is updated with *data*: a patch is a
+    ColumnsPatchedEvent, the hint of the document's event.
+    """
+    doc = Document()
+    doc.add_root(source)
+    events = []
+    doc.on_change(lambda event: events.append(event))
+    update_source(source, data)
+    return [event.hint or event for event in events]
+
+
+def test_only_changed_cells_are_patched():
+    source = ColumnDataSource(wrangle_data_for_bar_chart(g.evaluate_scenario(g.user_inputs)))
+    result = g.evaluate_scenario(dict(g.user_inputs, change_air_travel=-50))
+    events = changes(source, wrangle_data_for_bar_chart(result))
+    assert len(events) == 1
+    assert events[0].patches == {"Scenario": [(5, round(result.ghg["aviation"], 1))]}
+    assert source.data == wrangle_data_for_bar_chart(result)
+
+
+def test_unchanged_data_is_not_sent():
+    data = wrangle_data_for_bar_chart(g.evaluate_scenario(g.user_inputs))
+    assert changes(ColumnDataSource(data), data) == []
+
+
+def test_pie_chart():
+    source = ColumnDataSource(wrangle_data_for_pie_chart(g.user_inputs))
+    data = wrangle_data_for_pie_chart(dict(g.user_inputs, grid_coal=0, grid_solar=30.1))
+    events = changes(source, data)
+    assert set(events[0].patches) == {"percentage", "angle"}
+    assert list(source.data["percentage"]) == list(data["percentage"])
+
+
+def test_other_columns_replace_the_data():
+    source = ColumnDataSource({"Year": ["2015"], "Rail": [1.0]})
+    changes(source, {"Year": ["2015", "Scenario"], "Rail": [1.0, 2.0]})
+    assert source.data == {"Year": ["2015", "Scenario"], "Rail": [1.0, 2.0]}
@@ -1,7 +1,6 @@
 """Test that the funcs that calculate GHG continue to return correct values during refactor."""
-import pytest
 
-from bokeh_apps import ghg_calc as g
+import ghg_calc as g
 
 """
 NOTE: the tests below that check the 2015/no-change have two asserts - one to check how close the result is to the constant, known value in ghg_calc.py; the other checks the actual result from the function under test with the most recent result from it, so that we can identify any unintended/incorrect changes to the functions.
@@ -356,3 +355,122 @@ def test_decrease_pop_decrease_non_energy_ghg():
         g.SUBURBAN_POP_PERCENT,
     )
     assert ghg < GHG_NON_ENERGY
+
+
+# evaluate_scenario() should return the same results as the individual functions
+
+
+def test_evaluate_scenario_matches_calc_funcs():
+    user_inputs = dict(g.user_inputs)
+    user_inputs["change_pop"] = 10
+    user_inputs["grid_coal"] = 10
+    user_inputs["urb_energy_elec"] = 90
+    user_inputs["change_forest"] = 5
+    user_inputs["air_capture"] = 20
+    result = g.evaluate_scenario(user_inputs)
+
+    res_ghg, res_ng_btu, res_elec_btu = g.calc_res_ghg(
+        user_inputs["grid_coal"],
+        user_inputs["grid_ng"],
+        user_inputs["grid_oil"],
+        user_inputs["grid_other_ff"],
+        user_inputs["res_energy_change"],
+        user_inputs["change_pop"],
+        user_inputs["rur_energy_elec"],
+        user_inputs["sub_energy_elec"],
+        user_inputs["urb_energy_elec"],
+        user_inputs["rural_pop_percent"],
+        user_inputs["suburban_pop_percent"],
+        user_inputs["urban_pop_percent"],
+    )
+    assert result.ghg["res"] == res_ghg
+    assert result.elec_btu["res"] == res_elec_btu
+    assert result.ghg["aviation"] == g.calc_aviation_ghg(10, 0)
+    assert result.ghg["non_energy"] == g.calc_non_energy_ghg(
+        user_inputs["ci_energy_elec"],
+        user_inputs["grid_coal"],
+        user_inputs["grid_ng"],
+        user_inputs["grid_oil"],
+        user_inputs["grid_other_ff"],
+        user_inputs["change_ag"],
+        user_inputs["res_energy_change"],
+        user_inputs["ci_energy_change"],
+        user_inputs["change_forest"],
+        user_inputs["change_industrial_processes"],
+        user_inputs["change_urban_trees"],
+        user_inputs["change_solid_waste"],
+        user_inputs["change_wastewater"],
+        user_inputs["change_pop"],
+        user_inputs["rur_energy_elec"],
+        user_inputs["sub_energy_elec"],
+        user_inputs["urb_energy_elec"],
+        user_inputs["rural_pop_percent"],
+        user_inputs["suburban_pop_percent"],
+        user_inputs["urban_pop_percent"],
+    )
+    assert result.ghg["seq"] == g.calc_sequestration(
+        *(
+            user_inputs[key]
+            for key in [
+                "grid_coal",
+                "grid_ng",
+                "grid_oil",
+                "grid_other_ff",
+                "res_energy_change",
+                "change_pop",
+                "rur_energy_elec",
+                "sub_energy_elec",
+                "urb_energy_elec",
+                "rural_pop_percent",
+                "suburban_pop_percent",
+                "urban_pop_percent",
+                "ci_energy_elec",
+                "ci_energy_change",
+                "veh_miles_elec",
+                "reg_fleet_mpg",
+                "change_veh_miles",
+                "change_rail_transit",
+                "rt_energy_elec_motion",
+                "f_energy_elec_motion",
+                "icr_energy_elec_motion",
+                "change_freight_rail",
+                "change_inter_city_rail",
+                "mp_energy_elec_motion",
+                "change_marine_port",
+                "change_off_road",
+                "or_energy_elec_motion",
+                "change_ag",
+                "change_industrial_processes",
+                "change_solid_waste",
+                "change_wastewater",
+                "change_forest",
+                "change_urban_trees",
+                "ff_carbon_capture",
+                "air_capture",
+            ]
+        )
+    )
+
+
+def test_calc_caches(monkeypatch):
+    # put back the caches the other tests use when this one is done
+    monkeypatch.setattr(g, "cached_calc_funcs", g.cached_calc_funcs)
+    g.cache_calcs(maxsize=2)
+    g.evaluate_scenario(g.user_inputs)
+    g.evaluate_scenario(dict(g.user_inputs, change_air_travel=10))
+    g.evaluate_scenario(dict(g.user_inputs, change_air_travel=10.0))
+    info = g.calc_cache_info()
+    assert (info["aviation"].hits, info["aviation"].misses) == (1, 2)
+    assert (info["res"].hits, info["res"].misses) == (2, 1)
+
+    g.evaluate_scenario(dict(g.user_inputs, change_air_travel=20))
+    g.evaluate_scenario(g.user_inputs)
+    info = g.calc_cache_info()
+    assert (info["aviation"].hits, info["aviation"].misses) == (1, 4)
+    assert info["aviation"].currsize == 2
+
+
+def test_grid_mix_is_shared():
+    grid = g.grid_mix(g.GRID_COAL, g.GRID_NG, g.GRID_OIL, g.GRID_OTHER_FF)
+    assert grid is g.grid_mix(g.GRID_COAL, g.GRID_NG, g.GRID_OIL, g.GRID_OTHER_FF)
+    assert g.grid_mix(0, 0, 0, 0).elec_ghg(1000000) == 0
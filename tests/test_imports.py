@@ -0,0 +1,25 @@
+import subprocess
+import sys
+from pathlib import Path
+
+APPS = Path(__file__).parents[1] / "bokeh_apps"
+
+CODE = """
+import sys, time
+start = time.perf_counter()
+import ghg_calc
+print(time.perf_counter() - start)
+print(" ".join(sys.modules))
+"""
+
+
+def test_ghg_calc_imports_quickly():
+    """The model shouldn't import Bokeh, pandas or NumPy, which take most of a second."""
+    output = subprocess.run(
+        [sys.executable, "-c", CODE], cwd=APPS, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    seconds = float(output[0])
+    modules = {module.split(".")[0] for module in output[1].split()}
+
+    assert not {"bokeh", "numpy", "pandas"} & modules
+    assert seconds < 0.25
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import ghg_calc as g
+import montecarlo as mc
+
+
+def test_fixed_distributions_give_point_values():
+    distributions = {"CO2_LB_MWH_COAL": mc.Uniform(g.CO2_LB_MWH_COAL, g.CO2_LB_MWH_COAL)}
+    result = mc.quantiles(distributions, {"change_pop": 10}, draws=100)
+    expected = g.evaluate_scenario(dict(g.user_inputs, change_pop=10))
+    for key, value in expected.ghg.items():
+        np.testing.assert_allclose(result.ghg[key], [value] * 3, rtol=1e-12, atol=1e-12)
+
+
+def test_draws_are_reproducible():
+    distributions = dict(mc.EGRID_DISTRIBUTIONS, URBAN_ELEC_MWH_CAP=mc.Normal(2.41, 0.1))
+    result = mc.simulate(distributions, draws=1000, seed=1, chunk_size=300)
+    assert result.ghg.shape == (1000, 8)
+    np.testing.assert_array_equal(
+        result.ghg, mc.simulate(distributions, draws=1000, seed=1, chunk_size=300, workers=3).ghg
+    )
+    assert not np.array_equal(result.ghg, mc.simulate(distributions, draws=1000, seed=2).ghg)
+
+
+def test_quantiles_bracket_baseline():
+    result = mc.quantiles(mc.EGRID_DISTRIBUTIONS, q=(0.05, 0.5, 0.95), draws=2000)
+    baseline = g.evaluate_scenario(g.user_inputs)
+    low, median, high = result.ghg["res"]
+    assert low < median < high
+    assert low < baseline.ghg["res"] < high
+    # aviation doesn't depend on the grid
+    assert result.ghg["aviation"] == pytest.approx([g.GHG_AVIATION] * 3)
@@ -0,0 +1,40 @@
+import pytest
+
+import ghg_calc as g
+import optimize as o
+
+
+def test_solve_reaches_target():
+    target = o.reduction_target(0.8)
+    solution = o.solve(target)
+    assert solution.feasible
+    assert solution.net == pytest.approx(target, abs=1e-3)
+    assert solution.net == pytest.approx(o.net_ghg(solution.inputs))
+    for lever, (low, high) in o.LEVER_RANGES.items():
+        assert low <= solution.inputs[lever] <= high
+
+
+def test_solve_grid_mix_adds_up_to_100():
+    solution = o.solve(o.reduction_target(0.2), levers=o.GRID_FF_KEYS)
+    assert solution.feasible
+    grid = [solution.inputs[key] for key in o.GRID_FF_KEYS + o.GRID_CLEAN_KEYS]
+    assert sum(grid) == pytest.approx(100)
+    assert solution.inputs["grid_coal"] < g.user_inputs["grid_coal"]
+
+
+def test_solve_weights():
+    target = o.reduction_target(0.5)
+    cheap = o.solve(target)
+    assert cheap.inputs["change_pop"] < 0
+    # population change made much harder: met with other levers instead
+    solution = o.solve(target, weights={"change_pop": 100})
+    assert solution.feasible
+    assert solution.inputs["change_pop"] == 0
+
+
+def test_solve_infeasible_target():
+    solution = o.solve(o.reduction_target(0.5), levers=["change_air_travel"])
+    assert not solution.feasible
+    assert solution.inputs["change_air_travel"] == -100
+    # the effort of moving the lever across half its range
+    assert solution.effort == pytest.approx(0.5)
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from bokeh.document import Document
+from bokeh.models import ColumnDataSource, Paragraph
+
+import ghg_calc as g
+import pages
+import precompute
+import scenario
+
+
+def run_callbacks(doc):
+    """Run the document's timeout and next tick callbacks, as the server's IOLoop would."""
+    deadline = time.monotonic() + 10
+    while doc.session_callbacks:
+        assert time.monotonic() < deadline
+        for callback in list(doc.session_callbacks):
+            callback.callback()
+        time.sleep(0.01)
+
+
+def scenario_values(doc):
+    return doc.select_one({"name": "barchart"}).renderers[0].data_source.data["Scenario"]
+
+
+@pytest.mark.parametrize("page", pages.PAGES)
+def test_every_page(page):
+    doc = Document()
+    pages.create_page(doc, page)
+    for lever in pages.PAGES[page]:
+        assert doc.select_one({"name": lever.key}).title == lever.title
+    baseline = pages.baseline_chart_data()["bar"]["Scenario"]
+    assert list(scenario_values(doc)) == baseline
+
+
+def test_levers_update_the_charts():
+    doc = Document()
+    pages.create_page(doc, "aviation")
+    doc.select_one({"name": "change_air_travel"}).value = -50
+    run_callbacks(doc)
+    expected = g.evaluate_scenario(dict(g.user_inputs, change_air_travel=-50))
+    assert scenario_values(doc)[5] == round(expected.ghg["aviation"], 1)
+    # other sessions, and the next session, start at the baseline
+    other = Document()
+    pages.create_page(other, "aviation")
+    assert scenario_values(other)[5] == round(g.GHG_AVIATION, 1)
+    assert pages.baseline_chart_data()["bar"]["Scenario"][5] == round(g.GHG_AVIATION, 1)
+
+
+def test_grid_page():
+    doc = Document()
+    pages.create_page(doc, "grid")
+    assert len(list(doc.select({"type": ColumnDataSource}))) == 4
+    doc.select_one({"name": "grid_coal"}).value = "50"
+    run_callbacks(doc)
+    assert doc.select_one({"type": Paragraph}).style["color"] == "red"
+
+
+def test_unknown_page():
+    with pytest.raises(ValueError):
+        pages.create_page(Document(), "nowhere")
+
+
+@pytest.mark.parametrize("page, key", [("pop", "change_pop"), ("seq", "change_urban_trees")])
+def test_pages_use_the_precomputed_tables(page, key, tmp_path, monkeypatch):
+    precompute.write_tables(tmp_path / "tables.npz", max_positions=2000, pages=[page])
+    monkeypatch.setattr(precompute, "TABLES_PATH", str(tmp_path / "tables.npz"))
+    found = []
+
+    def lookup(page, inputs):
+        result = precompute.lookup(page, inputs)
+        found.append(result is not None)
+        return result
+
+    monkeypatch.setattr(scenario, "lookup", lookup)
+    doc = Document()
+    pages.create_page(doc, page)
+    doc.select_one({"name": key}).value = 10
+    run_callbacks(doc)
+    assert found == [True]
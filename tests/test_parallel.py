@@ -0,0 +1,40 @@
+import numpy as np
+
+from batch import evaluate_batch
+import parallel
+from parallel import evaluate_parallel
+
+
+def test_parallel_agrees_with_batch():
+    rng = np.random.default_rng(0)
+    scenarios = {
+        "change_pop": rng.uniform(-50, 50, 1000),
+        "reg_fleet_mpg": rng.uniform(15, 60, 1000),
+        "rur_energy_elec": rng.uniform(0, 100, 1000),
+    }
+    coefficients = {"CO2_LB_MWH_COAL": rng.uniform(2100, 2300, 1000), "GRID_LOSS": 0.05}
+    expected = evaluate_batch(scenarios, coefficients)
+    result = evaluate_parallel(scenarios, coefficients, workers=2, shard_size=128)
+    np.testing.assert_array_equal(result.ghg, expected.ghg)
+    np.testing.assert_array_equal(result.elec_btu, expected.elec_btu)
+
+
+def test_parallel_one_scenario():
+    result = evaluate_parallel([{"change_air_travel": 50}], workers=1)
+    np.testing.assert_array_equal(result.ghg, evaluate_batch([{"change_air_travel": 50}]).ghg)
+
+
+def test_workers_close_the_blocks():
+    block, array = parallel._create((2,))
+    array[:] = [1, 2]
+    try:
+        parallel._attach({"scalars": (block.name, (2,))}, ["a", "b"], [], [])
+        assert parallel._shared["scalars"] == {"a": 1, "b": 2}
+        attached = list(parallel._blocks)
+        parallel._detach()
+        assert parallel._shared == {} and parallel._blocks == []
+        assert all(attached_block.buf is None for attached_block in attached)
+    finally:
+        del array
+        block.close()
+        block.unlink()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import ghg_calc as g
+import pathway as p
+
+
+def test_paths():
+    years = np.arange(2015, 2051)
+    linear = p.Linear(1, 2020, 2030).progress(years)
+    s_curve = p.SCurve(1, 2020, 2030).progress(years)
+    step = p.Step(1, 2030).progress(years)
+    for progress in (linear, s_curve, step):
+        assert progress[years <= 2020].max() == 0 and progress[years >= 2030].min() == 1
+        assert np.all(np.diff(progress) >= 0)
+    assert linear[years == 2025] == pytest.approx(0.5)
+    assert s_curve[years == 2025] == pytest.approx(0.5)
+    assert s_curve[years == 2021] < linear[years == 2021]
+    assert step[years == 2029] == 0
+
+
+@pytest.mark.parametrize("path", [p.Linear, p.SCurve])
+def test_paths_have_to_end_after_they_start(path):
+    with pytest.raises(ValueError):
+        path(1, 2030, 2030)
+    with pytest.raises(ValueError):
+        path(1, start=2040, end=2030)
+    assert path(1, end=2016).progress(np.array([2015, 2016])).tolist() == [0, 1]
+
+
+def test_pathway_agrees_with_scenarios():
+    paths = {"change_pop": p.Linear(20), "reg_fleet_mpg": p.SCurve(40, 2020, 2040)}
+    result = p.evaluate_pathway(paths)
+    assert len(result.years) == 36
+    for year in (2015, 2030, 2050):
+        i = list(result.years).index(year)
+        inputs = {key: value[i] for key, value in result.inputs.items()}
+        expected = g.evaluate_scenario(inputs)
+        for key, value in expected.ghg.items():
+            assert result.ghg[key][i] == pytest.approx(value, abs=1e-12)
+    assert result.inputs["reg_fleet_mpg"][-1] == 40
+    assert result.inputs["change_pop"][0] == 0
+    np.testing.assert_allclose(result.cumulative["res"][-1], result.ghg["res"].sum())
+
+
+def test_pathway_unknown_input():
+    with pytest.raises(ValueError):
+        p.pathway_inputs({"pop": p.Linear(20)})
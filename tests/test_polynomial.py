@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ghg_calc as g
+from polynomial import (
+    INPUT_KEYS,
+    OUTPUTS,
+    Polynomial,
+    _as_polynomial,
+    _trace,
+    compile_model,
+    jacobian,
+)
+
+from test_batch import random_scenarios
+
+
+@pytest.fixture(scope="module")
+def model():
+    return compile_model()
+
+
+def test_compiled_model_matches_evaluate_scenario(model):
+    for scenario in random_scenarios(200, seed=3):
+        result = g.evaluate_scenario(scenario)
+        compiled = model.evaluate(scenario)
+        for key in g.SECTOR_KEYS:
+            assert compiled.ghg[key] == pytest.approx(result.ghg[key], rel=1e-9, abs=1e-9)
+        for key in g.ELEC_SECTOR_KEYS:
+            assert compiled.elec_btu[key] == pytest.approx(result.elec_btu[key], rel=1e-9)
+
+
+def test_tracing_in_threads(model):
+    # each thread takes its own branches, and compiling from several threads compiles once
+    branches = [[bool(branch >> i & 1) for i in range(4)] for branch in range(16)] * 4
+    expected = [_trace(branch) for branch in branches[:16]] * 4
+    with ThreadPoolExecutor(8) as executor:
+        traced = list(executor.map(_trace, branches))
+        compiled = list(executor.map(lambda _: compile_model(), range(8)))
+    for (result, conditions), (expected_result, expected_conditions) in zip(traced, expected):
+        assert len(conditions) == len(expected_conditions) == 4
+        for key in g.SECTOR_KEYS:
+            assert (
+                _as_polynomial(result.ghg[key]).terms
+                == _as_polynomial(expected_result.ghg[key]).terms
+            )
+    assert all(other is model for other in compiled)
+
+
+def test_branches(model):
+    assert len(model.conditions) == 4
+    baseline = model.branch(g.user_inputs)
+    assert model.branch(dict(g.user_inputs, change_forest=-10)) == baseline | 1
+    assert model.branch(dict(g.user_inputs, change_forest=10)) == baseline & ~1
+
+
+def test_aviation_polynomial(model):
+    aviation = model.polynomial("aviation", 0)
+    assert aviation.inputs() == ["change_air_travel", "change_pop"]
+    assert aviation({"change_pop": 10, "change_air_travel": -20}) == pytest.approx(
+        g.calc_aviation_ghg(10, -20)
+    )
+
+
+def test_polynomial_arithmetic():
+    x = Polynomial.variable("x")
+    y = Polynomial.variable("y")
+    p = (1 + x / 2) * (y - 3) / y
+    assert p({"x": 4, "y": 2}) == pytest.approx(-1.5)
+    with pytest.raises(ValueError):
+        x / (x + 1)
+    with pytest.raises(TypeError):
+        x < 0
+
+
+def test_jacobian_matches_finite_differences(model):
+    # away from the branches at urb/sub/rur_energy_elec = baseline and change_forest = 0
+    inputs = dict(
+        g.user_inputs,
+        change_pop=12,
+        urb_energy_elec=60,
+        sub_energy_elec=10,
+        rur_energy_elec=50,
+        change_forest=-5,
+        air_capture=20,
+    )
+    matrix = model.jacobian(inputs)
+    assert matrix.shape == (len(OUTPUTS), len(INPUT_KEYS))
+    for j, key in enumerate(INPUT_KEYS):
+        h = 1e-4 * max(1, abs(inputs[key]))
+        high = g.evaluate_scenario(dict(inputs, **{key: inputs[key] + h}))
+        low = g.evaluate_scenario(dict(inputs, **{key: inputs[key] - h}))
+        for i, (field, output) in enumerate(OUTPUTS):
+            difference = (getattr(high, field)[output] - getattr(low, field)[output]) / (2 * h)
+            assert matrix[i, j] == pytest.approx(difference, rel=1e-6, abs=1e-9)
+
+
+def test_jacobian_of_aviation():
+    derivatives = jacobian(dict(g.user_inputs, change_pop=10))["aviation"]
+    assert derivatives["change_air_travel"] == pytest.approx(g.GHG_AVIATION * 1.1 / 100)
+    assert derivatives["change_pop"] == pytest.approx(g.GHG_AVIATION / 100)
+    assert derivatives["change_forest"] == 0
@@ -0,0 +1,63 @@
+import pytest
+from bokeh.document import Document
+
+import ghg_calc as g
+import pages
+import precompute
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tables") / "tables.npz"
+    precompute.write_tables(path, max_positions=2000)
+    return precompute.load_tables(path)
+
+
+def assert_matches(result, inputs):
+    expected = g.evaluate_scenario(inputs)
+    for key in g.SECTOR_KEYS:
+        assert result.ghg[key] == pytest.approx(expected.ghg[key], rel=1e-12, abs=1e-12)
+    for key in g.ELEC_SECTOR_KEYS:
+        assert result.elec_btu[key] == pytest.approx(expected.elec_btu[key], rel=1e-12)
+
+
+def test_every_combination_table(tables):
+    assert tables["non_res"].shape[:2] == (21, len(precompute.slider_positions("ci_energy_elec")))
+    inputs = dict(g.user_inputs, ci_energy_change=-30, ci_energy_elec=g.CI_ENERGY_ELEC + 12)
+    assert_matches(precompute.lookup("non_res", inputs, tables), inputs)
+
+
+def test_slider_tables(tables):
+    assert "seq" not in tables
+    inputs = dict(g.page_inputs("seq"), air_capture=40)
+    assert_matches(precompute.lookup("seq", inputs, tables), inputs)
+    inputs = g.page_inputs("seq")
+    assert_matches(precompute.lookup("seq", inputs, tables), inputs)
+    # two sliders moved, so not in the tables
+    assert precompute.lookup("seq", dict(inputs, air_capture=40, change_forest=5), tables) is None
+
+
+def test_off_the_tables(tables):
+    # not a slider position
+    assert precompute.lookup("aviation", dict(g.user_inputs, change_air_travel=2.5), tables) is None
+    # an input not on the page
+    inputs = dict(g.user_inputs, change_pop=10, change_air_travel=5)
+    assert precompute.lookup("aviation", inputs, tables) is None
+
+
+def test_tables_from_other_coefficients_are_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "tables.npz"
+    precompute.write_tables(path, pages=["aviation"])
+    monkeypatch.setattr(precompute, "coefficients_version", lambda: "something else")
+    assert precompute.load_tables(path) == {}
+
+
+@pytest.mark.parametrize("page", g.PAGE_SLIDERS)
+def test_slider_ranges_match_pages(page):
+    doc = Document()
+    pages.create_page(doc, page)
+    keys = [lever.key for lever in pages.PAGES[page] if not lever.text_input]
+    assert keys == g.PAGE_SLIDERS[page]
+    for key in keys:
+        slider = doc.select_one({"name": key})
+        assert (slider.start, slider.end, slider.step) == g.SLIDER_RANGES[key]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import ghg_calc as g
+import regions as r
+
+SCENARIO = {"change_pop": 10, "reg_fleet_mpg": 30, "res_energy_change": -20, "air_capture": 20}
+
+
+def expected_ghg(scenario):
+    result = g.evaluate_scenario(dict(g.user_inputs, **scenario))
+    return [result.ghg[key] for key in g.SECTOR_KEYS]
+
+
+def test_apportioned_regions_add_up():
+    table = r.apportion({"Bucks": 0.2, "Chester": 0.5, "Delaware": 0.3})
+    result = r.evaluate_regions(table, [{}, SCENARIO])
+    assert result.ghg.shape == (2, 3, 8)
+    totals = r.region_totals(result)
+    np.testing.assert_allclose(totals.ghg[0], expected_ghg({}), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(totals.ghg[1], expected_ghg(SCENARIO), rtol=1e-12, atol=1e-12)
+
+
+def test_loaded_regions_add_up(tmp_path):
+    # urban population mostly in one region, rural in another
+    shares = {"URBAN_POP": [0.8, 0.2, 0], "RURAL_POP": [0, 0.1, 0.9]}
+    path = tmp_path / "regions.csv"
+    with open(path, "w") as f:
+        f.write("region," + ",".join(r.REGION_TOTALS) + "\n")
+        for i, region in enumerate(["A", "B", "C"]):
+            values = [
+                getattr(g, name) * shares.get(name, [0.2, 0.5, 0.3])[i] for name in r.REGION_TOTALS
+            ]
+            f.write(region + "," + ",".join(repr(value) for value in values) + "\n")
+
+    table = r.load_regions(path)
+    assert table.regions == ["A", "B", "C"]
+    result = r.evaluate_regions(table, SCENARIO)
+    np.testing.assert_allclose(
+        r.region_totals(result).ghg[0], expected_ghg(SCENARIO), rtol=1e-12, atol=1e-12
+    )
+    # on-road emissions in each region's own baseline are its share of the vehicle miles
+    baseline = r.evaluate_regions(table)
+    miles = [
+        g.URBAN_POP * g.URB_VEH_MILES,
+        g.SUBURBAN_POP * g.SUB_VEH_MILES,
+        g.RURAL_POP * g.RUR_VEH_MILES,
+    ]
+    share_a = (0.8 * miles[0] + 0.2 * miles[1]) / sum(miles)
+    highway = g.SECTOR_KEYS.index("highway")
+    assert baseline.ghg[0, 0, highway] == pytest.approx(
+        share_a * g.evaluate_scenario(g.user_inputs).ghg["highway"]
+    )
+
+
+def test_unknown_constant(tmp_path):
+    path = tmp_path / "regions.csv"
+    path.write_text("region,URBAN_POPULATION\nA,1\n")
+    with pytest.raises(ValueError):
+        r.load_regions(path)
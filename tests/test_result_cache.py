@@ -0,0 +1,119 @@
+import multiprocessing
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import ghg_calc as g
+from result_cache import ResultCache, scenario_key
+from scenario import ScenarioState
+
+APPS = Path(__file__).parents[1] / "bokeh_apps"
+
+
+def test_scenario_key():
+    inputs = dict(g.user_inputs, change_pop=10)
+    assert scenario_key(inputs) == scenario_key(dict(inputs, change_pop=10.0))
+    assert scenario_key(inputs) != scenario_key(g.user_inputs)
+    assert scenario_key(inputs, "other version") != scenario_key(inputs)
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3")
+    inputs = dict(g.user_inputs, change_air_travel=-50)
+    assert cache.get(inputs) is None
+    cache.put(inputs, g.evaluate_scenario(inputs))
+    assert cache.get(inputs) == g.evaluate_scenario(inputs)
+    # results calculated with other constants aren't returned
+    assert ResultCache(tmp_path / "results.sqlite3", version="other").get(inputs) is None
+
+
+def test_results_are_written_together(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", write_interval=60)
+    other = ResultCache(tmp_path / "results.sqlite3")
+    inputs = [dict(g.user_inputs, change_pop=value) for value in range(5)]
+    for scenario in inputs:
+        cache.put(scenario, g.evaluate_scenario(scenario))
+    # results waiting to be written are returned, but only to the cache they were put in
+    assert cache.get(inputs[0]) == g.evaluate_scenario(inputs[0])
+    assert other.get(inputs[0]) is None
+    cache.flush()
+    assert [other.get(scenario) for scenario in inputs] == [
+        g.evaluate_scenario(scenario) for scenario in inputs
+    ]
+
+
+def test_results_are_written_without_more_puts(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", write_interval=0.05)
+    other = ResultCache(tmp_path / "results.sqlite3")
+    cache.put(g.user_inputs, g.evaluate_scenario(g.user_inputs))
+    deadline = time.monotonic() + 10
+    while other.get(g.user_inputs) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_shared_cache_is_written_on_exit(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    assert len(ResultCache(path)) == 0
+    code = (
+        "import ghg_calc as g, result_cache;"
+        f"result_cache.shared_cache({str(path)!r}).put(g.user_inputs, g.evaluate_scenario(g.user_inputs))"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=APPS, check=True)
+    assert ResultCache(path).get(g.user_inputs) == g.evaluate_scenario(g.user_inputs)
+
+
+def test_oldest_results_are_deleted(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", max_rows=3, write_interval=0)
+    inputs = [dict(g.user_inputs, change_pop=value) for value in range(5)]
+    for scenario in inputs:
+        cache.put(scenario, g.evaluate_scenario(scenario))
+    assert len(cache) == 3
+    assert [cache.get(scenario) is not None for scenario in inputs] == [False, False] + [True] * 3
+
+
+def _get(path, inputs, results):
+    results.put(ResultCache(path).get(inputs))
+
+
+def test_shared_between_processes(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    inputs = dict(g.user_inputs, change_pop=-20)
+    cache = ResultCache(path)
+    cache.put(inputs, g.evaluate_scenario(inputs))
+    cache.flush()
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_get, args=(path, inputs, results))
+    process.start()
+    assert results.get(timeout=60) == g.evaluate_scenario(inputs)
+    process.join()
+
+
+def test_scenario_state_uses_cache(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3")
+    scenario = ScenarioState({"change_forest": 5}, cache=cache)
+    assert scenario.evaluate() == g.evaluate_scenario(scenario.inputs)
+    assert len(cache) == 1
+
+    # a warm hit isn't calculated: another session gets whatever is stored
+    stored = g.evaluate_scenario(g.user_inputs)
+    cache.put(dict(g.user_inputs, change_forest=10), stored)
+    other = ScenarioState({"change_forest": 10}, cache=cache)
+    assert other.evaluate() == stored
+    assert other._parts is None
+    # ... and results calculated after a hit are still right
+    other.update(change_forest=15)
+    assert other.evaluate() == g.evaluate_scenario(other.inputs)
+
+
+def test_scenario_state_without_cache(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "results.sqlite3")
+    monkeypatch.setattr("scenario.shared_cache", lambda: cache)
+    assert ScenarioState().cache is cache
+    scenario = ScenarioState({"change_forest": 5}, cache=None)
+    assert scenario.cache is None
+    assert scenario.evaluate() == g.evaluate_scenario(scenario.inputs)
+    assert scenario.copy().cache is None
+    assert len(cache) == 0
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+import ghg_calc as g
+from scenario import ScenarioState
+
+
+def test_sessions_do_not_share_inputs():
+    first = ScenarioState()
+    second = ScenarioState()
+    first.update(change_pop=10)
+    assert first.inputs["change_pop"] == 10
+    assert second.inputs["change_pop"] == g.user_inputs["change_pop"]
+    assert second.evaluate() == g.evaluate_scenario(g.user_inputs)
+
+
+def test_baseline_inputs_are_read_only():
+    with pytest.raises(TypeError):
+        g.user_inputs["change_pop"] = 10
+
+
+def test_evaluate_uses_session_inputs():
+    scenario = ScenarioState({"change_air_travel": 50})
+    expected = dict(g.user_inputs, change_air_travel=50)
+    assert scenario.evaluate() == g.evaluate_scenario(expected)
+
+
+def test_unknown_input_raises_key_error():
+    with pytest.raises(KeyError):
+        ScenarioState().update(change_nothing=1)
+
+
+def test_input_calcs():
+    assert g.INPUT_CALCS["air_capture"] == ["seq"]
+    assert g.INPUT_CALCS["change_air_travel"] == ["aviation"]
+    assert g.INPUT_CALCS["res_energy_change"] == ["res", "non_energy", "seq"]
+    assert g.INPUT_CALCS["change_pop"] == [
+        "res",
+        "highway",
+        "rail",
+        "aviation",
+        "non_energy",
+        "seq",
+    ]
+
+
+def test_incremental_evaluation_matches_full_evaluation():
+    random.seed(1)
+    scenario = ScenarioState()
+    for _ in range(200):
+        key = random.choice(list(g.user_inputs))
+        scenario.update({key: random.randint(0, 100)})
+        assert scenario.evaluate() == g.evaluate_scenario(scenario.inputs)
+
+
+def test_evaluate_reuses_unaffected_results():
+    scenario = ScenarioState()
+    scenario.evaluate()
+    parts = scenario._parts
+    scenario.update(air_capture=50)
+    scenario.evaluate()
+    assert all(scenario._parts[calc] is parts[calc] for calc in g.CALC_INPUTS if calc != "seq")
+    assert scenario._parts["seq"] != parts["seq"]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import ghg_calc as g
+import sensitivity as s
+
+
+def test_sample_mixes_add_up_to_100():
+    columns = s.sample(["grid", "pop", "change_forest"], 100, np.random.default_rng(0))
+    np.testing.assert_allclose(sum(columns[key] for key in s.GRID_KEYS), 100)
+    np.testing.assert_allclose(sum(columns[key] for key in s.POP_KEYS), 100)
+    assert columns["change_forest"].min() >= -20 and columns["change_forest"].max() <= 20
+
+
+def test_sobol_indices():
+    result = s.sobol_indices(n=4096, factors=["change_air_travel", "change_ag", "change_pop"])
+    aviation = result.outputs.index("aviation")
+    first = dict(zip(result.factors, result.first_order[aviation]))
+    total = dict(zip(result.factors, result.total_order[aviation]))
+    # aviation doesn't depend on agriculture
+    assert first["change_ag"] == 0 and total["change_ag"] == 0
+    # ... and depends on air travel and population equally (their product)
+    assert first["change_air_travel"] == pytest.approx(first["change_pop"], abs=0.1)
+    assert total["change_air_travel"] >= first["change_air_travel"] - 0.05
+    assert result.first_order.shape == (len(s.OUTPUTS), 3)
+
+
+def test_tornado():
+    bars = s.tornado("aviation")
+    assert len(bars) == len(g.user_inputs)
+    swings = [abs(bar.high - bar.low) for bar in bars]
+    assert swings == sorted(swings, reverse=True)
+    top = {bar.input: bar for bar in bars[:2]}
+    assert top["change_air_travel"].low == pytest.approx(0)
+    assert top["change_air_travel"].high == pytest.approx(2 * g.GHG_AVIATION)
+    assert set(top) == {"change_air_travel", "change_pop"}
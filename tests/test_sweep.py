@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ghg_calc as g
+import sweep
+
+
+@pytest.fixture
+def scenarios(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "id": np.arange(1000),
+            "change_pop": rng.uniform(-50, 50, 1000),
+            "reg_fleet_mpg": rng.uniform(15, 60, 1000),
+        }
+    )
+    path = tmp_path / "scenarios.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_run(scenarios, tmp_path):
+    output = tmp_path / "results.csv"
+    reports = []
+    assert sweep.run(scenarios, output, chunk_size=300, report=reports.append) == 1000
+    assert reports == [300, 600, 900, 1000]
+
+    results = pd.read_csv(output)
+    assert list(results.columns) == ["id", "change_pop", "reg_fleet_mpg"] + sweep.RESULT_COLUMNS
+    row = results.iloc[123]
+    inputs = dict(g.user_inputs, change_pop=row.change_pop, reg_fleet_mpg=row.reg_fleet_mpg)
+    expected = g.evaluate_scenario(inputs)
+    assert row.ghg_highway == pytest.approx(expected.ghg["highway"])
+    assert row.elec_btu_res == pytest.approx(expected.elec_btu["res"])
+
+
+def test_resume(scenarios, tmp_path):
+    complete = tmp_path / "complete.csv"
+    sweep.run(scenarios, complete, chunk_size=300)
+
+    def interrupt(rows):
+        if rows == 600:
+            raise KeyboardInterrupt
+
+    output = tmp_path / "results.csv"
+    with pytest.raises(KeyboardInterrupt):
+        sweep.run(scenarios, output, chunk_size=300, report=interrupt)
+    # part of a chunk written when the run stopped
+    with open(output, "a") as f:
+        f.write("0,1,2")
+    assert sweep.run(scenarios, output, chunk_size=300, resume=True) == 1000
+    assert output.read_bytes() == complete.read_bytes()
+
+
+def test_workers(scenarios, tmp_path):
+    sweep.run(scenarios, tmp_path / "one.csv", chunk_size=300)
+    sweep.run(scenarios, tmp_path / "two.csv", chunk_size=300, workers=2)
+    assert (tmp_path / "one.csv").read_bytes() == (tmp_path / "two.csv").read_bytes()
+
+
+def test_parquet(scenarios, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "scenarios.parquet"
+    pd.read_csv(scenarios).to_parquet(path)
+    assert sweep.count_rows(path) == 1000
+    output = tmp_path / "results.parquet"
+    assert sweep.run(path, output, chunk_size=300) == 1000
+    results = pd.read_parquet(output).sort_values("id")
+    sweep.run(scenarios, tmp_path / "results.csv", chunk_size=300)
+    expected = pd.read_csv(tmp_path / "results.csv")
+    np.testing.assert_allclose(results[sweep.RESULT_COLUMNS], expected[sweep.RESULT_COLUMNS])
+
+
+def test_wrong_inputs(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    output = tmp_path / "results.csv"
+    frame = pd.DataFrame({"change_pop": [0, 10, 20, None, 500, "x", 600]})
+    frame.to_csv(path, index=False)
+    with pytest.raises(ValueError) as error:
+        sweep.run(path, output, chunk_size=3)
+    # the first chunk is written, and the second stops the run
+    assert len(pd.read_csv(output)) == 3
+    assert str(error.value) == (
+        "change_pop must be a finite number in scenario 3 and 1 more; "
+        "change_pop must be between -100 and 100 in scenario 4"
+    )
+
+    frame.iloc[3:] = 0
+    frame.to_csv(path, index=False)
+    assert sweep.run(path, output, chunk_size=3, resume=True) == 7
+
+
+def test_mix_must_add_up(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    pd.DataFrame({"urban_pop_percent": [g.URBAN_POP_PERCENT, 50, 60]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match=r"population split .* scenario 1 and 1 more$"):
+        sweep.run(path, tmp_path / "results.csv")